@@ -0,0 +1,10 @@
+"""
+Benchmarks for the plox front end.
+
+Run from the repository root, e.g. ``python -m benchmarks.token_memory``.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
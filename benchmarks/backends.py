@@ -0,0 +1,115 @@
+"""
+Compare the execution backends on the same scripts.
+
+Each script is scanned and parsed once.  The table shows the best time per
+node to evaluate it on each backend, the speedup of each compiled backend over
+the tree walker, and the one-off compile times, which for the transpiler include
+CPython's compile().
+"""
+
+import sys
+import time
+from typing import Callable
+
+from bytecode import Compiler
+from closure_compiler import ClosureCompiler, ClosureInterpreter
+from expression import Expr
+from interpreter import Interpreter
+from optimizer import count_nodes
+from parser import Parser
+from regex_scanner import RegexScanner
+from transpiler import TranspilingInterpreter
+from vm import VM
+
+SCRIPTS = {
+    "sum": " + ".join(str(n) for n in range(1, 201)),
+    "arithmetic": " + ".join(["((1 + 2) * 3 - 4 / 2) * ((5 - 6) * 7 + 8 / 4) - -(9 * 10)"] * 20),
+    "comparison": " == ".join(["(1 + 2 < 3 * 4)", "!(5 - 6 >= 7 / 8)"] * 20),
+    "variables": " + ".join(["(a + b) * (a - b) / (b * b) + a * a - b"] * 20),
+    "logic": " and ".join(["(false or 1 + 2)", "(nil or 3 * 4)", "(true and 5 - 6)"] * 20),
+}
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def parse(source: str) -> Expr:
+    return Parser(RegexScanner(source, ignore).scan_tokens(), ignore).parse()
+
+
+def best_of(function: Callable[[], object], number: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def backends() -> dict[str, Callable[[Expr], Callable[[], object]]]:
+    """Each entry prepares an expression once and returns a callable that runs it."""
+
+    def ast(expr: Expr) -> Callable[[], object]:
+        interpreter = Interpreter(ignore)
+        define(interpreter.globals)
+        return lambda: interpreter.evaluate(expr)
+
+    def vm(expr: Expr) -> Callable[[], object]:
+        machine = VM(ignore)
+        define(machine.globals)
+        chunk = Compiler().compile(expr)
+        return lambda: machine.run(chunk)
+
+    def closure(expr: Expr) -> Callable[[], object]:
+        interpreter = ClosureInterpreter(ignore)
+        define(interpreter.globals)
+        compiled = ClosureCompiler(interpreter).compile(expr)
+        environment = interpreter.globals
+        return lambda: compiled(environment)
+
+    def python(expr: Expr) -> Callable[[], object]:
+        interpreter = TranspilingInterpreter(ignore)
+        define(interpreter.globals)
+        program = interpreter.compile(expr)
+        environment = interpreter.globals
+        return lambda: program(environment.slots, environment, interpreter)
+
+    return {"ast": ast, "vm": vm, "closure": closure, "python": python}
+
+
+def define(environment: object) -> None:
+    environment.define("a", 3.0)
+    environment.define("b", 7.0)
+
+
+def main(number: int = 500) -> None:
+    names = list(backends())
+    header = "".join(f"{name + ' ns/node':>16}" for name in names)
+    speedups = "".join(f"{name + ' x':>10}" for name in names[1:])
+    print(f"{'script':<12}{'nodes':>6}{header}{speedups}{'vm comp us':>12}{'cl comp us':>12}{'py comp us':>12}")
+    for script, source in SCRIPTS.items():
+        expr = parse(source)
+        nodes = count_nodes(expr)
+        results = [prepare(expr) for prepare in backends().values()]
+        assert len({repr(run()) for run in results}) == 1, script
+        timings = [best_of(run, number) * 1e9 / nodes for run in results]
+        compiles = [
+            best_of(lambda expr=expr: Compiler().compile(expr), number // 5 or 1) * 1e6,
+            best_of(
+                lambda expr=expr: ClosureCompiler(ClosureInterpreter(ignore)).compile(expr), number // 5 or 1
+            )
+            * 1e6,
+            best_of(lambda expr=expr: TranspilingInterpreter(ignore).compile(expr), number // 5 or 1) * 1e6,
+        ]
+        print(
+            f"{script:<12}{nodes:>6}"
+            + "".join(f"{timing:>16.1f}" for timing in timings)
+            + "".join(f"{timings[0] / timing:>10.2f}" for timing in timings[1:])
+            + "".join(f"{compile_time:>12.1f}" for compile_time in compiles)
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
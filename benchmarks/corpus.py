@@ -0,0 +1,95 @@
+"""
+Deterministic generator of Lox source for the benchmarks.
+
+Every corpus is a single expression made of units of one kind, so the scanners,
+the parser and the printer can all consume it.  The same kind, size and seed
+always produce the same text.  Units are joined in parenthesized groups, which
+keeps the trees shallow enough for the recursive parser mode however
+large the corpus grows.
+
+Run ``python -m benchmarks.corpus KIND [BYTES] [SEED]`` to print one.
+"""
+
+import random
+import string
+import sys
+from typing import Callable
+
+from scanner import keywords
+
+GROUP = 16
+OPERATORS = ("+", "-", "*", "/", "<", ">=", "==", "!=")
+LETTERS = string.ascii_letters
+WORDS = ("alpha", "beta", "gamma", "delta", "total", "rate", "count", "index", "value", "x")
+
+
+def number(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return str(rng.randrange(10_000))
+    return f"{rng.randrange(100_000)}.{rng.randrange(1, 10_000)}"
+
+
+def long_string(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randrange(10, 100))]
+    # Some strings span lines, as doc strings and templates do.
+    separator = "\n" if rng.random() < 0.2 else " "
+    return '"' + separator.join(words) + '"'
+
+
+def identifier(rng: random.Random) -> str:
+    name = rng.choice(LETTERS) + "".join(
+        rng.choice(LETTERS + string.digits) for _ in range(rng.randrange(2, 16))
+    )
+    # A keyword would scan as something else and could make the corpus a syntax error.
+    return name + "0" if name in keywords else name
+
+
+def nested(rng: random.Random) -> str:
+    depth = rng.randrange(20, 60)
+    text = number(rng)
+    for _ in range(depth):
+        match rng.randrange(3):
+            case 0:
+                text = f"({text})"
+            case 1:
+                text = f"-{text}"
+            case _:
+                text = f"({number(rng)} {rng.choice(OPERATORS)} {text})"
+    return text
+
+
+def mixed(rng: random.Random) -> str:
+    return rng.choice((number, long_string, identifier, nested))(rng)
+
+
+UNITS: dict[str, Callable[[random.Random], str]] = {
+    "numbers": number,
+    "strings": long_string,
+    "identifiers": identifier,
+    "nested": nested,
+    "mixed": mixed,
+}
+
+
+def generate(kind: str, size: int, seed: int = 0) -> str:
+    """Returns a corpus of at least size characters built from units of kind."""
+    rng = random.Random(f"{kind}:{seed}")
+    unit = UNITS[kind]
+    units = []
+    length = 0
+    while length < size:
+        units.append(unit(rng))
+        length += len(units[-1]) + 3
+    while len(units) > 1:
+        groups = []
+        for start in range(0, len(units), GROUP):
+            first, *rest = units[start : start + GROUP]
+            groups.append("(" + first + "".join(f" {rng.choice(OPERATORS)} {item}" for item in rest) + ")")
+        units = groups
+    return units[0]
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    print(generate(sys.argv[1], size, seed))
@@ -0,0 +1,49 @@
+"""
+Parsing deeply nested expressions in the iterative mode.
+
+For each shape and depth the table shows the best parse time per nesting
+level and the peak memory traced while parsing, per level, which includes the
+tree being built.  Both stay flat as the depth grows.  The last column says
+whether the recursive mode parses the same input at all.
+"""
+
+import sys
+import time
+import tracemalloc
+
+from parser import Parser
+from scanner import Scanner
+
+SHAPES = {
+    "groups": ("(", ")"),
+    "negations": ("-", ""),
+    "calls": ("f(", ")"),
+    "assignments": ("a = ", ""),
+}
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def main(depths: tuple[int, ...] = (1_000, 10_000, 100_000), repeat: int = 3) -> None:
+    print(f"{'shape':<12}{'depth':>9}{'ns/level':>10}{'B/level':>9}  recursive")
+    for name, (prefix, suffix) in SHAPES.items():
+        for depth in depths:
+            tokens = Scanner(prefix * depth + "x" + suffix * depth, ignore).scan_tokens()
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                Parser(tokens, ignore, iterative=True).parse()
+                best = min(best, time.perf_counter() - start)
+            tracemalloc.start()
+            tree = Parser(tokens, ignore, iterative=True).parse()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert tree is not None
+            recursive = "ok" if Parser(tokens, ignore).parse() is not None else "RecursionError"
+            print(f"{name:<12}{depth:>9}{best * 1e9 / depth:>10.0f}{peak / depth:>9.0f}  {recursive}")
+
+
+if __name__ == "__main__":
+    main(tuple(map(int, sys.argv[1:])) or (1_000, 10_000, 100_000))
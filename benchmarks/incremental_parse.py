@@ -0,0 +1,68 @@
+"""
+Edits on a large source: IncrementalParser.edit against scanning and parsing
+the whole edited source again.
+
+"operand" edits replace a number with another, which keeps the source valid.
+A "typo" deletes a closing parenthesis, so the source has an error and is
+parsed in full up to it, after trying the groups around it, and the "fix" that
+follows puts the parenthesis back and is reparsed incrementally again.
+"""
+
+import random
+import statistics
+import sys
+import time
+from typing import Iterator
+
+from benchmarks.corpus import generate
+from incremental_parser import IncrementalParser
+from incremental_scanner import IncrementalScanner
+from parser import Parser
+from regex_scanner import RegexScanner
+from scanner import TokenType
+from serializer import dumps
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def edits(
+    rng: random.Random, parser: IncrementalParser, kind: str, count: int
+) -> Iterator[tuple[str, tuple[int, int, str]]]:
+    for _ in range(count):
+        tokens = parser.scanner.tokens
+        if kind == "operand":
+            token = rng.choice([token for token in tokens if token.type == TokenType.NUMBER])
+            yield "operand", (token.offset, len(token.lexeme), str(rng.randrange(1_000)))
+        else:
+            token = rng.choice([token for token in tokens if token.type == TokenType.RIGHT_PAREN])
+            yield "typo", (token.offset, 1, "")
+            yield "fix", (token.offset, 0, ")")
+
+
+def main(size: int = 1 << 20, count: int = 50) -> None:
+    source = generate("mixed", size)
+    start = time.perf_counter()
+    Parser(RegexScanner(source, ignore).scan_tokens(), ignore).parse()
+    full = time.perf_counter() - start
+    print(f"{len(source):,} chars, full scan and parse {full * 1e3:.1f} ms")
+    print(f"{'edit':<8} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}")
+    for kind in ("operand", "typo"):
+        rng = random.Random(0)
+        parser = IncrementalParser(IncrementalScanner(source, ignore), ignore)
+        times: dict[str, list[float]] = {}
+        for label, (offset, removed, inserted) in edits(rng, parser, kind, count):
+            start = time.perf_counter()
+            parser.edit(offset, removed, inserted)
+            times.setdefault(label, []).append(time.perf_counter() - start)
+        expected = Parser(RegexScanner(parser.scanner.source, ignore).scan_tokens(), ignore).parse()
+        assert dumps(parser.tree) == dumps(expected)
+        for label, samples in times.items():
+            median = statistics.median(samples)
+            p99 = statistics.quantiles(samples, n=100)[98]
+            print(f"{label:<8} {median * 1e3:>8.3f} {p99 * 1e3:>8.3f} {full / median:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1 << 20)
@@ -0,0 +1,67 @@
+"""
+Single-character edits on a large source: IncrementalScanner.edit against
+scanning the whole edited source again with RegexScanner.
+
+Inserting or deleting shifts every later token, while replacing a character
+keeps the length, so it only rescans the window around the edit.  Quotes are
+never edited, since one turns the rest of the source inside out and every
+edit becomes a full rescan.
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.corpus import generate
+from incremental_scanner import IncrementalScanner
+from regex_scanner import RegexScanner
+
+ALPHABET = "abcxyz0123456789 +-*<=(."
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def edit_at(rng: random.Random, source: str, kind: str) -> tuple[int, int, str]:
+    offset = rng.randrange(len(source))
+    while source[offset] == '"':
+        offset = rng.randrange(len(source))
+    if kind == "insert":
+        return offset, 0, rng.choice(ALPHABET)
+    if kind == "delete":
+        return offset, 1, ""
+    return offset, 1, rng.choice(ALPHABET)
+
+
+def main(size: int = 1 << 20, edits: int = 200) -> None:
+    source = generate("mixed", size)
+    start = time.perf_counter()
+    RegexScanner(source, ignore).scan_tokens()
+    full = time.perf_counter() - start
+    print(f"{len(source):,} chars, full scan {full * 1e3:.1f} ms")
+    print(f"{'edit':<8} {'p50 ms':>8} {'p99 ms':>8} {'scanned':>8} {'speedup':>8}")
+    for kind in ("replace", "insert", "delete"):
+        rng = random.Random(0)
+        scanner = IncrementalScanner(source, ignore)
+        times = []
+        rescanned = 0
+        for _ in range(edits):
+            offset, removed, inserted = edit_at(rng, scanner.source, kind)
+            start = time.perf_counter()
+            change = scanner.edit(offset, removed, inserted)
+            times.append(time.perf_counter() - start)
+            rescanned += change.inserted
+        assert [(token.type, token.offset) for token in scanner.tokens] == [
+            (token.type, token.offset) for token in RegexScanner(scanner.source, ignore).scan_tokens()
+        ]
+        median = statistics.median(times)
+        p99 = statistics.quantiles(times, n=100)[98]
+        print(
+            f"{kind:<8} {median * 1e3:>8.3f} {p99 * 1e3:>8.3f} {rescanned / edits:>8.1f} {full / median:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1 << 20)
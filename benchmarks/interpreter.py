@@ -0,0 +1,83 @@
+"""
+Micro-benchmarks of arithmetic-heavy expressions in the tree-walking Interpreter.
+
+Compares the type-keyed dispatch table with plain Expr.accept double dispatch.
+Expressions made mostly of literals and numbers gain the most; on variables and
+logic the two run about even, as looking a variable up costs the same either way.
+"""
+
+import sys
+import time
+from functools import partial
+from typing import Callable
+
+from expression import Binary, Expr, Grouping, Logical, Unary
+from interpreter import BINARY_OPERATIONS, UNARY_OPERATIONS, Interpreter, is_truthy
+from optimizer import count_nodes
+from parser import Parser
+from regex_scanner import RegexScanner
+
+EXPRESSIONS = {
+    "sum": " + ".join(str(n) for n in range(1, 101)),
+    "mixed": "((1 + 2) * 3 - 4 / 2) * ((5 - 6) * 7 + 8 / 4) - -(9 * 10)",
+    "compare": "(1 + 2 < 3 * 4) == !(5 - 6 >= 7 / 8) != (nil == false)",
+    "variables": "(a + b) * (a - b) / (b * b) + a * a - b",
+    "logic": "(false or 1 + 2) and (nil or 3 * 4) and (true and 5 - 6)",
+}
+
+
+class AcceptInterpreter(Interpreter):
+    """The same evaluator with every child reached through Expr.accept."""
+
+    def evaluate(self, expr: Expr) -> object:
+        return expr.accept(self)
+
+    def visit_binary_expr(self, expr: Binary) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        return BINARY_OPERATIONS[expr.operator.type](expr.operator, left, right)
+
+    def visit_grouping_expr(self, expr: Grouping) -> object:
+        return expr.expression.accept(self)
+
+    def visit_logical_expr(self, expr: Logical) -> object:
+        left = expr.left.accept(self)
+        if is_truthy(left) == (expr.operator.lexeme == "or"):
+            return left
+        return expr.right.accept(self)
+
+    def visit_unary_expr(self, expr: Unary) -> object:
+        return UNARY_OPERATIONS[expr.operator.type](expr.operator, expr.right.accept(self))
+
+
+def best_of(function: Callable[[], object], repeat: int, number: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def main(number: int = 2_000) -> None:
+    print(f"{'expression':<10} {'nodes':>6} {'accept ns/node':>15} {'table ns/node':>14} {'speedup':>8}")
+    for name, source in EXPRESSIONS.items():
+        expr = Parser(RegexScanner(source, print).scan_tokens(), print).parse()
+        nodes = count_nodes(expr)
+        evaluators = []
+        for interpreter_type in (AcceptInterpreter, Interpreter):
+            interpreter = interpreter_type(print)
+            interpreter.globals.define("a", 3.0)
+            interpreter.globals.define("b", 7.0)
+            evaluators.append(partial(interpreter.evaluate, expr))
+        # Alternating rounds spread machine noise over both evaluators alike.
+        accept = table = float("inf")
+        for _ in range(5):
+            accept = min(accept, best_of(evaluators[0], 3, number) / nodes * 1e9)
+            table = min(table, best_of(evaluators[1], 3, number) / nodes * 1e9)
+        print(f"{name:<10} {nodes:>6} {accept:>15.1f} {table:>14.1f} {accept / table:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,25 @@
+"""
+Time my_lexer.get_tokens on growing inputs to show it scales linearly.
+"""
+
+import sys
+import time
+
+from my_lexer import get_tokens
+
+LINE = 'let total = total + 42 * rate\ndef handler return "some text value"\n'
+SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def main(sizes: tuple[int, ...] = SIZES) -> None:
+    print(f"{'chars':>12} {'tokens':>10} {'seconds':>9} {'ns/char':>8}")
+    for size in sizes:
+        text = (LINE * (size // len(LINE) + 1))[:size]
+        start = time.perf_counter()
+        tokens = get_tokens(text)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>12} {len(tokens):>10} {elapsed:>9.3f} {elapsed / size * 1e9:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or SIZES)
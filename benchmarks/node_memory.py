@@ -0,0 +1,102 @@
+"""
+Memory used by parsed programs with slotted versus __dict__-based nodes.
+
+Each layout is measured in a fresh interpreter so that peak RSS is not
+inflated by the other run.  The __dict__ layout is rebuilt from the slotted
+classes by copying their methods onto plain classes.
+"""
+
+import gc
+import inspect
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import expression
+import parser
+import regex_scanner
+import scanner
+from parser import Parser
+from regex_scanner import RegexScanner
+
+UNIT = "(12.5 + 3 - 4 / 2) * -(7 - 1) * (1 >= 2) * !true * (nil == false)"
+
+
+def corpus(units: int) -> str:
+    return " * ".join([UNIT] * units)
+
+
+def unslotted(cls: type) -> type:
+    namespace = {
+        name: value
+        for name, value in vars(cls).items()
+        if name not in cls.__slots__ and name not in ("__slots__", "__dict__", "__weakref__")
+    }
+    return type(cls.__name__, (), namespace)
+
+
+def use_dict_layout() -> None:
+    for name, cls in vars(expression).items():
+        if inspect.isclass(cls) and issubclass(cls, expression.Expr) and cls is not expression.Expr:
+            if hasattr(parser, name):
+                setattr(parser, name, unslotted(cls))
+    token = unslotted(scanner.Token)
+    scanner.Token = token
+    regex_scanner.Token = token
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def measure(layout: str, units: int) -> dict[str, float]:
+    if layout == "dict":
+        use_dict_layout()
+    source = corpus(units)
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = Parser(RegexScanner(source, ignore).scan_tokens(), ignore).parse()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert tree is not None
+    return {
+        "parse_seconds": elapsed,
+        "retained_bytes": current,
+        "peak_traced_bytes": peak,
+        "allocated_blocks": sys.getallocatedblocks() - blocks,
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main(units: int) -> None:
+    root = Path(__file__).resolve().parent.parent
+    results = {}
+    for layout in ("dict", "slots"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.node_memory", "--child", layout, str(units)],
+            cwd=root,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[layout] = json.loads(output)
+
+    print(f"corpus: {len(corpus(units))} chars")
+    print(f"{'metric':<20} {'dict':>14} {'slots':>14} {'ratio':>7}")
+    for metric in results["dict"]:
+        old, new = results["dict"][metric], results["slots"][metric]
+        print(f"{metric:<20} {old:>14.6g} {new:>14.6g} {new / old:>7.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        print(json.dumps(measure(sys.argv[2], int(sys.argv[3]))))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
@@ -0,0 +1,60 @@
+"""
+ParallelScanner on a large source with 1 to N worker processes, against a
+sequential RegexScanner.scan_tokens.
+
+The corpus is the mixed one broken into lines after every "+", so chunks split
+between tokens as well as inside the strings that span lines.  Two times are
+shown per job count: scan_buffer, which only joins the columns the workers
+return, and scan_tokens, which also builds a Token object per token in the
+parent.  Building those costs about as much as scanning does, and the parent
+does it alone, so scan_tokens can at best about halve the sequential time while
+scan_buffer is bounded only by the cores and the pass over the strings.
+
+Run ``python -m benchmarks.parallel_scan [BYTES] [MAX_JOBS]``.
+"""
+
+import os
+import sys
+import time
+from typing import Callable
+
+from benchmarks.corpus import generate
+from parallel_scanner import ParallelScanner
+from regex_scanner import RegexScanner
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def timed(function: Callable[[], object]) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(size: int = 16 << 20, max_jobs: int | None = None) -> None:
+    source = generate("mixed", size).replace(" + ", " +\n")
+    sequential, tokens = timed(RegexScanner(source, ignore).scan_tokens)
+    expected = [(token.type, token.offset) for token in tokens]
+    del tokens
+    print(f"{len(source):,} chars, {len(expected):,} tokens, {os.cpu_count()} CPUs")
+    print(f"sequential scan_tokens {sequential:.2f} s")
+    print(f"{'jobs':>4} {'buffer s':>9} {'speedup':>8} {'tokens s':>9} {'speedup':>8}")
+    for jobs in range(1, (max_jobs or os.cpu_count() or 1) + 1):
+        buffered, buffer = timed(ParallelScanner(source, ignore, jobs).scan_buffer)
+        assert list(zip(buffer.types, buffer.starts, strict=True)) == expected
+        del buffer
+        listed, tokens = timed(ParallelScanner(source, ignore, jobs).scan_tokens)
+        assert [(token.type, token.offset) for token in tokens] == expected
+        del tokens
+        print(
+            f"{jobs:>4} {buffered:>9.2f} {sequential / buffered:>7.2f}x {listed:>9.2f} {sequential / listed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 16 << 20,
+        int(sys.argv[2]) if len(sys.argv) > 2 else None,
+    )
@@ -0,0 +1,37 @@
+"""
+Parser throughput in tokens per second on pre-scanned token lists, for the
+recursive mode and the iterative one.
+"""
+
+import sys
+import time
+
+from parser import Parser
+from regex_scanner import RegexScanner
+
+CORPORA = {
+    "arithmetic": "(12.5 + 3 - 4 / 2) * -(7 - 1) * (1 >= 2) * !true * (nil == false)",
+    "literals": '1 == "a" != nil == true != false == 2.5',
+    "term chain": " + ".join(str(n) for n in range(50)),
+}
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def main(units: int = 2_000, repeat: int = 5) -> None:
+    print(f"{'corpus':<12} {'mode':<10} {'tokens':>9} {'best s':>8} {'tokens/s':>12}")
+    for name, unit in CORPORA.items():
+        tokens = RegexScanner(" * ".join([f"({unit})"] * units), ignore).scan_tokens()
+        for mode, iterative in (("recursive", False), ("iterative", True)):
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                assert Parser(tokens, ignore, iterative).parse() is not None
+                best = min(best, time.perf_counter() - start)
+            print(f"{name:<12} {mode:<10} {len(tokens):>9} {best:>8.4f} {len(tokens) / best:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
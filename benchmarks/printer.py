@@ -0,0 +1,93 @@
+"""
+AstPrinter on trees of about 100k nodes, against the recursive printer it replaced.
+
+"balanced" is a full binary tree of Binary nodes, "corpus" is the parsed mixed
+corpus of the suite, and "chain" alternates Grouping and Unary all the way
+down, which the recursive printer cannot print at all.  The table shows ns per
+node for both printers and the speedup; a dash marks a RecursionError.
+"""
+
+import sys
+from functools import partial
+
+from ast_printer import AstPrinter
+from benchmarks.backends import best_of
+from benchmarks.corpus import generate
+from expression import Binary, Expr, Grouping, Literal, Unary, Variable
+from optimizer import count_nodes
+from parser import Parser
+from scanner import Scanner, Token, TokenType
+
+PLUS = Token(TokenType.PLUS, "+", None, 1)
+MINUS = Token(TokenType.MINUS, "-", None, 1)
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+class RecursivePrinter:
+    """The printer before it used an explicit stack, with Variable added for the corpus."""
+
+    def print(self, expr: Expr) -> str:
+        return expr.accept(self)
+
+    def visit_binary_expr(self, expr: Binary) -> str:
+        return self.parenthasize(expr.operator.lexeme, expr.left, expr.right)
+
+    def visit_grouping_expr(self, expr: Grouping) -> str:
+        return self.parenthasize("group", expr.expression)
+
+    def visit_literal_expr(self, expr: Literal) -> str:
+        return "nil" if expr.value is None else f"{expr.value}"
+
+    def visit_unary_expr(self, expr: Unary) -> str:
+        return self.parenthasize(expr.operator.lexeme, expr.right)
+
+    def visit_variable_expr(self, expr: Variable) -> str:
+        return expr.name.lexeme
+
+    def parenthasize(self, name: str, *exprs: Expr) -> str:
+        return f"({name}{''.join(map(lambda expr: f' {expr.accept(self)}', exprs))})"
+
+
+def balanced(nodes: int) -> Expr:
+    level: list[Expr] = [Literal(float(index)) for index in range((nodes + 1) // 2)]
+    while len(level) > 1:
+        pairs = [Binary(level[index], PLUS, level[index + 1]) for index in range(0, len(level) - 1, 2)]
+        level = pairs + level[len(pairs) * 2 :]
+    return level[0]
+
+
+def chain(nodes: int) -> Expr:
+    expr: Expr = Literal(1.0)
+    for depth in range(nodes - 1):
+        expr = Grouping(expr) if depth % 2 else Unary(MINUS, expr)
+    return expr
+
+
+def corpus(nodes: int) -> Expr:
+    # The mixed corpus averages about one node per ten bytes.
+    return Parser(Scanner(generate("mixed", nodes * 10), ignore).scan_tokens(), ignore).parse()
+
+
+def main(nodes: int = 100_000, number: int = 3) -> None:
+    print(f"{'tree':<10}{'nodes':>9}{'recursive ns':>14}{'stack ns':>10}{'speedup':>9}")
+    for name, build in (("balanced", balanced), ("corpus", corpus), ("chain", chain)):
+        tree = build(nodes)
+        count = count_nodes(tree)
+        printer = AstPrinter()
+        assert name != "balanced" or printer.print(tree) == RecursivePrinter().print(tree)
+        stack = best_of(partial(printer.print, tree), number)
+        try:
+            recursive = best_of(partial(RecursivePrinter().print, tree), number)
+        except RecursionError:
+            print(f"{name:<10}{count:>9}{'-':>14}{stack * 1e9 / count:>10.1f}{'-':>9}")
+            continue
+        print(
+            f"{name:<10}{count:>9}{recursive * 1e9 / count:>14.1f}{stack * 1e9 / count:>10.1f}{recursive / stack:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
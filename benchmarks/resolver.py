@@ -0,0 +1,65 @@
+"""
+Measure what static resolution saves on variable-heavy expressions.
+
+Each script reads and assigns globals many times.  Every backend evaluates it
+once with names looked up in the environment's dict and once with the
+Resolver's slot table applied; the table shows ns per node for both and the
+speedup.
+"""
+
+import sys
+from typing import Callable
+
+from benchmarks.backends import best_of, parse
+from bytecode import Compiler
+from closure_compiler import ClosureCompiler, ClosureInterpreter
+from expression import Expr
+from interpreter import Interpreter
+from optimizer import count_nodes
+from resolver import Resolver
+from vm import VM
+
+NAMES = ("alpha", "beta", "gamma", "delta")
+
+SCRIPTS = {
+    "reads": " + ".join(["alpha * beta - gamma / delta"] * 50),
+    "assignments": " and ".join(["(alpha = beta + 1)", "(beta = gamma * 2)", "(gamma = alpha - delta)"] * 30),
+    "mixed": " + ".join(["(delta = alpha * alpha + beta * beta) - gamma * delta"] * 40),
+}
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def prepare(backend: str, expr: Expr, resolved: bool) -> Callable[[], object]:
+    runner = {"ast": Interpreter, "vm": VM, "closure": ClosureInterpreter}[backend](ignore)
+    for value, name in enumerate(NAMES, 1):
+        runner.globals.define(name, float(value))
+    if resolved:
+        runner.resolve(Resolver(runner.globals, ignore).resolve(expr))
+    if backend == "ast":
+        return lambda: runner.evaluate(expr)
+    if backend == "vm":
+        chunk = Compiler(runner.locals).compile(expr)
+        return lambda: runner.run(chunk)
+    compiled = ClosureCompiler(runner).compile(expr)
+    environment = runner.globals
+    return lambda: compiled(environment)
+
+
+def main(number: int = 300) -> None:
+    print(f"{'script':<12}{'backend':<9}{'nodes':>6}{'names ns/node':>15}{'slots ns/node':>15}{'speedup':>9}")
+    for script, source in SCRIPTS.items():
+        expr = parse(source)
+        nodes = count_nodes(expr)
+        for backend in ("ast", "vm", "closure"):
+            by_name = best_of(prepare(backend, expr, False), number) * 1e9 / nodes
+            by_slot = best_of(prepare(backend, expr, True), number) * 1e9 / nodes
+            print(
+                f"{script:<12}{backend:<9}{nodes:>6}{by_name:>15.1f}{by_slot:>15.1f}{by_name / by_slot:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,67 @@
+"""
+Loading serialized trees and tokens against scanning and parsing the source.
+
+For each corpus the table shows the size of the source, of the serialized tree
+and of a pickle of the same tree, then the best time to rebuild the tree by
+scan+parse, by serializer.loads and by pickle.loads, and the same comparison
+for the token stream alone.
+"""
+
+import pickle
+import sys
+from functools import partial
+
+from benchmarks.backends import best_of
+from parser import Parser
+from regex_scanner import RegexScanner
+from serializer import dumps, dumps_tokens, loads, loads_tokens
+
+CORPORA = {
+    "arithmetic": "(12.5 + 3 - 4 / 2) * -(7 - 1) * (1 >= 2) * !true * (nil == false)",
+    "variables": "(alpha = beta * gamma) + delta / (epsilon - alpha) * beta",
+    "calls": 'clock(a.b, "text", f(1, 2)(g)) == super.method or this.field',
+}
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def scan(source: str) -> object:
+    return RegexScanner(source, ignore).scan_tokens()
+
+
+def scan_parse(source: str) -> object:
+    return Parser(RegexScanner(source, ignore).scan_tokens(), ignore).parse()
+
+
+def main(units: int = 500, number: int = 5) -> None:
+    print(
+        f"{'corpus':<12}{'src KB':>8}{'ser KB':>8}{'pkl KB':>8}"
+        f"{'parse ms':>10}{'loads ms':>10}{'pickle ms':>11}{'x parse':>9}"
+        f"{'scan ms':>10}{'tokens ms':>11}{'x scan':>8}"
+    )
+    for name, unit in CORPORA.items():
+        # Groups of ten keep the tree shallow enough for pickle's recursion.
+        group = "(" + " + ".join([f"({unit})"] * 10) + ")"
+        source = "\n* ".join([group] * (units // 10))
+
+        expr = scan_parse(source)
+        tokens = RegexScanner(source, ignore).scan_tokens()
+        data = dumps(expr)
+        pickled = pickle.dumps(expr)
+        token_data = dumps_tokens(tokens)
+        parse_time = best_of(partial(scan_parse, source), number)
+        loads_time = best_of(partial(loads, data), number)
+        pickle_time = best_of(partial(pickle.loads, pickled), number)
+        scan_time = best_of(partial(scan, source), number)
+        tokens_time = best_of(partial(loads_tokens, token_data), number)
+        print(
+            f"{name:<12}{len(source) / 1024:>8.1f}{len(data) / 1024:>8.1f}{len(pickled) / 1024:>8.1f}"
+            f"{parse_time * 1e3:>10.2f}{loads_time * 1e3:>10.2f}{pickle_time * 1e3:>11.2f}{parse_time / loads_time:>9.2f}"
+            f"{scan_time * 1e3:>10.2f}{tokens_time * 1e3:>11.2f}{scan_time / tokens_time:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,92 @@
+"""
+Load test for plox --serve: many sessions at once, each sending a series of
+programs and waiting for every reply before it sends the next.
+
+Starts a server on a temporary Unix socket unless an address is given.  Every
+session sends short programs, which the server runs on its event loop, and one
+long one, which it hands to its worker pool.  The latencies of the short
+requests show whether the long ones stall the loop.  A server started with
+--transpile, given as ADDRESS, runs every request in its pool.
+
+    python -m benchmarks.serve_load [SESSIONS] [ADDRESS]
+"""
+
+import asyncio
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from plox import server_address
+
+SHORT = ("1 + 2 * 3", '"a" + "b"', "clock() > 0", "clock = clock", "(1 +", "-nil", "!(1 < 2) == false")
+LONG = " + ".join(["((1 + 2) * 3 - 4 / 2) * ((5 - 6) * 7 + 8 / 4)"] * 25)
+REQUESTS = 10
+
+
+async def connect(address: str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    where = server_address(address)
+    if isinstance(where, tuple):
+        return await asyncio.open_connection(*where, limit=1 << 20)
+    return await asyncio.open_unix_connection(where, limit=1 << 20)
+
+
+async def session(address: str, seed: int, latencies: dict[str, list[float]]) -> None:
+    rng = random.Random(seed)
+    requests = [rng.choice(SHORT) for _ in range(REQUESTS - 1)]
+    requests.insert(rng.randrange(REQUESTS), LONG)
+    reader, writer = await connect(address)
+    for request in requests:
+        start = time.perf_counter()
+        writer.write(request.encode() + b"\n")
+        response = json.loads(await reader.readline())
+        latencies["long" if request is LONG else "short"].append(time.perf_counter() - start)
+        assert response["status"] in (0, 65, 70), response
+    writer.close()
+
+
+async def load(address: str, sessions: int) -> None:
+    latencies: dict[str, list[float]] = {"short": [], "long": []}
+    start = time.perf_counter()
+    await asyncio.gather(*(session(address, seed, latencies) for seed in range(sessions)))
+    elapsed = time.perf_counter() - start
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{sessions} sessions, {total} requests in {elapsed:.2f} s ({total / elapsed:,.0f} requests/s)")
+    print(f"{'requests':<9} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, samples in (("all", latencies["short"] + latencies["long"]), *latencies.items()):
+        p99 = statistics.quantiles(samples, n=100)[98]
+        print(
+            f"{name:<9} {len(samples):>7} {statistics.median(samples) * 1e3:>8.2f} "
+            f"{p99 * 1e3:>8.2f} {max(samples) * 1e3:>8.2f}"
+        )
+
+
+def main(sessions: int = 1_000, address: str | None = None) -> None:
+    if address is not None:
+        asyncio.run(load(address, sessions))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        address = os.path.join(directory, "plox.sock")
+        plox = Path(__file__).resolve().parent.parent / "src" / "plox.py"
+        server = subprocess.Popen(
+            [sys.executable, str(plox), "--serve", address, "--jobs", str(os.cpu_count() or 1)],
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            # The server announces itself once it is listening.
+            print(server.stderr.readline(), end="")
+            asyncio.run(load(address, sessions))
+        finally:
+            server.send_signal(signal.SIGINT)
+            server.wait()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,237 @@
+"""
+Front-end benchmark suite with stored baselines.
+
+Times Scanner.scan_tokens, my_lexer.get_tokens, Parser.parse (on pre-scanned
+tokens) and AstPrinter.print (on pre-parsed trees) on every generated corpus,
+and reports the best of several runs in nanoseconds per source byte.
+
+    python -m benchmarks.suite run [--save NAME]
+    python -m benchmarks.suite compare NAME [--against NAME] [--threshold 0.1]
+
+Baselines are JSON files in benchmarks/baselines/; a NAME without a directory
+or suffix refers to one of those.  compare runs the suite, or loads --against,
+and exits with status 1 if any case got slower than the baseline by more than
+the threshold plus the spread between rounds the two runs saw for it.
+
+Every run records the machine and Python it was timed on, and compare refuses,
+with status 2, to set runs from two different ones against each other unless
+given --any-machine: the threshold is meant for the noise between runs on one
+machine, not the gap between two.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from ast_printer import AstPrinter
+from benchmarks.corpus import UNITS, generate
+from my_lexer import get_tokens
+from parser import Parser
+from scanner import Scanner
+
+BASELINES = Path(__file__).resolve().parent / "baselines"
+DEFAULT_SIZE = 100_000
+DEFAULT_REPEAT = 7
+MIN_ROUND = 0.02
+DEFAULT_THRESHOLD = 0.10
+
+
+# Keys of a run that describe where it was timed.
+FINGERPRINT = ("python", "implementation", "machine", "system", "processor", "cpus")
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def processor() -> str:
+    # platform.processor() is empty on most Linux systems.
+    try:
+        with open("/proc/cpuinfo") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.partition(":")[2].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def fingerprint() -> dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def cases(size: int) -> dict[str, tuple[int, Callable[[], object]]]:
+    """Each case maps to the size of its corpus and a callable that runs it once."""
+    found = {}
+    for kind in UNITS:
+        source = generate(kind, size)
+        tokens = Scanner(source, ignore).scan_tokens()
+        tree = Parser(tokens, ignore).parse()
+        found[f"scanner/{kind}"] = (len(source), lambda source=source: Scanner(source, ignore).scan_tokens())
+        found[f"my_lexer/{kind}"] = (len(source), lambda source=source: get_tokens(source))
+        found[f"parser/{kind}"] = (len(source), lambda tokens=tokens: Parser(tokens, ignore).parse())
+        found[f"printer/{kind}"] = (len(source), lambda tree=tree: AstPrinter().print(tree))
+    return found
+
+
+def calibrate(function: Callable[[], object]) -> int:
+    """Returns how many calls of function make a round of at least MIN_ROUND seconds."""
+    start = time.perf_counter()
+    function()
+    return max(1, int(MIN_ROUND / max(time.perf_counter() - start, 1e-9)))
+
+
+def run(size: int = DEFAULT_SIZE, repeat: int = DEFAULT_REPEAT) -> dict:
+    selected = cases(size)
+    numbers = {name: calibrate(function) for name, (_, function) in selected.items()}
+    rounds: dict[str, list[float]] = {name: [] for name in selected}
+    # Rounds go over all cases in turn, so a slow spell on a shared machine
+    # hits every case once instead of one case in every round.  Collections
+    # triggered by earlier cases' garbage would otherwise land on whichever
+    # case happens to be running.
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for name, (_, function) in selected.items():
+                number = numbers[name]
+                start = time.perf_counter()
+                for _ in range(number):
+                    function()
+                rounds[name].append((time.perf_counter() - start) / number)
+    finally:
+        gc.enable()
+    results = {}
+    for name, (length, _) in selected.items():
+        best, *others = sorted(rounds[name])
+        results[name] = {
+            "bytes": length,
+            "seconds": best,
+            "ns_per_byte": best * 1e9 / length,
+            # How far the runner-up round fell behind the best one, which is
+            # about how far the best round itself moves between runs.
+            "spread": others[0] / best - 1 if others else 0.0,
+        }
+    return {
+        **fingerprint(),
+        "size": size,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def baseline_path(name: str) -> Path:
+    path = Path(name)
+    if path.suffix or len(path.parts) > 1:
+        return path
+    return BASELINES / f"{name}.json"
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float, write: Callable[[str], object] = print
+) -> list[str]:
+    """
+    Prints both runs side by side and returns the cases that regressed by more
+    than threshold plus the spread of the case in both runs.
+    """
+    regressions = []
+    write(f"{'case':<24}{'base ns/B':>11}{'now ns/B':>11}{'change':>9}{'limit':>8}")
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            write(f"{name:<24}{'-':>11}{result['ns_per_byte']:>11.2f}{'new':>9}")
+            continue
+        change = result["ns_per_byte"] / old["ns_per_byte"] - 1
+        limit = threshold + old.get("spread", 0.0) + result.get("spread", 0.0)
+        flag = ""
+        if change > limit:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        write(
+            f"{name:<24}{old['ns_per_byte']:>11.2f}{result['ns_per_byte']:>11.2f}{change:>+9.1%}{limit:>8.1%}{flag}"
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite", description="Front-end benchmark suite."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_command = commands.add_parser("run", help="run the suite and print the results")
+    run_command.add_argument("--save", metavar="NAME", help="also store the results as a baseline")
+    compare_command = commands.add_parser("compare", help="compare against a stored baseline")
+    compare_command.add_argument("baseline", metavar="NAME")
+    compare_command.add_argument(
+        "--against", metavar="NAME", help="a stored run to compare instead of a fresh one"
+    )
+    compare_command.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown on top of the spread, 0.1 is 10%%",
+    )
+    compare_command.add_argument(
+        "--any-machine", action="store_true", help="compare runs timed on different machines anyway"
+    )
+    for command in (run_command, compare_command):
+        command.add_argument("--size", type=int, default=DEFAULT_SIZE, help="bytes per corpus")
+        command.add_argument(
+            "--repeat", type=int, default=DEFAULT_REPEAT, help="runs per case; the best counts"
+        )
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == "run":
+        current = run(arguments.size, arguments.repeat)
+        print(f"{'case':<24}{'bytes':>9}{'best ms':>10}{'ns/B':>8}")
+        for name, result in current["results"].items():
+            print(
+                f"{name:<24}{result['bytes']:>9}{result['seconds'] * 1e3:>10.2f}{result['ns_per_byte']:>8.2f}"
+            )
+        if arguments.save:
+            path = baseline_path(arguments.save)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(current, indent=2) + "\n")
+            print(f"Saved {path}")
+        return 0
+
+    baseline = json.loads(baseline_path(arguments.baseline).read_text())
+    if arguments.against:
+        current = json.loads(baseline_path(arguments.against).read_text())
+    else:
+        current = fingerprint()
+    differences = [key for key in FINGERPRINT if baseline.get(key) != current.get(key)]
+    if differences:
+        for key in differences:
+            print(f"{key}: baseline {baseline.get(key)!r}, now {current.get(key)!r}", file=sys.stderr)
+        if not arguments.any_machine:
+            print(
+                "The baseline was timed on another machine; pass --any-machine to compare anyway.",
+                file=sys.stderr,
+            )
+            return 2
+    if not arguments.against:
+        current = run(baseline["size"], arguments.repeat)
+    regressions = compare(baseline, current, arguments.threshold)
+    if regressions:
+        print(f"{len(regressions)} of {len(current['results'])} cases regressed by more than their limit.")
+        return 1
+    print("No case regressed by more than its limit.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Bytes per token held by a list of Token objects versus a TokenBuffer.
+"""
+
+import gc
+import sys
+import tracemalloc
+from typing import Callable
+
+from regex_scanner import RegexScanner
+from token_buffer import scan_buffer
+
+LINE = 'var total = (count + 12.5) * rate; // running total\nprint "label" != nil and flag;\n'
+
+
+def traced(build: Callable[[], object]) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def ignore(offset: int, message: str) -> None:
+    pass
+
+
+def main(repeat: int = 20_000) -> None:
+    source = LINE * repeat
+    tokens, list_bytes = traced(lambda: RegexScanner(source, ignore).scan_tokens())
+    count = len(tokens)
+    del tokens
+    buffer, buffer_bytes = traced(lambda: scan_buffer(source, ignore))
+    assert len(buffer) == count
+
+    print(f"tokens: {count}  source: {len(source)} chars")
+    print(f"list[Token]  : {list_bytes / count:8.1f} bytes/token")
+    print(f"TokenBuffer  : {buffer_bytes / count:8.1f} bytes/token")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
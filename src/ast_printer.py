@@ -1,3 +1,14 @@
+"""
+Prints expressions as Lisp-like text, e.g. ``(* (- 123) (group 45.67))``.
+
+The printer walks the tree with an explicit stack instead of recursing, so
+trees of any depth print in time linear in the output, and it collects the
+text in a buffer that goes to the stream in large writes.
+"""
+
+import io
+from typing import TextIO
+
 from expression import (
     Assign,
     Binary,
@@ -12,59 +23,86 @@ from expression import (
     This,
     Unary,
     Variable,
-    Visitor,
 )
 from scanner import Token, TokenType
 
+# Pieces held back before a write to the stream.
+FLUSH_PIECES = 4096
 
-class AstPrinter(Visitor[str]):
-    def print(self, expr: Expr) -> str:
-        return expr.accept(self)
-
-    def visit_binary_expr(self, expr: Binary) -> str:
-        return self.parenthasize(expr.operator.lexeme, expr.left, expr.right)
-
-    def visit_grouping_expr(self, expr: Grouping) -> str:
-        return self.parenthasize("group", expr.expression)
-
-    def visit_literal_expr(self, expr: Literal) -> str:
-        return "nil" if not expr.value else f"{expr.value}"
-
-    def visit_unary_expr(self, expr: Unary) -> str:
-        return self.parenthasize(expr.operator.lexeme, expr.right)
-
-    def visit_assign_expr(self, expr: Assign) -> str:
-        raise NotImplementedError
 
-    def visit_call_expr(self, expr: Call) -> str:
-        raise NotImplementedError
-
-    def visit_get_expr(self, expr: Get) -> str:
-        raise NotImplementedError
-
-    def visit_logical_expr(self, expr: Logical) -> str:
-        raise NotImplementedError
-
-    def visit_set_expr(self, expr: Set) -> str:
-        raise NotImplementedError
-
-    def visit_super_expr(self, expr: Super) -> str:
-        raise NotImplementedError
-
-    def visit_this_expr(self, expr: This) -> str:
-        raise NotImplementedError
-
-    def visit_variable_expr(self, expr: Variable) -> str:
-        raise NotImplementedError
-
-    def parenthasize(self, name: str, *exprs: Expr) -> str:
-        return f"({name}{''.join(map(lambda expr: f' {expr.accept(self)}', exprs))})"
+class AstPrinter:
+    def print(self, expr: Expr) -> str:
+        out = io.StringIO()
+        self.write(expr, out)
+        return out.getvalue()
+
+    def write(self, expr: Expr, out: TextIO) -> None:
+        buffer: list[str] = []
+        text = buffer.append
+        pending: list[str | Expr] = [expr]
+        push = pending.append
+        while pending:
+            node = pending.pop()
+            cls = node.__class__
+            # Opening text goes straight to the buffer; the rest of the node
+            # is pushed in reverse, children as expressions, closing text as str.
+            if cls is str:
+                text(node)
+            elif cls is Binary or cls is Logical:
+                text(f"({node.operator.lexeme} ")
+                push(")")
+                push(node.right)
+                push(" ")
+                push(node.left)
+            elif cls is Literal:
+                text("nil" if node.value is None else f"{node.value}")
+            elif cls is Variable:
+                text(node.name.lexeme)
+            elif cls is Grouping:
+                text("(group ")
+                push(")")
+                push(node.expression)
+            elif cls is Unary:
+                text(f"({node.operator.lexeme} ")
+                push(")")
+                push(node.right)
+            elif cls is Assign:
+                text(f"(= {node.name.lexeme} ")
+                push(")")
+                push(node.value)
+            elif cls is Call:
+                text("(call ")
+                push(")")
+                for argument in reversed(node.arguments):
+                    push(argument)
+                    push(" ")
+                push(node.callee)
+            elif cls is Get:
+                text("(. ")
+                push(f" {node.name.lexeme})")
+                push(node.object)
+            elif cls is Set:
+                text("(= (. ")
+                push(")")
+                push(node.value)
+                push(f" {node.name.lexeme}) ")
+                push(node.object)
+            elif cls is Super:
+                text(f"(super {node.method.lexeme})")
+            elif cls is This:
+                text("this")
+            else:
+                raise TypeError(f"Cannot print {cls.__name__}.")
+            if len(buffer) >= FLUSH_PIECES:
+                out.write("".join(buffer))
+                buffer.clear()
+        out.write("".join(buffer))
 
 
 if __name__ == "__main__":
     expression = Binary(
-        Unary(Token(TokenType.MINUS, "-", None, 1), Literal(123)),
-        Token(TokenType.STAR, "*", None, 1),
+        Unary(Token(TokenType.MINUS, "-", None, 0), Literal(123)),
+        Token(TokenType.STAR, "*", None, 0),
         Grouping(Literal(45.67)),
     )
     print(AstPrinter().print(expression))
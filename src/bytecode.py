@@ -0,0 +1,242 @@
+"""
+Compiler from Expr trees to a compact stack-machine bytecode.
+
+A Chunk holds the code as an array of unsigned 16-bit words, a constant pool,
+and the token of every instruction that can fail at run time so errors still
+report a line.  Each opcode takes one word and each operand one more, so the
+VM decodes an operand with a single index instead of reassembling bytes.
+"""
+
+from array import array
+from enum import IntEnum
+from typing import Callable
+
+from expression import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+    Visitor,
+)
+from scanner import Token, TokenType
+
+
+class OpCode(IntEnum):
+    CONSTANT = 1
+    NIL = 2
+    TRUE = 3
+    FALSE = 4
+    POP = 5
+    GET_GLOBAL = 6
+    SET_GLOBAL = 7
+    GET_PROPERTY = 8
+    EQUAL = 9
+    NOT_EQUAL = 10
+    GREATER = 11
+    GREATER_EQUAL = 12
+    LESS = 13
+    LESS_EQUAL = 14
+    ADD = 15
+    SUBTRACT = 16
+    MULTIPLY = 17
+    DIVIDE = 18
+    NOT = 19
+    NEGATE = 20
+    JUMP_IF_FALSE_OR_POP = 21
+    JUMP_IF_TRUE_OR_POP = 22
+    CALL = 23
+    RAISE = 24
+    RETURN = 25
+    GET_SLOT = 26
+    SET_SLOT = 27
+
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+}
+
+UNARY_OPCODES = {TokenType.MINUS: OpCode.NEGATE, TokenType.BANG: OpCode.NOT}
+
+MAX_OPERAND = 0xFFFF
+
+
+class CompileError(Exception):
+    pass
+
+
+class Chunk:
+    def __init__(self) -> None:
+        self.code = array("H")
+        self.constants: list[object] = []
+        self.tokens: dict[int, Token] = {}
+        self.__constant_indexes: dict[tuple[type, object], int] = {}
+
+    def write(self, opcode: OpCode, token: Token | None = None) -> int:
+        offset = len(self.code)
+        self.code.append(opcode)
+        if token is not None:
+            self.tokens[offset] = token
+        return offset
+
+    def write_operand(self, operand: int) -> None:
+        self.code.append(operand)
+
+    def add_constant(self, value: object) -> int:
+        # Keyed by type as well, since 1.0 == True would otherwise share a slot,
+        # and by repr for floats so that 0.0 and -0.0 stay apart.
+        key = (float, repr(value)) if type(value) is float else (type(value), value)
+        index = self.__constant_indexes.get(key)
+        if index is None:
+            index = len(self.constants)
+            if index > MAX_OPERAND:
+                raise CompileError("Too many constants in one chunk.")
+            self.constants.append(value)
+            self.__constant_indexes[key] = index
+        return index
+
+
+class Compiler(Visitor[None]):
+    def __init__(self, locations: dict[Expr, tuple[int, int]] | None = None) -> None:
+        # Variables the Resolver placed in a global slot are addressed by slot
+        # number; any others fall back to lookups by name.
+        self.locations = locations or {}
+
+    def compile(self, expression: Expr) -> Chunk:
+        self.chunk = Chunk()
+        expression.accept(self)
+        self.chunk.write(OpCode.RETURN)
+        return self.chunk
+
+    def __emit_constant(self, opcode: OpCode, value: object, token: Token | None = None) -> None:
+        index = self.chunk.add_constant(value)
+        self.chunk.write(opcode, token)
+        self.chunk.write_operand(index)
+
+    def __emit_jump(self, opcode: OpCode) -> int:
+        self.chunk.write(opcode)
+        self.chunk.write_operand(0)
+        return len(self.chunk.code) - 1
+
+    def __patch_jump(self, operand: int) -> None:
+        # Jumps are relative to the instruction that follows the operand.
+        distance = len(self.chunk.code) - operand - 1
+        if distance > MAX_OPERAND:
+            raise CompileError("Too much code to jump over.")
+        self.chunk.code[operand] = distance
+
+    def visit_assign_expr(self, expr: Assign) -> None:
+        expr.value.accept(self)
+        location = self.locations.get(expr)
+        if location is not None and location[0] == 0:
+            self.chunk.write(OpCode.SET_SLOT, expr.name)
+            self.chunk.write_operand(location[1])
+        else:
+            self.__emit_constant(OpCode.SET_GLOBAL, expr.name.lexeme, expr.name)
+
+    def visit_binary_expr(self, expr: Binary) -> None:
+        expr.left.accept(self)
+        expr.right.accept(self)
+        self.chunk.write(BINARY_OPCODES[expr.operator.type], expr.operator)
+
+    def visit_call_expr(self, expr: Call) -> None:
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+        self.chunk.write(OpCode.CALL, expr.paren)
+        self.chunk.write_operand(len(expr.arguments))
+
+    def visit_get_expr(self, expr: Get) -> None:
+        expr.object.accept(self)
+        self.__emit_constant(OpCode.GET_PROPERTY, expr.name.lexeme, expr.name)
+
+    def visit_grouping_expr(self, expr: Grouping) -> None:
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal) -> None:
+        if expr.value is None:
+            self.chunk.write(OpCode.NIL)
+        elif expr.value is True:
+            self.chunk.write(OpCode.TRUE)
+        elif expr.value is False:
+            self.chunk.write(OpCode.FALSE)
+        else:
+            self.__emit_constant(OpCode.CONSTANT, expr.value)
+
+    def visit_logical_expr(self, expr: Logical) -> None:
+        expr.left.accept(self)
+        # The jump leaves the left operand on the stack as the result; otherwise
+        # the same instruction pops it and the right operand takes its place.
+        opcode = (
+            OpCode.JUMP_IF_TRUE_OR_POP if expr.operator.type == TokenType.OR else OpCode.JUMP_IF_FALSE_OR_POP
+        )
+        end = self.__emit_jump(opcode)
+        expr.right.accept(self)
+        self.__patch_jump(end)
+
+    def visit_set_expr(self, expr: Set) -> None:
+        # There are no instances yet, so like the tree walker this evaluates the
+        # object and then fails before the value is evaluated.
+        expr.object.accept(self)
+        self.__emit_constant(OpCode.RAISE, "Only instances have fields.", expr.name)
+
+    def visit_super_expr(self, expr: Super) -> None:
+        self.__emit_constant(OpCode.RAISE, "Can't use 'super' outside of a class.", expr.keyword)
+
+    def visit_this_expr(self, expr: This) -> None:
+        self.__emit_constant(OpCode.RAISE, "Can't use 'this' outside of a class.", expr.keyword)
+
+    def visit_unary_expr(self, expr: Unary) -> None:
+        expr.right.accept(self)
+        self.chunk.write(UNARY_OPCODES[expr.operator.type], expr.operator)
+
+    def visit_variable_expr(self, expr: Variable) -> None:
+        location = self.locations.get(expr)
+        if location is not None and location[0] == 0:
+            self.chunk.write(OpCode.GET_SLOT, expr.name)
+            self.chunk.write_operand(location[1])
+        else:
+            self.__emit_constant(OpCode.GET_GLOBAL, expr.name.lexeme, expr.name)
+
+
+def disassemble(chunk: Chunk, write: Callable[[str], object] = print) -> None:
+    code = chunk.code
+    offset = 0
+    while offset < len(code):
+        opcode = OpCode(code[offset])
+        if opcode in (OpCode.JUMP_IF_FALSE_OR_POP, OpCode.JUMP_IF_TRUE_OR_POP):
+            write(f"{offset:04d} {opcode.name:<16} -> {offset + 2 + code[offset + 1]:04d}")
+            offset += 2
+        elif opcode in (
+            OpCode.CONSTANT,
+            OpCode.GET_GLOBAL,
+            OpCode.SET_GLOBAL,
+            OpCode.GET_PROPERTY,
+            OpCode.RAISE,
+        ):
+            index = code[offset + 1]
+            write(f"{offset:04d} {opcode.name:<16} {index:4d} {chunk.constants[index]!r}")
+            offset += 2
+        elif opcode in (OpCode.CALL, OpCode.GET_SLOT, OpCode.SET_SLOT):
+            write(f"{offset:04d} {opcode.name:<16} {code[offset + 1]:4d}")
+            offset += 2
+        else:
+            write(f"{offset:04d} {opcode.name}")
+            offset += 1
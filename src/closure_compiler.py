@@ -0,0 +1,271 @@
+"""
+Backend that compiles each Expr node once into a specialized Python closure.
+
+Operators and variable names are resolved while compiling, so running the
+result makes no visitor dispatch and no TokenType comparisons; each node costs
+one call of its closure.
+"""
+
+from typing import Callable
+
+from expression import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+    Visitor,
+)
+from interpreter import (
+    BINARY_OPERATIONS,
+    Clock,
+    Environment,
+    LoxCallable,
+    LoxRuntimeError,
+    is_equal,
+    is_truthy,
+)
+from scanner import TokenType
+
+Compiled = Callable[[Environment], object]
+
+
+def constant(value: object) -> Compiled:
+    return lambda environment: value
+
+
+def fail(token: object, message: str) -> Compiled:
+    def raise_error(environment: Environment) -> object:
+        raise LoxRuntimeError(token, message)
+
+    return raise_error
+
+
+class ClosureCompiler(Visitor[Compiled]):
+    def __init__(self, interpreter: "ClosureInterpreter") -> None:
+        # Passed on to native functions, which receive the running interpreter.
+        self.interpreter = interpreter
+        self.locations = interpreter.locals
+
+    def compile(self, expression: Expr) -> Compiled:
+        return expression.accept(self)
+
+    def visit_assign_expr(self, expr: Assign) -> Compiled:
+        value = expr.value.accept(self)
+        name = expr.name
+        location = self.locations.get(expr)
+        if location is not None:
+            depth, slot = location
+            if depth == 0:
+
+                def assign_local(environment: Environment) -> object:
+                    result = environment.slots[slot] = value(environment)
+                    return result
+
+                return assign_local
+
+            def assign_slot(environment: Environment) -> object:
+                result = value(environment)
+                environment.assign_at(depth, slot, result)
+                return result
+
+            return assign_slot
+
+        def assign(environment: Environment) -> object:
+            result = value(environment)
+            environment.assign(name, result)
+            return result
+
+        return assign
+
+    def visit_binary_expr(self, expr: Binary) -> Compiled:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        operator = expr.operator
+        checked = BINARY_OPERATIONS[operator.type]
+        match operator.type:
+            case TokenType.PLUS:
+
+                def plus(environment: Environment) -> object:
+                    a = left(environment)
+                    b = right(environment)
+                    if a.__class__ is float and b.__class__ is float:
+                        return a + b
+                    return checked(operator, a, b)
+
+                return plus
+            case TokenType.MINUS:
+
+                def minus(environment: Environment) -> object:
+                    a = left(environment)
+                    b = right(environment)
+                    if a.__class__ is float and b.__class__ is float:
+                        return a - b
+                    return checked(operator, a, b)
+
+                return minus
+            case TokenType.STAR:
+
+                def times(environment: Environment) -> object:
+                    a = left(environment)
+                    b = right(environment)
+                    if a.__class__ is float and b.__class__ is float:
+                        return a * b
+                    return checked(operator, a, b)
+
+                return times
+            case TokenType.LESS:
+
+                def less(environment: Environment) -> object:
+                    a = left(environment)
+                    b = right(environment)
+                    if a.__class__ is float and b.__class__ is float:
+                        return a < b
+                    return checked(operator, a, b)
+
+                return less
+            case TokenType.GREATER:
+
+                def greater(environment: Environment) -> object:
+                    a = left(environment)
+                    b = right(environment)
+                    if a.__class__ is float and b.__class__ is float:
+                        return a > b
+                    return checked(operator, a, b)
+
+                return greater
+            case TokenType.EQUAL_EQUAL:
+                return lambda environment: is_equal(left(environment), right(environment))
+            case TokenType.BANG_EQUAL:
+                return lambda environment: not is_equal(left(environment), right(environment))
+            case _:
+                return lambda environment: checked(operator, left(environment), right(environment))
+
+    def visit_call_expr(self, expr: Call) -> Compiled:
+        callee = expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        paren = expr.paren
+        count = len(arguments)
+        interpreter = self.interpreter
+
+        def call(environment: Environment) -> object:
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            if count != function.arity():
+                raise LoxRuntimeError(paren, f"Expected {function.arity()} arguments but got {count}.")
+            return function.call(interpreter, values)
+
+        return call
+
+    def visit_get_expr(self, expr: Get) -> Compiled:
+        target = expr.object.accept(self)
+        name = expr.name
+
+        def get_property(environment: Environment) -> object:
+            target(environment)
+            raise LoxRuntimeError(name, "Only instances have properties.")
+
+        return get_property
+
+    def visit_grouping_expr(self, expr: Grouping) -> Compiled:
+        # Grouping only matters to the parser; it compiles to its contents.
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal) -> Compiled:
+        return constant(expr.value)
+
+    def visit_logical_expr(self, expr: Logical) -> Compiled:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if expr.operator.type == TokenType.OR:
+
+            def logical_or(environment: Environment) -> object:
+                value = left(environment)
+                return value if is_truthy(value) else right(environment)
+
+            return logical_or
+
+        def logical_and(environment: Environment) -> object:
+            value = left(environment)
+            return right(environment) if is_truthy(value) else value
+
+        return logical_and
+
+    def visit_set_expr(self, expr: Set) -> Compiled:
+        target = expr.object.accept(self)
+        name = expr.name
+
+        def set_property(environment: Environment) -> object:
+            target(environment)
+            raise LoxRuntimeError(name, "Only instances have fields.")
+
+        return set_property
+
+    def visit_super_expr(self, expr: Super) -> Compiled:
+        return fail(expr.keyword, "Can't use 'super' outside of a class.")
+
+    def visit_this_expr(self, expr: This) -> Compiled:
+        return fail(expr.keyword, "Can't use 'this' outside of a class.")
+
+    def visit_unary_expr(self, expr: Unary) -> Compiled:
+        right = expr.right.accept(self)
+        operator = expr.operator
+        if operator.type == TokenType.BANG:
+
+            def logical_not(environment: Environment) -> object:
+                value = right(environment)
+                return value is None or value is False
+
+            return logical_not
+
+        def negate(environment: Environment) -> object:
+            value = right(environment)
+            if value.__class__ is not float:
+                raise LoxRuntimeError(operator, "Operand must be a number.")
+            return -value
+
+        return negate
+
+    def visit_variable_expr(self, expr: Variable) -> Compiled:
+        name = expr.name
+        location = self.locations.get(expr)
+        if location is None:
+            return lambda environment: environment.get(name)
+        depth, slot = location
+        if depth == 0:
+            return lambda environment: environment.slots[slot]
+        return lambda environment: environment.get_at(depth, slot)
+
+
+class ClosureInterpreter:
+    def __init__(self, reporter: Callable[[LoxRuntimeError], None]) -> None:
+        self.globals = Environment()
+        self.globals.define("clock", Clock())
+        self.reporter = reporter
+        self.locals: dict[Expr, tuple[int, int]] = {}
+
+    def resolve(self, locations: dict[Expr, tuple[int, int]]) -> None:
+        """Records the (depth, slot) of variable references computed by the Resolver."""
+        # Replaced rather than merged, so a session does not keep every earlier tree alive.
+        self.locals = locations
+
+    def interpret(self, expression: Expr) -> object:
+        """Compiles and runs expression, reporting a runtime error and returning None if one occurs."""
+        return self.execute(ClosureCompiler(self).compile(expression))
+
+    def execute(self, compiled: Compiled) -> object:
+        try:
+            return compiled(self.globals)
+        except LoxRuntimeError as error:
+            self.reporter(error)
+            return None
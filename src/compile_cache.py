@@ -0,0 +1,128 @@
+"""
+On-disk cache of compiled programs, the Lox counterpart of .pyc files.
+
+Entries are keyed by a hash of the interpreter version, the versions of the
+serializer's format and the optimizer's rules, and the source text.  They hold
+the parsed and optimized tree in the serializer's binary format, so a hit needs
+neither the scanner nor the parser.  Entries are written to a temporary file and
+renamed into place, so a reader never sees a partial entry.  The directory is
+bounded in size: every hit touches its entry and every store evicts the least
+recently used entries until the total fits again.  Cache failures are never
+fatal; an unreadable entry is a miss and an unwritable directory just means
+nothing is stored.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import optimizer
+import serializer
+from expression import Expr
+from serializer import FormatError, dumps, loads
+
+SUFFIX = ".loxc"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_directory() -> str:
+    directory = os.environ.get("PLOX_CACHE_DIR")
+    if directory:
+        return directory
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "plox")
+
+
+class CompileCache:
+    def __init__(self, directory: str, version: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.version = version
+        self.max_bytes = max_bytes
+
+    def digest(self) -> "hashlib._Hash":
+        """Returns a hash of everything in a key but the source, which is fed to it in UTF-8."""
+        digest = hashlib.sha256(self.version.encode())
+        digest.update(f"\0{serializer.VERSION}\0{optimizer.VERSION}\0".encode())
+        return digest
+
+    def key(self, source: str) -> str:
+        digest = self.digest()
+        digest.update(source.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def path(self, source: str) -> str:
+        return self.entry(self.key(source))
+
+    def entry(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def load(self, source: str) -> Expr | None:
+        """Returns the cached tree for source, or None on a miss."""
+        return self.load_key(self.key(source))
+
+    def load_key(self, key: str) -> Expr | None:
+        """Returns the cached tree for a key from key() or digest(), or None on a miss."""
+        path = self.entry(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        try:
+            expr = loads(data)
+        except FormatError:
+            self.__remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return expr
+
+    def store(self, source: str, expr: Expr) -> None:
+        self.store_key(self.key(source), expr)
+
+    def store_key(self, key: str, expr: Expr) -> None:
+        data = dumps(expr)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "wb") as file:
+                    file.write(data)
+                os.replace(temporary, self.entry(key))
+            except BaseException:
+                self.__remove(temporary)
+                raise
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(SUFFIX):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.__remove(path)
+            total -= size
+
+    @staticmethod
+    def __remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
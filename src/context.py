@@ -0,0 +1,98 @@
+"""
+Per-run state of the plox driver.
+
+A CompilationContext holds the configuration of one run, meaning the scanner,
+the backend, the compile cache and any instrumentation.  It also collects the
+diagnostics that run reports and owns the backend that evaluates its programs.
+Nothing is shared between contexts, so separate runs can go on at the same time
+in one process.  A prompt session reuses one context, so its globals persist
+from line to line, while reset() drops the diagnostics of each line before the
+next one, so a long session does not pile them up.
+
+Scanners, the parser and the resolver report source offsets, and so do the
+tokens in runtime errors.  The context turns them into lines and columns with
+the LineIndex of the program being run, which the driver sets in lines.
+"""
+
+import sys
+from typing import NamedTuple, TextIO
+
+from closure_compiler import ClosureInterpreter
+from compile_cache import CompileCache
+from instrumentation import Instrumentation
+from interpreter import Interpreter, LoxRuntimeError
+from line_index import LineIndex
+from transpiler import TranspilingInterpreter
+from vm import VM
+
+BACKENDS = {"ast": Interpreter, "vm": VM, "closure": ClosureInterpreter, "python": TranspilingInterpreter}
+
+
+class Diagnostic(NamedTuple):
+    line: int
+    column: int
+    message: str
+    where: str = ""
+    runtime: bool = False
+
+    def __str__(self) -> str:
+        if self.runtime:
+            return f"{self.message}\n[line {self.line}, column {self.column}]"
+        return f"[line {self.line}, column {self.column}] Error{self.where}: {self.message}"
+
+
+class CompilationContext:
+    def __init__(
+        self,
+        scanner: str = "classic",
+        backend: str = "ast",
+        cache: CompileCache | None = None,
+        out: TextIO | None = None,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        self.scanner = scanner
+        self.backend = backend
+        self.cache = cache
+        self.instrumentation = instrumentation
+        # None writes to whatever sys.stdout is at the time.
+        self.out = out
+        self.lines = LineIndex()
+        self.diagnostics: list[Diagnostic] = []
+        self.had_error = False
+        self.had_runtime_error = False
+        self.runner = BACKENDS[backend](self.runtime_error)
+
+    def write(self, text: str) -> None:
+        print(text, file=self.out or sys.stdout)
+
+    def error(self, offset: int, message: str) -> None:
+        """Reporter for the scanners."""
+        self.report(offset, "", message)
+
+    def report(self, offset: int, where: str, message: str) -> None:
+        """Reporter for the parser and the resolver."""
+        self.__add(Diagnostic(*self.lines.position(offset), message, where))
+        self.had_error = True
+
+    def runtime_error(self, error: LoxRuntimeError) -> None:
+        """Reporter for the backends."""
+        self.__add(Diagnostic(*self.lines.position(error.token.offset), error.message, runtime=True))
+        self.had_runtime_error = True
+
+    def reset(self) -> None:
+        """Clears the error flags and diagnostics, so the next program runs even if the last one failed."""
+        self.had_error = False
+        self.had_runtime_error = False
+        self.diagnostics.clear()
+
+    def status(self) -> int:
+        """The exit status of the run so far: 65 after a compile error, 70 after a runtime error."""
+        if self.had_error:
+            return 65
+        if self.had_runtime_error:
+            return 70
+        return 0
+
+    def __add(self, diagnostic: Diagnostic) -> None:
+        self.diagnostics.append(diagnostic)
+        self.write(str(diagnostic))
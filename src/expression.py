@@ -22,12 +22,16 @@ class Visitor(Protocol[R]):
 
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: Visitor[R]) -> R:
         pass
 
 
 class Assign(Expr):
+    __slots__ = ("name", "value")
+
     name: Token
     value: Expr
 
@@ -40,6 +44,8 @@ class Assign(Expr):
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+
     left: Expr
     operator: Token
     right: Expr
@@ -54,6 +60,8 @@ class Binary(Expr):
 
 
 class Call(Expr):
+    __slots__ = ("callee", "paren", "arguments")
+
     callee: Expr
     paren: Token
     arguments: list[Expr]
@@ -68,6 +76,8 @@ class Call(Expr):
 
 
 class Get(Expr):
+    __slots__ = ("object", "name")
+
     object: Expr
     name: Token
 
@@ -80,6 +90,8 @@ class Get(Expr):
 
 
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     expression: Expr
 
     def __init__(self, expression: Expr) -> None:
@@ -90,6 +102,8 @@ class Grouping(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     value: object
 
     def __init__(self, value: object) -> None:
@@ -100,6 +114,8 @@ class Literal(Expr):
 
 
 class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+
     left: Expr
     operator: Token
     right: Expr
@@ -114,6 +130,8 @@ class Logical(Expr):
 
 
 class Set(Expr):
+    __slots__ = ("object", "name", "value")
+
     object: Expr
     name: Token
     value: Expr
@@ -128,6 +146,8 @@ class Set(Expr):
 
 
 class Super(Expr):
+    __slots__ = ("keyword", "method")
+
     keyword: Token
     method: Token
 
@@ -140,6 +160,8 @@ class Super(Expr):
 
 
 class This(Expr):
+    __slots__ = ("keyword",)
+
     keyword: Token
 
     def __init__(self, keyword: Token) -> None:
@@ -150,6 +172,8 @@ class This(Expr):
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     operator: Token
     right: Expr
 
@@ -162,6 +186,8 @@ class Unary(Expr):
 
 
 class Variable(Expr):
+    __slots__ = ("name",)
+
     name: Token
 
     def __init__(self, name: Token) -> None:
@@ -0,0 +1,327 @@
+"""
+Parser that keeps the tree of an edited source current by reparsing only the
+smallest part of it that an edit can have changed.
+
+Lox source is a single expression, so the parts that can be parsed on their own
+are the contents of a grouping and the arguments of a call: a closing
+parenthesis or a comma can never continue an expression, so whatever lies
+between two such delimiters is parsed the same however the rest of the source
+reads.  For every node of its tree the parser records the first and last token
+it was parsed from, and for every argument the delimiters around it.  Since the
+IncrementalScanner keeps every token outside an edit as the same object, those
+tokens stay valid, and a part whose delimiters both survived and enclose all
+the edited tokens is reparsed from the tokens between them.
+
+The new subtree replaces the old one and every node on the path up to the root
+is copied with the new child, while all other subtrees are reused as they are.
+If the part does not parse cleanly into exactly one expression, the next part
+out is tried, and at the latest once a part would cover half of the source,
+the whole of it is parsed again.  Errors are only ever reported by that full
+parse, since a part that fails on its own can still be valid in the source
+around it, as when the edit closed the group it sits in.
+"""
+
+from bisect import bisect_left
+from itertools import chain
+from types import MappingProxyType
+from typing import Callable
+
+from expression import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from incremental_scanner import IncrementalScanner, TokenChange
+from parser import Parser
+from scanner import Token, TokenType
+
+# Attributes holding the children of each node type, in source order.
+CHILDREN = MappingProxyType(
+    {
+        Assign: ("value",),
+        Binary: ("left", "right"),
+        Call: ("callee", "arguments"),
+        Get: ("object",),
+        Grouping: ("expression",),
+        Literal: (),
+        Logical: ("left", "right"),
+        Set: ("object", "value"),
+        Super: (),
+        This: (),
+        Unary: ("right",),
+        Variable: (),
+    }
+)
+
+
+def offset_of(token: Token) -> int:
+    return token.offset
+
+
+def replaced(node: Expr, slot: str | int, child: Expr) -> Expr:
+    """Returns a copy of node with child in slot, an attribute name or the index of an argument."""
+    copy = object.__new__(node.__class__)
+    for name in node.__slots__:
+        setattr(copy, name, getattr(node, name))
+    if slot.__class__ is int:
+        copy.arguments = list(node.arguments)
+        copy.arguments[slot] = child
+    else:
+        setattr(copy, slot, child)
+    return copy
+
+
+class IncrementalParser:
+    def __init__(
+        self, scanner: IncrementalScanner, reporter: Callable[[int, str, str], None], iterative: bool = False
+    ) -> None:
+        self.scanner = scanner
+        self.reporter = reporter
+        self.iterative = iterative
+        # The tree of the current source, or None while it has parse errors.
+        self.tree: Expr | None = None
+        # The last tree that parsed without errors, the first and last token of
+        # each of its nodes, and the tokens just outside each call argument.
+        self.__good: Expr | None = None
+        self.__spans: dict[Expr, tuple[Token, Token]] = {}
+        self.__delimiters: dict[Expr, tuple[Token, Token]] = {}
+        # While the good tree is out of date, the surviving tokens right before and
+        # after all the tokens edited since, or None for the start and the end.
+        self.__dirty = False
+        self.__before: Token | None = None
+        self.__after: Token | None = None
+        self.__parse_all()
+
+    def edit(self, offset: int, removed: int, inserted: str) -> Expr | None:
+        """Applies an edit to the source and returns the new tree, or None if it has parse errors."""
+        change = self.scanner.edit(offset, removed, inserted)
+        if self.__good is None:
+            return self.__parse_all()
+        if not self.__dirty and change.removed == change.inserted == 0:
+            # Only space or comments changed; the tokens moved but are the same.
+            return self.tree
+        self.__mark(change)
+        path, units = self.__descend()
+        for depth in reversed(units):
+            if self.__reparse(path, depth):
+                return self.tree
+        return self.__parse_all()
+
+    def __parse_all(self) -> Expr | None:
+        failed = []
+
+        def report(offset: int, where: str, message: str) -> None:
+            failed.append(offset)
+            self.reporter(offset, where, message)
+
+        tree = Parser(self.scanner.tokens, report, self.iterative).parse()
+        if tree is None or failed:
+            self.tree = None
+            return None
+        self.__spans = {}
+        self.__delimiters = {}
+        self.__walk(tree, 0)
+        self.__good = self.tree = tree
+        self.__dirty = False
+        return tree
+
+    def __mark(self, change: TokenChange) -> None:
+        tokens = self.scanner.tokens
+        before = tokens[change.index - 1] if change.index else None
+        end = change.index + change.inserted
+        after = tokens[end] if end < len(tokens) else None
+        if self.__dirty:
+            # A bound the new change removed lies inside it, so the new one is further out.
+            old = self.__before
+            if old is None or before is None:
+                before = None
+            elif old.offset < before.offset and self.__index(old) is not None:
+                before = old
+            old = self.__after
+            if old is None or after is None:
+                after = None
+            elif old.offset > after.offset and self.__index(old) is not None:
+                after = old
+        self.__dirty = True
+        self.__before = before
+        self.__after = after
+        self.tree = None
+
+    def __index(self, token: Token) -> int | None:
+        """Returns the index of token in the current tokens, or None if an edit removed it."""
+        tokens = self.scanner.tokens
+        index = bisect_left(tokens, token.offset, key=offset_of)
+        return index if index < len(tokens) and tokens[index] is token else None
+
+    def __encloses(self, first: Token, last: Token) -> bool:
+        # Removed tokens keep stale offsets, so both ends must also still be there.
+        before = self.__before
+        after = self.__after
+        return (
+            before is not None
+            and after is not None
+            and first.offset <= before.offset
+            and last.offset >= after.offset
+            and self.__index(first) is not None
+            and self.__index(last) is not None
+        )
+
+    def __descend(self) -> tuple[list[tuple[Expr, str | int]], list[int]]:
+        """
+        Returns the path of (node, slot) pairs from the root to the innermost
+        node enclosing the edits, and the depths along it whose slot is a part
+        that can be reparsed on its own.
+        """
+        spans = self.__spans
+        path: list[tuple[Expr, str | int]] = []
+        units = []
+        node = self.__good
+        while True:
+            if node.__class__ is Grouping:
+                if not self.__encloses(*spans[node]):
+                    return path, units
+                units.append(len(path))
+                path.append((node, "expression"))
+                node = node.expression
+                continue
+            if node.__class__ is Call:
+                for index, argument in enumerate(node.arguments):
+                    if self.__encloses(*self.__delimiters[argument]):
+                        units.append(len(path))
+                        path.append((node, index))
+                        node = argument
+                        break
+                else:
+                    if not self.__encloses(*spans[node.callee]):
+                        return path, units
+                    path.append((node, "callee"))
+                    node = node.callee
+                continue
+            for slot in CHILDREN[node.__class__]:
+                child = getattr(node, slot)
+                if self.__encloses(*spans[child]):
+                    path.append((node, slot))
+                    node = child
+                    break
+            else:
+                return path, units
+
+    def __reparse(self, path: list[tuple[Expr, str | int]], depth: int) -> bool:
+        """Reparses the part at depth along path, returning whether that settled the edit."""
+        parent, slot = path[depth]
+        if slot.__class__ is int:
+            child = parent.arguments[slot]
+            left, right = self.__delimiters[child]
+        else:
+            child = parent.expression
+            left, right = self.__spans[parent]
+        start = self.__index(left) + 1
+        stop = self.__index(right)
+        if 2 * (stop - start) > len(self.scanner.tokens):
+            # Parsing everything costs at most twice as much and always settles it.
+            return False
+        tokens = chain(self.scanner.tokens[start:stop], (Token(TokenType.EOF, "", None, right.offset),))
+        errors = []
+        expr = Parser(tokens, lambda *error: errors.append(error), self.iterative).parse()
+        # The part must be exactly one expression; the parser stops at EOF or
+        # before the first token it cannot use.  An error inside the part is not
+        # reported from here: the edit may have added a delimiter that closes
+        # the part early, and the source can read differently further out.
+        if expr is None or errors or next(tokens, None) is not None:
+            return False
+
+        self.__forget(child)
+        self.__walk(expr, start)
+        if slot.__class__ is int:
+            self.__delimiters[expr] = (left, right)
+        for node, slot in reversed(path[: depth + 1]):
+            copy = replaced(node, slot, expr)
+            self.__spans[copy] = self.__spans.pop(node)
+            if node in self.__delimiters:
+                self.__delimiters[copy] = self.__delimiters.pop(node)
+            expr = copy
+        self.__good = self.tree = expr
+        self.__dirty = False
+        return True
+
+    def __forget(self, expr: Expr) -> None:
+        spans = self.__spans
+        delimiters = self.__delimiters
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            del spans[node]
+            delimiters.pop(node, None)
+            for slot in CHILDREN[node.__class__]:
+                child = getattr(node, slot)
+                if child.__class__ is list:
+                    stack.extend(child)
+                else:
+                    stack.append(child)
+
+    def __walk(self, expr: Expr, cursor: int) -> None:
+        """Records the spans of expr and its descendants, parsed from the tokens at cursor on."""
+        tokens = self.scanner.tokens
+        spans = self.__spans
+        delimiters = self.__delimiters
+        # Items are nodes to visit, (argument,) for a node that is an argument,
+        # counts of tokens that belong to no child, and (node, start, argument)
+        # for a node whose tokens are all counted.  Children are pushed in
+        # reverse, so they are visited in source order.
+        stack: list = [expr]
+        while stack:
+            item = stack.pop()
+            cls = item.__class__
+            if cls is int:
+                cursor += item
+                continue
+            if cls is tuple:
+                if len(item) == 3:
+                    node, start, argument = item
+                    spans[node] = (tokens[start], tokens[cursor - 1])
+                    if argument:
+                        delimiters[node] = (tokens[start - 1], tokens[cursor])
+                    continue
+                node = item[0]
+                cls = node.__class__
+                stack.append((node, cursor, True))
+            else:
+                node = item
+                stack.append((node, cursor, False))
+
+            if cls is Literal or cls is Variable or cls is This:
+                stack.append(1)
+            elif cls is Binary or cls is Logical:
+                stack += (node.right, 1, node.left)
+            elif cls is Grouping:
+                stack += (1, node.expression, 1)
+            elif cls is Unary:
+                stack += (node.right, 1)
+            elif cls is Call:
+                # callee ( argument , argument )
+                stack.append(1)
+                arguments = node.arguments
+                for index in range(len(arguments) - 1, -1, -1):
+                    stack += ((arguments[index],), 1)
+                if not arguments:
+                    stack.append(1)
+                stack.append(node.callee)
+            elif cls is Get:
+                stack += (2, node.object)
+            elif cls is Assign:
+                stack += (node.value, 2)
+            elif cls is Set:
+                stack += (node.value, 3, node.object)
+            else:
+                # super . method
+                stack.append(3)
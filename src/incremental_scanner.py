@@ -0,0 +1,115 @@
+"""
+Scanner that keeps the tokens of a source current as the source is edited.
+
+An edit only rescans a window around it.  Scanning restarts right after the
+last token that the edit cannot have changed, one that ends at least LOOKAHEAD
+characters before it, since the scanner keeps no state between tokens.  It
+stops at the first token past the edited text that starts where an old token
+started.  The text from there on is unchanged, so the old tokens are too; they
+are kept as they are, with their offsets moved by the change in length.
+
+Diagnostics are only reported for the window that was scanned again, at
+offsets into the edited source.
+"""
+
+from bisect import bisect_right
+from itertools import islice
+from typing import Callable, NamedTuple
+
+from regex_scanner import OPERATORS, PATTERN, RegexScanner
+from scanner import Token, TokenType, keywords
+from stream_scanner import LOOKAHEAD
+
+
+class TokenChange(NamedTuple):
+    """Says that tokens[index : index + inserted] replaced removed old tokens at index."""
+
+    index: int
+    removed: int
+    inserted: int
+
+
+def end_of(token: Token) -> int:
+    return token.offset + len(token.lexeme)
+
+
+class IncrementalScanner:
+    def __init__(
+        self, source: str, reporter: Callable[[int, str], None], tokens: list[Token] | None = None
+    ) -> None:
+        self.source = source
+        self.reporter = reporter
+        # The tokens of source, ending with EOF, as a previous scan produced them.
+        # Every edit updates this list and the tokens after the edit in place.
+        self.tokens = RegexScanner(source, reporter).scan_tokens() if tokens is None else tokens
+
+    def edit(self, offset: int, removed: int, inserted: str) -> TokenChange:
+        """Replaces the removed characters at offset with inserted and rescans what that can have changed."""
+        source = self.source
+        if offset < 0 or removed < 0 or offset + removed > len(source):
+            raise ValueError(f"Edit of {removed} characters at {offset} is outside a source of {len(source)}.")
+        source = source[:offset] + inserted + source[offset + removed :]
+        self.source = source
+        tokens = self.tokens
+        delta = len(inserted) - removed
+
+        # A token is kept if neither it nor its lookahead reaches the edit.
+        index = bisect_right(tokens, offset - LOOKAHEAD, key=end_of)
+        position = end_of(tokens[index - 1]) if index else 0
+        # First offset in the new source that follows the edited text.
+        boundary = offset + len(inserted)
+        old = index
+        resync = None
+        scanned = []
+        append = scanned.append
+        operators = OPERATORS
+        for match in PATTERN.finditer(source, position):
+            kind = match.lastgroup
+            if kind == "SPACE":
+                continue
+            start = match.start()
+            if start >= boundary:
+                target = start - delta
+                # EOF starts past every match, so this stops before the end.
+                while tokens[old].offset < target:
+                    old += 1
+                if tokens[old].offset == target:
+                    resync = old
+                    break
+            text = match.group()
+            if kind == "IDENTIFIER":
+                append(Token(keywords.get(text, TokenType.IDENTIFIER), text, None, start))
+            elif kind == "OPERATOR":
+                append(Token(operators[text], text, None, start))
+            elif kind == "NUMBER":
+                append(Token(TokenType.NUMBER, text, float(text), start))
+            elif kind == "STRING":
+                append(Token(TokenType.STRING, text, text[1:-1], start))
+            elif kind == "UNTERMINATED":
+                self.reporter(start, "Unterminated string.")
+            elif kind == "ERROR":
+                self.reporter(start, "Unexpected character.")
+
+        if resync is None:
+            # Scanned to the end without lining up; only EOF is left to replace.
+            append(Token(TokenType.EOF, "", None, len(source)))
+            resync = len(tokens)
+        elif delta:
+            for token in islice(tokens, resync, None):
+                token.offset += delta
+        # Tokens before the edit that were only scanned again for their lookahead
+        # usually come out the same; the old ones are kept, so the change is exact.
+        kept = 0
+        while kept < len(scanned) and index + kept < resync:
+            new, old = scanned[kept], tokens[index + kept]
+            if (
+                old.offset >= offset
+                or new.offset != old.offset
+                or new.lexeme != old.lexeme
+                or new.type != old.type
+            ):
+                break
+            kept += 1
+        index += kept
+        tokens[index:resync] = scanned[kept:]
+        return TokenChange(index, resync - index, len(scanned) - kept)
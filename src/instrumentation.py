@@ -0,0 +1,120 @@
+"""
+Hooks for observing what a plox run spends its time and work on.
+
+The driver calls an Instrumentation, when the context has one, as the run
+goes: once with the size of the source, once per phase with its wall time,
+and once each with the token counts, the parsed tree and the number of nodes
+constant folding removed.  The base class ignores every event; Stats collects
+them for --stats.  Without an instrumentation the driver reports to IGNORED
+instead, so it has one code path and a plain run pays two clock reads and an
+empty call per phase.  Only counting tokens, which times every one, is left
+to instrumented runs.
+"""
+
+import time
+from collections import Counter
+from typing import Iterable, Iterator
+
+from expression import Expr
+from scanner import Token, TokenType
+
+
+class Instrumentation:
+    def source(self, size: int) -> None:
+        """Called with the number of bytes of source the run reads."""
+
+    def phase(self, name: str, seconds: float) -> None:
+        """Called when a phase ends; a phase that runs more than once reports each time."""
+
+    def tokens(self, counts: Counter[TokenType]) -> None:
+        """Called with the number of tokens of each type, EOF included."""
+
+    def tree(self, expr: Expr) -> None:
+        """Called with the tree the run goes on to optimize and evaluate."""
+
+    def folded(self, removed: int) -> None:
+        """Called with the number of nodes constant folding removed."""
+
+
+# Stands in for a context's instrumentation when it has none.
+IGNORED = Instrumentation()
+
+
+class TokenCounter:
+    """Passes tokens through, counting them by type and timing the source's share of the work."""
+
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        self.tokens = iter(tokens)
+        self.counts: Counter[TokenType] = Counter()
+        self.seconds = 0.0
+
+    def __iter__(self) -> Iterator[Token]:
+        return self
+
+    def __next__(self) -> Token:
+        start = time.perf_counter()
+        try:
+            token = next(self.tokens)
+        finally:
+            self.seconds += time.perf_counter() - start
+        self.counts[token.type] += 1
+        return token
+
+
+def tree_shape(expr: Expr) -> tuple[Counter[str], int]:
+    """Returns the number of nodes of each class in expr and its depth, counting expr as 1."""
+    counts: Counter[str] = Counter()
+    deepest = 0
+    pending = [(expr, 1)]
+    while pending:
+        node, depth = pending.pop()
+        counts[node.__class__.__name__] += 1
+        deepest = max(deepest, depth)
+        for slot in node.__slots__:
+            value = getattr(node, slot)
+            if isinstance(value, Expr):
+                pending.append((value, depth + 1))
+            elif isinstance(value, list):
+                pending.extend((item, depth + 1) for item in value)
+    return counts, deepest
+
+
+class Stats(Instrumentation):
+    def __init__(self) -> None:
+        self.bytes = 0
+        self.phases: dict[str, float] = {}
+        self.token_counts: Counter[TokenType] = Counter()
+        self.node_counts: Counter[str] = Counter()
+        self.max_depth = 0
+        self.removed = 0
+
+    def source(self, size: int) -> None:
+        self.bytes += size
+
+    def phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def tokens(self, counts: Counter[TokenType]) -> None:
+        self.token_counts.update(counts)
+
+    def tree(self, expr: Expr) -> None:
+        counts, depth = tree_shape(expr)
+        self.node_counts.update(counts)
+        self.max_depth = max(self.max_depth, depth)
+
+    def folded(self, removed: int) -> None:
+        self.removed += removed
+
+    def report(self) -> str:
+        lines = [f"{'source bytes':<15}{self.bytes:>12}"]
+        lines.append(f"{'wall ms':<15}{sum(self.phases.values()) * 1e3:>12.3f}")
+        lines.extend(f"  {name:<13}{seconds * 1e3:>12.3f}" for name, seconds in self.phases.items())
+        lines.append(f"{'tokens':<15}{sum(self.token_counts.values()):>12}")
+        for type, count in sorted(self.token_counts.items(), key=lambda item: (-item[1], item[0])):
+            lines.append(f"  {type.name:<13}{count:>12}")
+        lines.append(f"{'nodes':<15}{sum(self.node_counts.values()):>12}")
+        for name, count in sorted(self.node_counts.items(), key=lambda item: (-item[1], item[0])):
+            lines.append(f"  {name:<13}{count:>12}")
+        lines.append(f"{'max depth':<15}{self.max_depth:>12}")
+        lines.append(f"{'folded nodes':<15}{self.removed:>12}")
+        return "\n".join(lines)
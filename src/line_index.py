@@ -0,0 +1,48 @@
+"""
+Turns source offsets into line and column numbers.
+
+Tokens record only the offset where they start, so scanning does no line
+bookkeeping.  A LineIndex finds the line starts of a source the first time a
+position is asked for, which for most runs is never, and answers every lookup
+with a binary search.  Scanners that never hold the whole source extend an
+index chunk by chunk instead.
+"""
+
+from array import array
+from bisect import bisect_right
+
+
+class LineIndex:
+    def __init__(self, source: str = "") -> None:
+        # Offsets of the first character of each line; line n starts at starts[n - 1].
+        self.starts = array("Q", [0])
+        self.length = 0
+        self.__pending = source
+
+    def extend(self, text: str) -> None:
+        """Indexes text as the continuation of everything indexed so far."""
+        if self.__pending:
+            self.__index(self.__pending)
+            self.__pending = ""
+        self.__index(text)
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Returns the line and column of offset, both counted from 1."""
+        if self.__pending:
+            self.__index(self.__pending)
+            self.__pending = ""
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+    def line(self, offset: int) -> int:
+        return self.position(offset)[0]
+
+    def __index(self, text: str) -> None:
+        append = self.starts.append
+        base = self.length + 1
+        find = text.find
+        index = find("\n")
+        while index != -1:
+            append(base + index)
+            index = find("\n", index + 1)
+        self.length += len(text)
@@ -93,62 +93,107 @@ def handle_numeric(cursor: int, start_index: int, text: str) -> Tuple[str, int]:
     str: the lexeme of the number literal
     int: the next cursor location after the end of the literal
     """
-    if cursor < len(text):
-        char = text[cursor]
-        if is_numeric(char):
-            return handle_numeric(cursor + 1, start_index, text)
+    length = len(text)
+    while cursor < length and text[cursor].isdigit():
+        cursor += 1
     return (text[start_index:cursor], cursor)
 
 
 def handle_alpha(cursor: int, start_index: int, text: str) -> Tuple[str, int]:
-    if cursor < len(text):
+    """
+    Creates an identifier or keyword lexeme from start_index till the first non-alphanumeric character.
+
+    Parameters:
+    cursor (int): the index of the next text character to check
+    start_index (int): the text index of the first character of the token
+    text (str): the text stream being lexed
+
+    Returns:
+    str: the lexeme of the identifier
+    int: the next cursor location after the end of the identifier
+    """
+    length = len(text)
+    while cursor < length:
         char = text[cursor]
-        if is_alphanumeric(char):
-            return handle_alpha(cursor + 1, start_index, text)
+        if not (char.isalpha() or char.isdigit() or char == "_"):
+            break
+        cursor += 1
     return (text[start_index:cursor], cursor)
 
 
 def handle_string(cursor: int, start_index: int, text: str) -> Tuple[str, int]:
-    if cursor < len(text):
-        char = text[cursor]
-        if char != '"':
-            return handle_string(cursor + 1, start_index, text)
-    return (text[start_index + 1 : cursor], cursor + 1)
+    """
+    Creates a string Literal lexeme from the opening quote at start_index till the closing quote.
 
+    Parameters:
+    cursor (int): the index of the first character after the opening quote
+    start_index (int): the text index of the opening quote
+    text (str): the text stream being lexed
 
-def get_tokens(text: str, keywords: Iterable[str] = ()) -> list[Tuple[TOKEN, str]]:
-    return lex_tokens(0, [], text)
+    Returns:
+    str: the contents of the string without the quotes
+    int: the next cursor location after the closing quote
+    """
+    end = text.find('"', cursor)
+    if end < 0:
+        end = len(text)
+    return (text[start_index + 1 : end], end + 1)
+
+
+def get_tokens(text: str, keywords: Iterable[str] = keywords) -> list[Tuple[TOKEN, str]]:
+    """
+    Splits 'text' into (category, lexeme) tokens.
+
+    Parameters:
+    text (str): the text to lex
+    keywords (Iterable[str]): the words categorized as TOKEN.KEYWORD instead of TOKEN.IDENT
+
+    Returns:
+    list: the tokens in source order
+    """
+    return lex_tokens(0, [], text, keywords)
 
 
 def lex_tokens(
-    index: int, tokens: list[Tuple[TOKEN, str]], text: str, k: Iterable[str] = ()
+    index: int, tokens: list[Tuple[TOKEN, str]], text: str, k: Iterable[str] = keywords
 ) -> list[Tuple[TOKEN, str]]:
-    lexeme = ""
-    for i in range(index, len(text)):
-        c = text[i]
-        if c == '"':
-            (lexeme, cursor) = handle_string(i + 1, i, text)
-            tokens.append((TOKEN.LITERAL, lexeme))
-            return lex_tokens(cursor, tokens, text)
-
-        if is_numeric(c):
-            (lexeme, cursor) = handle_numeric(i + 1, i, text)
-            tokens.append((TOKEN.LITERAL, lexeme))
-            return lex_tokens(cursor, tokens, text)
+    """
+    Appends the tokens of text[index:] to 'tokens' in a single linear pass.
 
-        if is_alphanumeric(c):
-            (lexeme, cursor) = handle_alpha(i + 1, i, text)
-            tokens.append((categorize(lexeme), lexeme))
-            return lex_tokens(cursor, tokens, text)
+    Characters that start no token, including white space, are skipped.
 
-        if is_operation(c):
-            tokens.append((TOKEN.OPERATOR, c))
-            return lex_tokens(i + 1, tokens, text)
+    Parameters:
+    index (int): the text index to start lexing at
+    tokens (list): the token list to append to
+    text (str): the text to lex
+    k (Iterable[str]): the words categorized as TOKEN.KEYWORD
 
+    Returns:
+    list: 'tokens'
+    """
+    k = frozenset(k)
+    append = tokens.append
+    length = len(text)
+    while index < length:
+        c = text[index]
+        if c == '"':
+            (lexeme, index) = handle_string(index + 1, index, text)
+            append((TOKEN.LITERAL, lexeme))
+        elif c.isdigit():
+            (lexeme, index) = handle_numeric(index + 1, index, text)
+            append((TOKEN.LITERAL, lexeme))
+        elif c.isalpha() or c == "_":
+            (lexeme, index) = handle_alpha(index + 1, index, text)
+            append((categorize(lexeme, k), lexeme))
+        elif c in "+-*/=":
+            append((TOKEN.OPERATOR, c))
+            index += 1
+        else:
+            index += 1
     return tokens
 
 
-def categorize(lexeme: str) -> TOKEN:
+def categorize(lexeme: str, keywords: Iterable[str] = keywords) -> TOKEN:
     if lexeme in keywords:
         return TOKEN.KEYWORD
     return TOKEN.IDENT
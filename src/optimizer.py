@@ -0,0 +1,131 @@
+"""
+Constant folding and algebraic simplification of Expr trees.
+
+Runs between parsing and evaluation.  Folding uses the interpreter's own
+operations, so results are exactly what evaluation would produce; an operation
+that would fail at run time, such as division by zero or adding a string to a
+number, is left in the tree to report its error when it runs.  Subtrees that
+do not change are returned as is rather than copied.
+"""
+
+from expression import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+    Visitor,
+)
+from interpreter import BINARY_OPERATIONS, UNARY_OPERATIONS, LoxRuntimeError, is_truthy
+from scanner import TokenType
+
+# Part of the compile cache's keys; bump it whenever folding changes what trees
+# come out, so trees folded by the old rules are not reused.
+VERSION = 1
+
+
+def count_nodes(expr: Expr) -> int:
+    count = 0
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        count += 1
+        for slot in type(node).__slots__:
+            value = getattr(node, slot)
+            if isinstance(value, Expr):
+                pending.append(value)
+            elif isinstance(value, list):
+                pending.extend(value)
+    return count
+
+
+class ConstantFolder(Visitor[Expr]):
+    def __init__(self) -> None:
+        self.removed = 0
+
+    def optimize(self, expression: Expr) -> Expr:
+        """Returns the simplified tree and adds the number of nodes it saved to self.removed."""
+        result = expression.accept(self)
+        self.removed += count_nodes(expression) - count_nodes(result)
+        return result
+
+    def visit_assign_expr(self, expr: Assign) -> Expr:
+        value = expr.value.accept(self)
+        return expr if value is expr.value else Assign(expr.name, value)
+
+    def visit_binary_expr(self, expr: Binary) -> Expr:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            try:
+                return Literal(BINARY_OPERATIONS[expr.operator.type](expr.operator, left.value, right.value))
+            except LoxRuntimeError:
+                pass
+        if left is expr.left and right is expr.right:
+            return expr
+        return Binary(left, expr.operator, right)
+
+    def visit_call_expr(self, expr: Call) -> Expr:
+        callee = expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        if callee is expr.callee and all(
+            new is old for new, old in zip(arguments, expr.arguments, strict=True)
+        ):
+            return expr
+        return Call(callee, expr.paren, arguments)
+
+    def visit_get_expr(self, expr: Get) -> Expr:
+        object = expr.object.accept(self)
+        return expr if object is expr.object else Get(object, expr.name)
+
+    def visit_grouping_expr(self, expr: Grouping) -> Expr:
+        # Precedence is already encoded in the shape of the tree.
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal) -> Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: Logical) -> Expr:
+        left = expr.left.accept(self)
+        if isinstance(left, Literal):
+            # The left operand decides whether the right one is ever evaluated.
+            if is_truthy(left.value) == (expr.operator.type == TokenType.OR):
+                return left
+            return expr.right.accept(self)
+        right = expr.right.accept(self)
+        if left is expr.left and right is expr.right:
+            return expr
+        return Logical(left, expr.operator, right)
+
+    def visit_set_expr(self, expr: Set) -> Expr:
+        object = expr.object.accept(self)
+        value = expr.value.accept(self)
+        if object is expr.object and value is expr.value:
+            return expr
+        return Set(object, expr.name, value)
+
+    def visit_super_expr(self, expr: Super) -> Expr:
+        return expr
+
+    def visit_this_expr(self, expr: This) -> Expr:
+        return expr
+
+    def visit_unary_expr(self, expr: Unary) -> Expr:
+        right = expr.right.accept(self)
+        if isinstance(right, Literal):
+            try:
+                return Literal(UNARY_OPERATIONS[expr.operator.type](expr.operator, right.value))
+            except LoxRuntimeError:
+                pass
+        return expr if right is expr.right else Unary(expr.operator, right)
+
+    def visit_variable_expr(self, expr: Variable) -> Expr:
+        return expr
@@ -0,0 +1,199 @@
+"""
+Scanner that splits a large source at line boundaries and scans the pieces in a
+pool of worker processes.
+
+A comment ends with its line, so a line can only start inside a string.  Before
+any worker runs, one pass over just the strings and comments of the source
+finds the strings that run across a boundary between chunks; those are few and
+cheap to find, since the regex engine skips everything else.  Each chunk is
+then scanned from the end of the string it starts inside, if any, up to the
+start of the string that runs on past it, so every worker starts and stops
+between two tokens, as a sequential scan would.  The workers return the
+TokenBuffer columns of their ranges, at offsets into the whole source, and the
+parent joins them in order, putting the strings that cross boundaries back
+in between.  Tokens and diagnostics come out exactly as RegexScanner's.
+"""
+
+import os
+import re
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator
+
+from regex_scanner import OPERATORS, PATTERN
+from scanner import Token, TokenType, keywords
+from token_buffer import TokenBuffer
+
+# Strings, comments and the quote of a string left open.  The scanner's other
+# tokens can never hold a quote or two slashes, so these match where it does.
+QUOTES = re.compile(r'"[^"]*"|//[^\n]*|"')
+
+# A source is cut into this many chunks per worker, so a worker that finishes
+# early takes another and the parent can join the first ones while the rest are
+# still being scanned.
+CHUNKS_PER_JOB = 4
+
+# Chunks are never made smaller than this, since each costs a trip to a worker.
+MIN_CHUNK = 1 << 16
+
+# Columns of the tokens a worker scanned and the diagnostics it found there.
+Scanned = tuple[array, array, array, list[tuple[int, str]]]
+
+# The source of the scan in progress, set in every worker process as it starts.
+shared_source = ""
+
+
+def share(source: str) -> None:
+    global shared_source
+    shared_source = source
+
+
+def scan_shared(start: int, stop: int) -> Scanned:
+    # Runs in a worker process.
+    return scan_range(shared_source, start, stop)
+
+
+def scan_range(source: str, start: int, stop: int) -> Scanned:
+    """Scans source[start:stop], which must start and end between two tokens, without an EOF."""
+    types = array("B")
+    starts = array("I")
+    ends = array("I")
+    errors = []
+    operators = OPERATORS
+    for match in PATTERN.finditer(source, start, stop):
+        kind = match.lastgroup
+        if kind == "SPACE":
+            continue
+        if kind == "IDENTIFIER":
+            type = keywords.get(match.group(), TokenType.IDENTIFIER)
+        elif kind == "OPERATOR":
+            type = operators[match.group()]
+        elif kind == "NUMBER":
+            type = TokenType.NUMBER
+        elif kind == "STRING":
+            type = TokenType.STRING
+        elif kind == "UNTERMINATED":
+            errors.append((match.start(), "Unterminated string."))
+            continue
+        elif kind == "ERROR":
+            errors.append((match.start(), "Unexpected character."))
+            continue
+        else:
+            continue
+        types.append(type)
+        starts.append(match.start())
+        ends.append(match.end())
+    return types, starts, ends, errors
+
+
+class ParallelScanner:
+    def __init__(
+        self,
+        source: str,
+        reporter: Callable[[int, str], None],
+        jobs: int | None = None,
+        chunk: int | None = None,
+    ) -> None:
+        self.source = source
+        self.reporter = reporter
+        self.jobs = jobs or os.cpu_count() or 1
+        # Characters per chunk, or None to pick from the jobs and the source size.
+        self.chunk = chunk
+        self.tokens = []
+
+    def scan_tokens(self) -> list[Token]:
+        tokens = self.tokens
+        for buffer, errors in self.__scan():
+            tokens += buffer.tokens()
+            for error in errors:
+                self.reporter(*error)
+        tokens.append(Token(TokenType.EOF, "", None, len(self.source)))
+        return tokens
+
+    def scan_buffer(self) -> TokenBuffer:
+        """Scans the source into a TokenBuffer, which keeps the parent from building Token objects."""
+        joined = TokenBuffer(self.source)
+        for buffer, errors in self.__scan():
+            joined.types += buffer.types
+            joined.starts += buffer.starts
+            joined.ends += buffer.ends
+            for error in errors:
+                self.reporter(*error)
+        joined.append(TokenType.EOF, len(self.source), len(self.source))
+        return joined
+
+    def bounds(self) -> list[int]:
+        """Returns the offsets the chunks start at, each at the start of a line, and the source length."""
+        source = self.source
+        size = self.chunk or max(MIN_CHUNK, -(-len(source) // (self.jobs * CHUNKS_PER_JOB)))
+        bounds = [0]
+        while True:
+            newline = source.find("\n", bounds[-1] + size - 1)
+            if newline < 0 or newline + 1 >= len(source):
+                break
+            bounds.append(newline + 1)
+        bounds.append(len(source))
+        return bounds
+
+    def plan(self) -> list[tuple[int, int, tuple[int, int | None] | None]]:
+        """
+        Returns the ranges to scan as (start, stop, string) triples in source
+        order.  Ranges split at the chunk bounds, and string is the span of the
+        string starting at stop that runs across a bound, with None as its end
+        if it never closes, or None if there is no such string.
+        """
+        source = self.source
+        bounds = self.bounds()
+        plan = []
+        start = 0
+        for match in QUOTES.finditer(source):
+            first, last = match.span()
+            unterminated = last - first == 1
+            if unterminated:
+                last = len(source)
+            index = bisect_right(bounds, first)
+            if bounds[index] >= last:
+                continue
+            for bound in bounds[bisect_right(bounds, start) : index]:
+                plan.append((start, bound, None))
+                start = bound
+            plan.append((start, first, (first, None if unterminated else last)))
+            start = last
+            if unterminated:
+                return plan
+        for bound in bounds[bisect_right(bounds, start) :]:
+            plan.append((start, bound, None))
+            start = bound
+        return plan
+
+    def __scan(self) -> Iterator[tuple[TokenBuffer, list[tuple[int, str]]]]:
+        """Yields the tokens of each range in order, with the diagnostics for it."""
+        source = self.source
+        plan = self.plan()
+        if self.jobs == 1 or len(plan) < 2:
+            yield from self.__join(plan, (scan_range(source, start, stop) for start, stop, _ in plan))
+            return
+        starts = [start for start, _, _ in plan]
+        stops = [stop for _, stop, _ in plan]
+        # Forked workers inherit the source; others get it once, as they start.
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(plan)), initializer=share, initargs=(source,)
+        ) as pool:
+            yield from self.__join(plan, pool.map(scan_shared, starts, stops))
+
+    def __join(
+        self, plan: list[tuple[int, int, tuple[int, int | None] | None]], results: Iterable[Scanned]
+    ) -> Iterator[tuple[TokenBuffer, list[tuple[int, str]]]]:
+        for (_, _, string), (types, starts, ends, errors) in zip(plan, results, strict=True):
+            buffer = TokenBuffer(self.source)
+            buffer.types = types
+            buffer.starts = starts
+            buffer.ends = ends
+            if string is not None:
+                start, end = string
+                if end is None:
+                    errors.append((start, "Unterminated string."))
+                else:
+                    buffer.append(TokenType.STRING, start, end)
+            yield buffer, errors
@@ -1,37 +1,255 @@
-from typing import Callable
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator
 
-from expression import Binary, Expr, Grouping, Literal, Unary
+from expression import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
 from scanner import Token, TokenType
 
+LOWEST = 0
+ASSIGNMENT = 1
+MAX_ARGUMENTS = 255
+
+# Binding power of every infix operator, keyed by token type.  Higher binds tighter.
+BINARY_PRECEDENCE = MappingProxyType(
+    {
+        TokenType.EQUAL: ASSIGNMENT,
+        TokenType.OR: 2,
+        TokenType.AND: 3,
+        TokenType.BANG_EQUAL: 4,
+        TokenType.EQUAL_EQUAL: 4,
+        TokenType.GREATER: 5,
+        TokenType.GREATER_EQUAL: 5,
+        TokenType.LESS: 5,
+        TokenType.LESS_EQUAL: 5,
+        TokenType.MINUS: 6,
+        TokenType.PLUS: 6,
+        TokenType.SLASH: 7,
+        TokenType.STAR: 7,
+    }
+)
+
+LOGICAL_OPERATORS = frozenset((TokenType.AND, TokenType.OR))
+
+UNARY_OPERATORS = frozenset((TokenType.BANG, TokenType.MINUS))
+
+POSTFIX_OPERATORS = frozenset((TokenType.LEFT_PAREN, TokenType.DOT))
+
+LITERAL_VALUES = MappingProxyType({TokenType.FALSE: False, TokenType.TRUE: True, TokenType.NIL: None})
+
+# Kinds of frame on the iterative parser's stack.
+UNARY_FRAME = 0
+GROUP_FRAME = 1
+CALL_FRAME = 2
+BINARY_FRAME = 3
+LOGICAL_FRAME = 4
+ASSIGN_FRAME = 5
+
+# Threshold of the frames no operator completes, below every binding power.
+BARRIER = LOWEST - 1
+
 
 class Parser:
-    __tokens: list[Token]
-    __current: int
-    __reporter: Callable[[int, str, str], None]
+    __tokens: Iterator[Token]
+    __lookahead: Token
+    __last: Token | None
+    reporter: Callable[[int, str, str], None]
+    iterative: bool
 
     def parse(self) -> Expr | None:
         try:
-            return self.__expression()
+            return self.__iterative_expression() if self.iterative else self.__expression()
         except Exception:
             return None
 
-    def __init__(self, tokens: list[Token], reporter: Callable[[int, str, str], None]) -> None:
-        self.__tokens = tokens
-        self.__current = 0
-        Parser.__reporter = reporter
+    def __init__(
+        self, tokens: Iterable[Token], reporter: Callable[[int, str, str], None], iterative: bool = False
+    ) -> None:
+        # Only the next and the previous token are kept, so the token source can be
+        # a lazy generator and is never materialized in full.
+        self.__tokens = iter(tokens)
+        self.__lookahead = next(self.__tokens)
+        self.__last = None
+        # Kept per instance, so parsers on different threads report separately.
+        self.reporter = reporter
+        # The iterative mode builds the same trees from an explicit stack, so its
+        # nesting depth is bounded by memory instead of the recursion limit.
+        self.iterative = iterative
+
+    def __expression(self, precedence: int = LOWEST) -> Expr:
+        expr = self.__prefix()
+
+        while True:
+            operator = self.__lookahead
+            level = BINARY_PRECEDENCE.get(operator.type, LOWEST)
+            if level <= precedence:
+                return expr
+            self.__advance()
+            if level == ASSIGNMENT:
+                expr = self.__assignment(expr, operator)
+            elif operator.type in LOGICAL_OPERATORS:
+                expr = Logical(expr, operator, self.__expression(level))
+            else:
+                # Parsing the right operand at the operator's own level stops it at the
+                # next operator of equal precedence, which makes the level left associative.
+                expr = Binary(expr, operator, self.__expression(level))
 
-    def __expression(self) -> Expr:
-        return self.__equality()
+    def __assignment(self, target: Expr, equals: Token) -> Expr:
+        # One level below its own precedence, so assignment is right associative.
+        return self.__assign(target, equals, self.__expression(ASSIGNMENT - 1))
 
-    def __equality(self) -> Expr:
-        expr = self.__comparison()
+    def __assign(self, target: Expr, equals: Token, value: Expr) -> Expr:
+        if isinstance(target, Variable):
+            return Assign(target.name, value)
+        if isinstance(target, Get):
+            return Set(target.object, target.name, value)
+        self.__error(equals, "Invalid assignment target.")
+        return target
 
-        while self.__match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.__previous()
-            right = self.__comparison()
-            expr = Binary(expr, operator, right)
+    def __iterative_expression(self) -> Expr:
+        # Each frame is (kind, threshold, left, token): an operation that still
+        # waits for its last operand.  An operator that binds no tighter than a
+        # frame's threshold completes it, just where __expression(threshold)
+        # would return, so both modes build the same tree.  Group and call frames
+        # are barriers that only their closing tokens complete.
+        frames: list[tuple] = []
+        while True:
+            token = self.__lookahead
+            if token.type in UNARY_OPERATORS:
+                self.__advance()
+                frames.append((UNARY_FRAME, BARRIER, None, token))
+                continue
+            if token.type == TokenType.LEFT_PAREN:
+                self.__advance()
+                frames.append((GROUP_FRAME, BARRIER, None, token))
+                continue
+            expr = self.__primary()
+
+            # expr is a complete primary from here on.
+            while True:
+                if self.__lookahead.type in POSTFIX_OPERATORS:
+                    if self.__match(TokenType.DOT):
+                        expr = Get(
+                            expr, self.__consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+                        )
+                        continue
+                    self.__advance()
+                    if not self.__check(TokenType.RIGHT_PAREN):
+                        frames.append((CALL_FRAME, BARRIER, expr, []))
+                        break
+                    expr = Call(expr, self.__advance(), [])
+                    continue
+                while frames and frames[-1][0] == UNARY_FRAME:
+                    expr = Unary(frames.pop()[3], expr)
+
+                operator = self.__lookahead
+                level = BINARY_PRECEDENCE.get(operator.type, LOWEST)
+                while frames and frames[-1][1] >= level:
+                    kind, _, left, token = frames.pop()
+                    if kind == BINARY_FRAME:
+                        expr = Binary(left, token, expr)
+                    elif kind == LOGICAL_FRAME:
+                        expr = Logical(left, token, expr)
+                    else:
+                        expr = self.__assign(left, token, expr)
+                if level > LOWEST:
+                    self.__advance()
+                    if level == ASSIGNMENT:
+                        frames.append((ASSIGN_FRAME, ASSIGNMENT - 1, expr, operator))
+                    elif operator.type in LOGICAL_OPERATORS:
+                        frames.append((LOGICAL_FRAME, level, expr, operator))
+                    else:
+                        frames.append((BINARY_FRAME, level, expr, operator))
+                    break
+
+                # No operator follows, so the innermost group or argument ends here.
+                if not frames:
+                    return expr
+                kind, _, callee, arguments = frames.pop()
+                if kind == GROUP_FRAME:
+                    self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+                    expr = Grouping(expr)
+                    continue
+                arguments.append(expr)
+                if self.__match(TokenType.COMMA):
+                    if len(arguments) >= MAX_ARGUMENTS:
+                        self.__error(self.__peek(), f"Can't have more than {MAX_ARGUMENTS} arguments.")
+                    frames.append((CALL_FRAME, BARRIER, callee, arguments))
+                    break
+                paren = self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
+                expr = Call(callee, paren, arguments)
+
+    def __prefix(self) -> Expr:
+        token = self.__lookahead
+        if token.type in UNARY_OPERATORS:
+            self.__advance()
+            return Unary(token, self.__prefix())
+        expr = self.__primary()
+        if self.__lookahead.type in POSTFIX_OPERATORS:
+            expr = self.__postfix(expr)
         return expr
 
+    def __postfix(self, expr: Expr) -> Expr:
+        while True:
+            if self.__match(TokenType.LEFT_PAREN):
+                expr = self.__finish_call(expr)
+            elif self.__match(TokenType.DOT):
+                name = self.__consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+                expr = Get(expr, name)
+            else:
+                return expr
+
+    def __finish_call(self, callee: Expr) -> Expr:
+        arguments = []
+        if not self.__check(TokenType.RIGHT_PAREN):
+            while True:
+                if len(arguments) >= MAX_ARGUMENTS:
+                    self.__error(self.__peek(), f"Can't have more than {MAX_ARGUMENTS} arguments.")
+                arguments.append(self.__expression())
+                if not self.__match(TokenType.COMMA):
+                    break
+        paren = self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
+        return Call(callee, paren, arguments)
+
+    def __primary(self) -> Expr:
+        token = self.__lookahead
+        type = token.type
+        if type == TokenType.NUMBER or type == TokenType.STRING:
+            self.__advance()
+            return Literal(token.literal)
+        if type == TokenType.IDENTIFIER:
+            self.__advance()
+            return Variable(token)
+        if type in LITERAL_VALUES:
+            self.__advance()
+            return Literal(LITERAL_VALUES[type])
+        if type == TokenType.LEFT_PAREN:
+            self.__advance()
+            expr = self.__expression()
+            self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+            return Grouping(expr)
+        if type == TokenType.THIS:
+            self.__advance()
+            return This(token)
+        if type == TokenType.SUPER:
+            self.__advance()
+            self.__consume(TokenType.DOT, "Expect '.' after 'super'.")
+            method = self.__consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+            return Super(token, method)
+        raise self.__error(token, "Unexpected token.")
+
     def __match(self, *types: TokenType) -> bool:
         for type in types:
             if self.__check(type):
@@ -44,69 +262,18 @@ class Parser:
 
     def __advance(self) -> Token:
         if not self.__is_at_end():
-            self.__current += 1
+            self.__last = self.__lookahead
+            self.__lookahead = next(self.__tokens)
         return self.__previous()
 
     def __is_at_end(self) -> bool:
         return self.__peek().type == TokenType.EOF
 
     def __peek(self) -> Token:
-        return self.__tokens[self.__current]
+        return self.__lookahead
 
     def __previous(self) -> Token:
-        return self.__tokens[self.__current - 1]
-
-    def __comparison(self) -> Expr:
-        expr = self.__term()
-
-        while self.__match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.__previous()
-            right = self.__term()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def __term(self) -> Expr:
-        expr = self.__factor()
-
-        while self.__match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.__previous()
-            right = self.__term()
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def __factor(self) -> Expr:
-        expr = self.__unary()
-
-        while self.__match(TokenType.SLASH, TokenType.STAR):
-            operator = self.__previous()
-            right = self.__unary()
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def __unary(self) -> Expr:
-        if self.__match(TokenType.BANG, TokenType.MINUS):
-            operator = self.__previous()
-            right = self.__unary()
-            return Unary(operator, right)
-
-        return self.__primary()
-
-    def __primary(self) -> Expr:
-        if self.__match(TokenType.FALSE):
-            return Literal(False)
-        if self.__match(TokenType.TRUE):
-            return Literal(True)
-        if self.__match(TokenType.NIL):
-            return Literal(None)
-        if self.__match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.__previous().literal)
-        if self.__match(TokenType.LEFT_PAREN):
-            expr = self.__expression()
-            self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-        raise self.__error(self.__peek(), "Unexpected token.")
+        return self.__last
 
     def __consume(self, type: TokenType, message: str) -> Token:
         if self.__check(type):
@@ -114,7 +281,7 @@ class Parser:
         raise self.__error(self.__peek(), message)
 
     def __error(self, token: Token, message: str) -> Exception:
-        Parser.error(token, message)
+        self.error(token, message)
         return Exception()
 
     def __synchronize(self) -> None:
@@ -138,9 +305,8 @@ class Parser:
                     return
             self.__advance()
 
-    @classmethod
-    def error(cls, token: Token, message: str) -> None:
+    def error(self, token: Token, message: str) -> None:
         if token.type == TokenType.EOF:
-            Parser.__reporter(token.line, " at end", message)
+            self.reporter(token.offset, " at end", message)
         else:
-            Parser.__reporter(token.line, f" at '{token.lexeme}'", message)
+            self.reporter(token.offset, f" at '{token.lexeme}'", message)
@@ -2,68 +2,463 @@
 Python Interpretor based on https://craftinginterpreters.com/
 """
 
+import argparse
+import asyncio
+import glob
+import io
+import json
+import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Iterable, NamedTuple, TextIO
 
-from ast_printer import AstPrinter
+from bytecode import CompileError
+from compile_cache import CompileCache, default_directory
+from context import CompilationContext
+from expression import Expr
+from instrumentation import IGNORED, Stats, TokenCounter
+from interpreter import stringify
+from line_index import LineIndex
+from optimizer import ConstantFolder
+from parallel_scanner import ParallelScanner
 from parser import Parser
-from scanner import Scanner
+from regex_scanner import RegexScanner
+from resolver import Resolver
+from scanner import Scanner, Token
+from stream_scanner import CHUNK_SIZE, StreamScanner
 
+__version__ = "0.1.0"
 
-def main() -> None:
-    if len(sys.argv) > 2:
-        print("Usage: plox [script]")
+SCANNERS = {"classic": Scanner, "regex": RegexScanner, "parallel": ParallelScanner}
+
+# Longest request line a --serve session accepts.
+MAX_REQUEST = 1 << 20
+
+# Connections a --serve server lets wait to be accepted; asyncio's default of
+# 100 turns away a burst of new sessions.
+BACKLOG = 1024
+
+# Requests up to this many characters are run on the event loop, where they take
+# less time than a trip through the worker pool would; longer ones could stall
+# every other session, so they are run in the pool.  With --transpile every
+# request is run in the pool, since each goes through CPython's compiler, whose
+# cost does not shrink with the request.
+INLINE_REQUEST = 256
+
+
+class CommandLineParser(argparse.ArgumentParser):
+    def error(self, message: str) -> None:
+        self.print_usage()
         sys.exit(64)
-    elif len(sys.argv) == 2:
-        run_file(sys.argv[1])
+
+
+def main() -> None:
+    parser = CommandLineParser(prog="plox", description=__doc__)
+    parser.add_argument("script", nargs="?", help="file to run; starts a prompt when omitted")
+    parser.add_argument(
+        "--batch",
+        metavar="DIR_OR_GLOB",
+        help="run every .lox file under a directory, or every file matching a glob, in worker processes",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="number of worker processes for --batch, or of evaluation threads for --serve (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="serve prompt sessions on a Unix socket path, or on TCP at [HOST:]PORT (default host: localhost)",
+    )
+    backends = parser.add_mutually_exclusive_group()
+    backends.add_argument(
+        "--vm",
+        action="store_const",
+        const="vm",
+        dest="backend",
+        help="compile to bytecode and run it on the stack VM instead of walking the tree",
+    )
+    backends.add_argument(
+        "--closures",
+        action="store_const",
+        const="closure",
+        dest="backend",
+        help="compile the tree into nested Python closures and run those",
+    )
+    backends.add_argument(
+        "--transpile",
+        action="store_const",
+        const="python",
+        dest="backend",
+        help="translate the tree into Python source, compile that with compile() and run it",
+    )
+    parser.set_defaults(backend="ast")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always scan and parse the script instead of using the compile cache in $PLOX_CACHE_DIR",
+    )
+    parser.add_argument(
+        "--dump-python",
+        action="store_true",
+        help="with --transpile, print the generated Python source of each program to stderr",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print phase times, token and node counts and tree depth to stderr when done",
+    )
+    arguments = parser.parse_args()
+    stats = Stats() if arguments.stats else None
+    if arguments.dump_python and arguments.backend != "python":
+        parser.error("--dump-python needs --transpile")
+    if arguments.serve is not None:
+        if (
+            arguments.script is not None
+            or arguments.batch is not None
+            or arguments.jobs < 1
+            or arguments.dump_python
+        ):
+            parser.error("--serve takes no script, --batch or --dump-python and needs at least one job")
+        run_server(arguments.serve, arguments.backend, arguments.jobs)
+    elif arguments.batch is not None:
+        if arguments.script is not None or arguments.jobs < 1 or arguments.dump_python:
+            parser.error("--batch takes no script or --dump-python and needs at least one job")
+        status = run_batch(arguments.batch, arguments.backend, arguments.jobs, not arguments.no_cache)
+        if status:
+            sys.exit(status)
+    elif arguments.script is not None:
+        cache = None if arguments.no_cache else CompileCache(default_directory(), __version__)
+        context = CompilationContext(backend=arguments.backend, cache=cache, instrumentation=stats)
+        if arguments.dump_python:
+            context.runner.listing = sys.stderr
+        status = run_path(arguments.script, context)
+        if stats is not None:
+            print(stats.report(), file=sys.stderr)
+        if status:
+            sys.exit(status)
     else:
-        run_prompt()
+        context = CompilationContext(backend=arguments.backend, instrumentation=stats)
+        if arguments.dump_python:
+            context.runner.listing = sys.stderr
+        run_prompt(context)
+        if stats is not None:
+            print(stats.report(), file=sys.stderr)
+
+
+def run_file(path: str, context: CompilationContext) -> None:
+    status = run_path(path, context)
+    if status:
+        sys.exit(status)
 
 
-class ErrorReporter:
-    had_error: bool = False
+def run_path(path: str, context: CompilationContext) -> int:
+    """Runs the script at path and returns the exit status it calls for."""
+    with open(path, "r", encoding="utf-8") as file:
+        if context.cache is None:
+            if context.instrumentation is not None:
+                context.instrumentation.source(os.fstat(file.fileno()).st_size)
+            run_stream(file, context)
+        else:
+            run_cached(file, context)
+    return context.status()
 
-    @classmethod
-    def report_error(cls, line: int, where: str, message: str) -> None:
-        print(f"[line {line}] Error{where}: {message}")
-        ErrorReporter.had_error = True
 
+class BatchResult(NamedTuple):
+    path: str
+    status: int
+    output: str
+    seconds: float
 
-def run_file(path: str) -> None:
-    with open(path, "r") as file:
-        content = file.read()
-        run(content)
-        if ErrorReporter.had_error:
-            sys.exit(65)
 
+def batch_paths(pattern: str) -> list[str]:
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.lox")
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
 
-def run_prompt() -> None:
+
+def run_batch(pattern: str, backend: str = "ast", jobs: int = 1, cached: bool = True) -> int:
+    """
+    Runs every script matched by pattern across jobs worker processes.
+
+    Each script's output is printed in one piece under a header as soon as it
+    finishes, so the order follows completion rather than the file names.
+    Returns the highest exit status of any script.
+    """
+    paths = batch_paths(pattern)
+    if not paths:
+        print(f"No scripts match '{pattern}'.", file=sys.stderr)
+        return 66
+    cache_directory = default_directory() if cached else None
+    sizes = {path: os.path.getsize(path) for path in paths}
+    status = 0
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_batch_file, path, backend, cache_directory) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"==> {result.path} [exit {result.status}, {result.seconds * 1e3:.1f} ms]")
+            print(result.output, end="", flush=True)
+            status = max(status, result.status)
+            failed += result.status != 0
+    elapsed = time.perf_counter() - start
+    total = sum(sizes.values())
+    print(
+        f"{len(paths)} scripts, {failed} failed, {total / 1024:.1f} KB in {elapsed:.2f} s "
+        f"({len(paths) / elapsed:.1f} scripts/s, {total / 1024 / elapsed:.1f} KB/s) on {jobs} jobs"
+    )
+    return status
+
+
+def run_batch_file(path: str, backend: str, cache_directory: str | None) -> BatchResult:
+    # Runs in a worker process.  Every script gets its own context, so error
+    # flags and globals never carry over from one script to the next.
+    cache = None if cache_directory is None else CompileCache(cache_directory, __version__)
+    output = io.StringIO()
+    context = CompilationContext(backend=backend, cache=cache, out=output)
+    start = time.perf_counter()
+    try:
+        status = run_path(path, context)
+    except OSError as error:
+        context.write(f"Could not read '{path}': {error.strerror}.")
+        status = 66
+    except ValueError as error:
+        # Raised as UnicodeDecodeError by a file that is not UTF-8 text.
+        context.write(f"Could not read '{path}': {error}.")
+        status = 65
+    except RecursionError:
+        context.write(f"Could not run '{path}': it nests too deeply.")
+        status = 70
+    return BatchResult(path, status, output.getvalue(), time.perf_counter() - start)
+
+
+def run_prompt(context: CompilationContext) -> None:
     while True:
         try:
             line = input("> ")
-            run(line)
-            ErrorReporter.had_error = False
+            run(line, context)
+            context.reset()
         except EOFError:
             break
 
 
-def run(source: str) -> None:
-    tokens = Scanner(source, error).scan_tokens()
+def server_address(address: str) -> tuple[str, int] | str:
+    """Returns the (host, port) of a TCP address such as "8000" or "0.0.0.0:8000", or else a socket path."""
+    host, _, port = address.rpartition(":")
+    if port.isdigit() and "/" not in host:
+        return host or "127.0.0.1", int(port)
+    return address
 
-    parser = Parser(tokens, report)
-    expression = parser.parse()
 
-    if ErrorReporter.had_error:
-        return
-    if expression:
-        print(AstPrinter().print(expression))
+def run_server(address: str, backend: str = "ast", jobs: int = 1) -> None:
+    async def main() -> None:
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="plox") as pool:
+            server = await start_server(address, backend, pool)
+            name = server.sockets[0].getsockname()
+            if isinstance(name, tuple):
+                name = f"{name[0]}:{name[1]}"
+            print(f"Serving sessions on {name}", file=sys.stderr)
+            try:
+                async with server:
+                    await server.serve_forever()
+            finally:
+                if not isinstance(server_address(address), tuple) and os.path.exists(address):
+                    os.unlink(address)
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
 
+async def start_server(address: str, backend: str, pool: Executor) -> asyncio.Server:
+    """
+    Starts serving prompt sessions on address, each connection being one session.
 
-def error(line: int, message: str) -> None:
-    report(line, "", message)
+    A session sends one program per line and gets one JSON line back for each,
+    holding the exit status the program calls for and everything it printed.
+    Every session has its own context, so its globals and diagnostics persist
+    from one line to the next but are never seen by another session.
+    """
+
+    async def session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        context = CompilationContext(backend=backend)
+        try:
+            while line := await reader.readline():
+                source = line.decode("utf-8", "replace").rstrip("\r\n")
+                if len(source) <= inline:
+                    response = respond(source, context)
+                else:
+                    # The session waits for its own reply, so its context is
+                    # never used by two threads at once.
+                    response = await loop.run_in_executor(pool, respond, source, context)
+                writer.write(response)
+                await writer.drain()
+        except (ValueError, ConnectionError):
+            # A line longer than MAX_REQUEST, or the client went away.
+            pass
+        finally:
+            writer.close()
 
+    inline = -1 if backend == "python" else INLINE_REQUEST
+    where = server_address(address)
+    if isinstance(where, tuple):
+        return await asyncio.start_server(session, *where, limit=MAX_REQUEST, backlog=BACKLOG)
+    return await asyncio.start_unix_server(session, where, limit=MAX_REQUEST, backlog=BACKLOG)
 
-def report(line: int, where: str, message: str) -> None:
-    ErrorReporter.report_error(line, where, message)
+
+def respond(source: str, context: CompilationContext) -> bytes:
+    output = io.StringIO()
+    context.out = output
+    run(source, context)
+    response = {"status": context.status(), "output": output.getvalue()}
+    context.reset()
+    return json.dumps(response).encode() + b"\n"
+
+
+def run(source: str, context: CompilationContext | None = None) -> CompilationContext:
+    """Runs source in context, or in a fresh default context, and returns the context."""
+    if context is None:
+        context = CompilationContext()
+    context.lines = LineIndex(source)
+    if context.instrumentation is not None:
+        context.instrumentation.source(len(source.encode("utf-8", "surrogatepass")))
+    run_tokens(scan(source, context), context)
+    return context
+
+
+def scan(source: str, context: CompilationContext) -> list[Token]:
+    scanner = SCANNERS[context.scanner](source, context.error)
+    start = time.perf_counter()
+    tokens = scanner.scan_tokens()
+    (context.instrumentation or IGNORED).phase("scan", time.perf_counter() - start)
+    return tokens
+
+
+def run_stream(stream: TextIO, context: CompilationContext) -> None:
+    scanner = StreamScanner(stream, context.error)
+    context.lines = scanner.lines
+    run_tokens(scanner.iter_tokens(), context)
+
+
+def run_cached(stream: TextIO, context: CompilationContext) -> None:
+    # The key hashes the whole source, so the stream is read once for it and, on
+    # a miss, once more by the StreamScanner; neither pass holds more than a
+    # chunk of it.  In exchange a hit skips scanning and parsing altogether.
+    cache = context.cache
+    instrumentation = context.instrumentation or IGNORED
+    start = time.perf_counter()
+    digest = cache.digest()
+    lines = LineIndex()
+    size = 0
+    while chunk := stream.read(CHUNK_SIZE):
+        lines.extend(chunk)
+        data = chunk.encode("utf-8", "surrogatepass")
+        digest.update(data)
+        size += len(data)
+    key = digest.hexdigest()
+    expression = cache.load_key(key)
+    instrumentation.source(size)
+    instrumentation.phase("cache", time.perf_counter() - start)
+    if expression is not None:
+        instrumentation.tree(expression)
+    if expression is None:
+        stream.seek(0)
+        scanner = StreamScanner(stream, context.error)
+        context.lines = scanner.lines
+        expression = compile_tokens(scanner.iter_tokens(), context)
+        if expression is None:
+            return
+        cache.store_key(key, expression)
+    else:
+        context.lines = lines
+    execute(expression, context)
+
+
+def run_tokens(tokens: Iterable[Token], context: CompilationContext) -> None:
+    expression = compile_tokens(tokens, context)
+    if expression is not None:
+        execute(expression, context)
+
+
+def compile_tokens(tokens: Iterable[Token], context: CompilationContext) -> Expr | None:
+    """Parses and optimizes tokens, returning None if a compile error was reported."""
+    instrumentation = context.instrumentation or IGNORED
+    # A lazy token source scans while the parser pulls from it, so the time
+    # spent inside the source counts as scanning and the rest as parsing.
+    # Counting reads the clock twice a token, so only an instrumented run does.
+    counter = None if context.instrumentation is None else TokenCounter(tokens)
+    tokens = iter(tokens) if counter is None else counter
+    start = time.perf_counter()
+    expression = Parser(tokens, context.report).parse()
+    # The parser stops after one expression; drain a lazy token source so
+    # scan errors in the rest of the input are still reported.
+    deque(tokens, maxlen=0)
+    elapsed = time.perf_counter() - start
+    if counter is not None:
+        instrumentation.phase("scan", counter.seconds)
+        elapsed -= counter.seconds
+    instrumentation.phase("parse", elapsed)
+    if counter is not None:
+        instrumentation.tokens(counter.counts)
+    if expression is None and not context.had_error:
+        # Only running out of stack stops the parser without a report.
+        too_deep(context)
+    if context.had_error or expression is None:
+        return None
+    instrumentation.tree(expression)
+    folder = ConstantFolder()
+    start = time.perf_counter()
+    try:
+        expression = folder.optimize(expression)
+    except RecursionError:
+        too_deep(context)
+        return None
+    instrumentation.phase("optimize", time.perf_counter() - start)
+    instrumentation.folded(folder.removed)
+    return expression
+
+
+def too_deep(context: CompilationContext) -> None:
+    # The recursive parser and the passes after it recurse on the tree, so deep
+    # nesting, or a long operator chain the parser built in a loop, can run them
+    # out of stack; that is reported like any other compile error.
+    context.report(0, "", "Expression nests too deeply.")
+
+
+def execute(expression: Expr, context: CompilationContext) -> None:
+    try:
+        evaluate(expression, context)
+    except RecursionError:
+        too_deep(context)
+    except CompileError as error:
+        # The VM compiles just before it runs, into a chunk whose operands
+        # cannot address every constant or jump of a very large program.
+        context.report(0, "", str(error))
+
+
+def evaluate(expression: Expr, context: CompilationContext) -> None:
+    instrumentation = context.instrumentation or IGNORED
+    runner = context.runner
+    start = time.perf_counter()
+    locations = Resolver(runner.globals, context.report).resolve(expression)
+    instrumentation.phase("resolve", time.perf_counter() - start)
+    if context.had_error:
+        return
+    runner.resolve(locations)
+    start = time.perf_counter()
+    value = runner.interpret(expression)
+    instrumentation.phase("evaluate", time.perf_counter() - start)
+    if not context.had_runtime_error:
+        start = time.perf_counter()
+        context.write(stringify(value))
+        instrumentation.phase("output", time.perf_counter() - start)
 
 
 if __name__ == "__main__":
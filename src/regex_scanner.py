@@ -0,0 +1,82 @@
+"""
+Scanner engine driven by a single compiled master regular expression.
+
+Produces exactly the same tokens, offsets and diagnostics as scanner.Scanner,
+but lets the regex engine match whole lexemes instead of stepping through the
+source one character at a time.
+"""
+
+import re
+from typing import Callable
+
+from scanner import Token, TokenType, keywords
+
+# Alternatives are tried in order, so the comment must come before the SLASH
+# operator and the terminated string before the unterminated one.  With
+# re.ASCII, letters and digits are the ASCII ones the classic scanner accepts.
+PATTERN = re.compile(
+    r"""
+      (?P<SPACE>[ \r\t\n]+)
+    | (?P<COMMENT>//[^\n]*)
+    | (?P<IDENTIFIER>[^\W\d_][^\W_]*)
+    | (?P<NUMBER>\d+(?:\.\d+)?)
+    | (?P<OPERATOR>[!=<>]=?|[(){},.\-+;*/])
+    | (?P<STRING>"[^"]*")
+    | (?P<UNTERMINATED>"[^"]*)
+    | (?P<ERROR>.)
+    """,
+    re.VERBOSE | re.DOTALL | re.ASCII,
+)
+
+OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+
+class RegexScanner:
+    def __init__(self, source: str, reporter: Callable[[int, str], None]) -> None:
+        self.source = source
+        self.reporter = reporter
+        self.tokens = []
+
+    def scan_tokens(self) -> list[Token]:
+        tokens = self.tokens
+        append = tokens.append
+        operators = OPERATORS
+        for match in PATTERN.finditer(self.source):
+            kind = match.lastgroup
+            if kind == "SPACE":
+                continue
+            text = match.group()
+            if kind == "IDENTIFIER":
+                append(Token(keywords.get(text, TokenType.IDENTIFIER), text, None, match.start()))
+            elif kind == "OPERATOR":
+                append(Token(operators[text], text, None, match.start()))
+            elif kind == "NUMBER":
+                append(Token(TokenType.NUMBER, text, float(text), match.start()))
+            elif kind == "STRING":
+                append(Token(TokenType.STRING, text, text[1:-1], match.start()))
+            elif kind == "UNTERMINATED":
+                self.reporter(match.start(), "Unterminated string.")
+            elif kind == "ERROR":
+                self.reporter(match.start(), "Unexpected character.")
+        append(Token(TokenType.EOF, "", None, len(self.source)))
+        return tokens
@@ -0,0 +1,101 @@
+"""
+Static resolution of variable references to environment slots.
+
+Runs after parsing and computes, for every Variable and Assign, the number of
+scopes between the reference and its declaration and the slot it occupies
+there.  Backends use the resulting side table to index flat slot lists instead
+of looking names up in dicts.  Names that resolve nowhere, and 'this' or
+'super' outside of a class, are reported as static errors.
+"""
+
+from typing import Callable
+
+from expression import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+    Visitor,
+)
+from interpreter import Environment
+from scanner import Token
+
+Location = tuple[int, int]
+
+
+class Resolver(Visitor[None]):
+    def __init__(self, environment: Environment, reporter: Callable[[int, str, str], None]) -> None:
+        # Innermost scope last.  Only the global scope exists so far, but every
+        # lookup walks the chain so that block and function scopes slot in later.
+        self.scopes: list[dict[str, int]] = []
+        while environment is not None:
+            self.scopes.insert(0, environment.names)
+            environment = environment.enclosing
+        self.reporter = reporter
+        self.locations: dict[Expr, Location] = {}
+
+    def resolve(self, expression: Expr) -> dict[Expr, Location]:
+        expression.accept(self)
+        return self.locations
+
+    def __resolve_local(self, expr: Expr, name: Token) -> None:
+        for depth, scope in enumerate(reversed(self.scopes)):
+            slot = scope.get(name.lexeme)
+            if slot is not None:
+                self.locations[expr] = (depth, slot)
+                return
+        self.__error(name, f"Undefined variable '{name.lexeme}'.")
+
+    def __error(self, token: Token, message: str) -> None:
+        self.reporter(token.offset, f" at '{token.lexeme}'", message)
+
+    def visit_assign_expr(self, expr: Assign) -> None:
+        expr.value.accept(self)
+        self.__resolve_local(expr, expr.name)
+
+    def visit_binary_expr(self, expr: Binary) -> None:
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_call_expr(self, expr: Call) -> None:
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+
+    def visit_get_expr(self, expr: Get) -> None:
+        expr.object.accept(self)
+
+    def visit_grouping_expr(self, expr: Grouping) -> None:
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal) -> None:
+        pass
+
+    def visit_logical_expr(self, expr: Logical) -> None:
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_set_expr(self, expr: Set) -> None:
+        expr.value.accept(self)
+        expr.object.accept(self)
+
+    def visit_super_expr(self, expr: Super) -> None:
+        self.__error(expr.keyword, "Can't use 'super' outside of a class.")
+
+    def visit_this_expr(self, expr: This) -> None:
+        self.__error(expr.keyword, "Can't use 'this' outside of a class.")
+
+    def visit_unary_expr(self, expr: Unary) -> None:
+        expr.right.accept(self)
+
+    def visit_variable_expr(self, expr: Variable) -> None:
+        self.__resolve_local(expr, expr.name)
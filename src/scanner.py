@@ -49,7 +49,7 @@ class TokenType(IntEnum):
     EOF = 39
 
 
-__keywords = MappingProxyType(
+keywords = MappingProxyType(
     {
         "and": TokenType.AND,
         "class": TokenType.CLASS,
@@ -72,30 +72,43 @@ __keywords = MappingProxyType(
 
 
 class Token:
-    def __init__(self, type: TokenType, lexeme: str, literal: None | str | float, line: int) -> None:
+    # Only the offset of the first character is kept; a LineIndex of the source
+    # turns it into a line and column when a diagnostic needs them.
+    __slots__ = ("type", "lexeme", "literal", "offset")
+
+    def __init__(self, type: TokenType, lexeme: str, literal: None | str | float, offset: int) -> None:
         self.type = type
         self.lexeme = lexeme
         self.literal = literal
-        self.line = line
+        self.offset = offset
 
     def __repr__(self) -> str:
         return f"({self.type.name} {self.lexeme} {self.literal})"
 
 
+# Identifiers and numbers are spelled in ASCII only; str.isdigit() alone would
+# also take characters such as "²" that float() cannot read.
+def is_digit(c: str) -> bool:
+    return "0" <= c <= "9"
+
+
+def is_alpha(c: str) -> bool:
+    return "a" <= c <= "z" or "A" <= c <= "Z"
+
+
 class Scanner:
     def __init__(self, source: str, reporter: Callable[[int, str], None]) -> None:
         self.source = source
         self.start = 0
         self.reporter = reporter
         self.current = 0
-        self.line = 1
         self.tokens = []
 
     def scan_tokens(self) -> list[Token]:
         while not self.__is_at_end():
             self.start = self.current
             self.__scan_token()
-        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        self.tokens.append(Token(TokenType.EOF, "", None, self.current))
         return self.tokens
 
     def __is_at_end(self) -> bool:
@@ -138,23 +151,21 @@ class Scanner:
                         self.__advance()
                 else:
                     self.__add_token(TokenType.SLASH)
-            case " " | "\r" | "\t":
+            case " " | "\r" | "\t" | "\n":
                 pass  # ignore white space
-            case "\n":
-                self.line += 1
             case '"':
                 self.__string()
             case _:
-                if c.isdigit():
+                if is_digit(c):
                     self.__number()
-                elif c.isalpha():
+                elif is_alpha(c):
                     self.__identifier()
                 else:
-                    self.reporter(self.line, "Unexpected character.")
+                    self.reporter(self.start, "Unexpected character.")
 
     def __add_token(self, type: TokenType, literal: None | str | float = None) -> None:
         text = self.source[self.start : self.current]
-        self.tokens.append(Token(type, text, literal, self.line))
+        self.tokens.append(Token(type, text, literal, self.start))
 
     def __advance(self) -> str:
         c = self.source[self.current]
@@ -174,35 +185,33 @@ class Scanner:
 
     def __string(self) -> None:
         while self.__peek() != '"' and not self.__is_at_end():
-            if self.__peek() == "\n":
-                self.line += 1
             self.__advance()
         if self.__is_at_end():
-            self.reporter(self.line, "Unterminated string.")
+            self.reporter(self.start, "Unterminated string.")
             return
         self.__advance()
         value = self.source[self.start + 1 : self.current - 1]
         self.__add_token(TokenType.STRING, value)
 
     def __number(self) -> None:
-        while self.__peek().isdigit():
+        while is_digit(self.__peek()):
             self.__advance()
 
-        if self.__peek() == "." and self.__peek_next().isdigit():
+        if self.__peek() == "." and is_digit(self.__peek_next()):
             self.__advance()
-            while self.__peek().isdigit():
+            while is_digit(self.__peek()):
                 self.__advance()
         self.__add_token(TokenType.NUMBER, float(self.source[self.start : self.current]))
 
     def __identifier(self) -> None:
-        while self.__peek().isalnum():
+        while is_alpha(self.__peek()) or is_digit(self.__peek()):
             self.__advance()
         text = self.source[self.start : self.current]
-        type = __keywords.get(text)
+        type = keywords.get(text)
         type = type if type else TokenType.IDENTIFIER
         self.__add_token(type)
 
     def __peek_next(self) -> str:
-        if self.current + 1 > len(self.source):
+        if self.current + 1 >= len(self.source):
             return "\0"
         return self.source[self.current + 1]
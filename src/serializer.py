@@ -0,0 +1,412 @@
+"""
+Compact, versioned binary encoding of Expr trees and token streams.
+
+Layout, after a 4-byte magic, a format version byte and a kind byte:
+
+    string table    varint count, the varint length of each string in
+                    characters, then all strings as one UTF-8 blob
+    constant table  varint count, then per constant a tag byte, followed by
+                    8 bytes for a number or a string index for a string
+    body            a tree in preorder, or a varint count and that many tokens
+
+A node is its tag byte (then the argument count of a call, or the constant
+index of a literal), followed by its children with its tokens in between where
+they stand in the source, so the operator of a binary node comes after its
+left operand.  A token is a byte holding its type and two flags, the string
+index of its lexeme, then the constant index of its literal unless that is
+nil, and the zigzag varint difference between its source offset and the end
+of the previous token unless that is one character.  Varints are little-endian
+base 128, so any index below 128 takes one byte and a typical token two.
+
+Both directions use an explicit stack, so trees of any depth round-trip.
+"""
+
+import struct
+from typing import Iterable
+
+from expression import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from scanner import Token, TokenType
+
+MAGIC = b"LOX\x00"
+VERSION = 2
+TREE = 0x45
+TOKENS = 0x54
+
+NIL, TRUE, FALSE, NUMBER, STRING = range(5)
+
+ASSIGN, BINARY, CALL, GET, GROUPING, LITERAL, LOGICAL, SET, SUPER, THIS, UNARY, VARIABLE = range(12)
+TAGS = {
+    Assign: ASSIGN,
+    Binary: BINARY,
+    Call: CALL,
+    Get: GET,
+    Grouping: GROUPING,
+    Literal: LITERAL,
+    Logical: LOGICAL,
+    Set: SET,
+    Super: SUPER,
+    This: THIS,
+    Unary: UNARY,
+    Variable: VARIABLE,
+}
+
+# Interior nodes with a fixed number of children, and how to build each one
+# from its token and its decoded children.
+CHILDREN = {ASSIGN: 1, BINARY: 2, GET: 1, LOGICAL: 2, SET: 2, UNARY: 1}
+# Where the token of an interior node is written: before its children, after
+# the first one or after the last one, which is its place in the source.
+TOKEN_FIRST = frozenset((ASSIGN, UNARY))
+TOKEN_SECOND = frozenset((BINARY, LOGICAL, SET))
+TOKEN_LAST = frozenset((CALL, GET))
+BUILDERS = {
+    ASSIGN: lambda token, children: Assign(token, children[0]),
+    BINARY: lambda token, children: Binary(children[0], token, children[1]),
+    CALL: lambda token, children: Call(children[0], token, children[1:]),
+    GET: lambda token, children: Get(children[0], token),
+    GROUPING: lambda token, children: Grouping(children[0]),
+    LOGICAL: lambda token, children: Logical(children[0], token, children[1]),
+    SET: lambda token, children: Set(children[0], token, children[1]),
+    UNARY: lambda token, children: Unary(token, children[0]),
+}
+
+# The first byte of a token holds its type in the low bits and flags for the
+# two common cases of a nil literal and of a token that starts one character
+# after the previous one ends, which then take no further bytes.
+TYPE_MASK = 0x3F
+NO_LITERAL = 0x40
+SPACED = 0x80
+
+# Indexed by the integer value of a TokenType, which is far cheaper than
+# calling the enum.
+TOKEN_TYPES = tuple(next((type for type in TokenType if type == value), None) for value in range(TYPE_MASK + 1))
+
+DOUBLE = struct.Struct("<d")
+
+
+class FormatError(ValueError):
+    pass
+
+
+class Encoder:
+    def __init__(self) -> None:
+        self.body = bytearray()
+        self.end = 0
+        self.strings: dict[str, int] = {}
+        # Keyed by type as well, so that 1.0 and True get separate entries, and
+        # by repr for floats, so that 0.0 and -0.0 do.
+        self.constants: dict[tuple[type, object], int] = {}
+        self.values: list[object] = []
+
+    def string(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def constant(self, value: object) -> int:
+        key = (float, repr(value)) if type(value) is float else (type(value), value)
+        index = self.constants.get(key)
+        if index is None:
+            if type(value) is str:
+                self.string(value)
+            elif value is not None and type(value) not in (bool, float):
+                raise FormatError(f"Can't encode constant {value!r}.")
+            index = self.constants[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def token(self, token: Token) -> None:
+        body = self.body
+        head = token.type
+        literal = token.literal
+        delta = token.offset - self.end
+        self.end = token.offset + len(token.lexeme)
+        if literal is None:
+            head |= NO_LITERAL
+        if delta == 1:
+            head |= SPACED
+        body.append(head)
+        write_varint(body, self.string(token.lexeme))
+        if literal is not None:
+            write_varint(body, self.constant(literal))
+        if delta != 1:
+            write_varint(body, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+
+    def expr(self, root: Expr) -> None:
+        body = self.body
+        # Tokens go on the stack among the nodes, so they come out in source
+        # order and each one's offset is close to the end of the one before.
+        pending: list[Expr | Token] = [root]
+        while pending:
+            node = pending.pop()
+            cls = node.__class__
+            if cls is Token:
+                self.token(node)
+                continue
+            body.append(TAGS[cls])
+            if cls is Binary or cls is Logical:
+                pending.append(node.right)
+                pending.append(node.operator)
+                pending.append(node.left)
+            elif cls is Literal:
+                write_varint(body, self.constant(node.value))
+            elif cls is Variable:
+                self.token(node.name)
+            elif cls is Grouping:
+                pending.append(node.expression)
+            elif cls is Unary:
+                self.token(node.operator)
+                pending.append(node.right)
+            elif cls is Assign:
+                self.token(node.name)
+                pending.append(node.value)
+            elif cls is Call:
+                write_varint(body, len(node.arguments))
+                pending.append(node.paren)
+                pending.extend(reversed(node.arguments))
+                pending.append(node.callee)
+            elif cls is Get:
+                pending.append(node.name)
+                pending.append(node.object)
+            elif cls is Set:
+                pending.append(node.value)
+                pending.append(node.name)
+                pending.append(node.object)
+            elif cls is Super:
+                self.token(node.keyword)
+                self.token(node.method)
+            else:
+                self.token(node.keyword)
+
+    def finish(self, kind: int) -> bytes:
+        """Returns the header and both tables followed by the body written so far."""
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        out.append(kind)
+        write_varint(out, len(self.strings))
+        for string in self.strings:
+            write_varint(out, len(string))
+        blob = "".join(self.strings).encode("utf-8", "surrogatepass")
+        write_varint(out, len(blob))
+        out += blob
+        write_varint(out, len(self.values))
+        for value in self.values:
+            if value is None:
+                out.append(NIL)
+            elif value is True:
+                out.append(TRUE)
+            elif value is False:
+                out.append(FALSE)
+            elif type(value) is float:
+                out.append(NUMBER)
+                out += DOUBLE.pack(value)
+            else:
+                out.append(STRING)
+                write_varint(out, self.strings[value])
+        out += self.body
+        return bytes(out)
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Decoder:
+    def __init__(self, data: bytes, kind: int) -> None:
+        if data[:4] != MAGIC:
+            raise FormatError("Not a serialized Lox program.")
+        if len(data) < 6 or data[4] != VERSION:
+            raise FormatError(f"Unsupported format version {data[4] if len(data) > 4 else None}.")
+        if data[5] != kind:
+            raise FormatError("Serialized data holds a different kind of object.")
+        self.data = data
+        self.end = 0
+        count, pos = read_varint(data, 6)
+        lengths = []
+        for _ in range(count):
+            length, pos = read_varint(data, pos)
+            lengths.append(length)
+        size, pos = read_varint(data, pos)
+        blob = data[pos : pos + size].decode("utf-8", "surrogatepass")
+        pos += size
+        self.strings: list[str] = []
+        start = 0
+        for length in lengths:
+            self.strings.append(blob[start : start + length])
+            start += length
+        count, pos = read_varint(data, pos)
+        self.constants: list[object] = []
+        for _ in range(count):
+            tag = data[pos]
+            pos += 1
+            if tag == NIL:
+                self.constants.append(None)
+            elif tag == TRUE:
+                self.constants.append(True)
+            elif tag == FALSE:
+                self.constants.append(False)
+            elif tag == NUMBER:
+                self.constants.append(DOUBLE.unpack_from(data, pos)[0])
+                pos += 8
+            elif tag == STRING:
+                index, pos = read_varint(data, pos)
+                self.constants.append(self.strings[index])
+            else:
+                raise FormatError(f"Unknown constant tag {tag}.")
+        self.pos = pos
+
+    def token(self) -> Token:
+        data = self.data
+        pos = self.pos
+        head = data[pos]
+        type = TOKEN_TYPES[head & TYPE_MASK]
+        if type is None:
+            raise FormatError(f"Unknown token type {head & TYPE_MASK}.")
+        # Single-byte varints are by far the most common, so they are read inline.
+        lexeme = data[pos + 1]
+        pos += 2
+        if lexeme >= 0x80:
+            lexeme, pos = read_varint(data, pos - 1)
+        literal = None
+        if not head & NO_LITERAL:
+            index = data[pos]
+            pos += 1
+            if index >= 0x80:
+                index, pos = read_varint(data, pos - 1)
+            literal = self.constants[index]
+        if head & SPACED:
+            offset = self.end + 1
+        else:
+            delta = data[pos]
+            pos += 1
+            if delta >= 0x80:
+                delta, pos = read_varint(data, pos - 1)
+            offset = self.end + (-((delta + 1) >> 1) if delta & 1 else delta >> 1)
+        lexeme = self.strings[lexeme]
+        self.end = offset + len(lexeme)
+        self.pos = pos
+        return Token(type, lexeme, literal, offset)
+
+    def expr(self) -> Expr:
+        data = self.data
+        constants = self.constants
+        token = self.token
+        builders = BUILDERS
+        children_of = CHILDREN
+        # Frames of interior nodes still waiting for children: tag, token,
+        # children so far and the number of children expected.  A token comes
+        # where it stands in the source, so an infix node reads it after its
+        # first child and a call or property access after its last.
+        pending: list[list] = []
+        while True:
+            tag = data[self.pos]
+            self.pos += 1
+            if tag == LITERAL:
+                index = data[self.pos]
+                self.pos += 1
+                if index >= 0x80:
+                    index, self.pos = read_varint(data, self.pos - 1)
+                node = Literal(constants[index])
+            elif tag == VARIABLE:
+                node = Variable(token())
+            elif tag in children_of:
+                pending.append([tag, token() if tag in TOKEN_FIRST else None, [], children_of[tag]])
+                continue
+            elif tag == GROUPING:
+                pending.append([tag, None, [], 1])
+                continue
+            elif tag == CALL:
+                count, self.pos = read_varint(data, self.pos)
+                pending.append([tag, None, [], count + 1])
+                continue
+            elif tag == THIS:
+                node = This(token())
+            elif tag == SUPER:
+                node = Super(token(), token())
+            else:
+                raise FormatError(f"Unknown node tag {tag}.")
+            while pending:
+                frame = pending[-1]
+                children = frame[2]
+                children.append(node)
+                if len(children) == 1 and frame[0] in TOKEN_SECOND:
+                    frame[1] = token()
+                if len(children) < frame[3]:
+                    break
+                pending.pop()
+                if frame[0] in TOKEN_LAST:
+                    frame[1] = token()
+                node = builders[frame[0]](frame[1], children)
+            else:
+                return node
+
+    def tokens(self) -> list[Token]:
+        count, self.pos = read_varint(self.data, self.pos)
+        token = self.token
+        return [token() for _ in range(count)]
+
+    def finish(self) -> None:
+        if self.pos != len(self.data):
+            raise FormatError("Trailing data after the serialized object.")
+
+
+def dumps(expr: Expr) -> bytes:
+    encoder = Encoder()
+    encoder.expr(expr)
+    return encoder.finish(TREE)
+
+
+def dumps_tokens(tokens: Iterable[Token]) -> bytes:
+    tokens = list(tokens)
+    encoder = Encoder()
+    write_varint(encoder.body, len(tokens))
+    for token in tokens:
+        encoder.token(token)
+    return encoder.finish(TOKENS)
+
+
+def loads(data: bytes) -> Expr:
+    return load(data, TREE)
+
+
+def loads_tokens(data: bytes) -> list[Token]:
+    return load(data, TOKENS)
+
+
+def load(data: bytes, kind: int) -> object:
+    try:
+        decoder = Decoder(data, kind)
+        result = decoder.expr() if kind == TREE else decoder.tokens()
+        decoder.finish()
+    except (IndexError, UnicodeDecodeError, struct.error) as error:
+        raise FormatError("Truncated or corrupt serialized data.") from error
+    return result
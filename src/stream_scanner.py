@@ -0,0 +1,79 @@
+"""
+Incremental scanner that tokenizes a text stream in fixed-size chunks.
+
+Uses the master pattern from regex_scanner, so it produces exactly the same
+tokens and diagnostics as the other scanners, but only ever holds the unread
+tail of the current chunk plus the lexeme being matched.  Each chunk is added
+to the scanner's LineIndex as it is read, since the source is gone by the time
+a diagnostic asks for a line.
+"""
+
+from typing import Callable, Iterator, TextIO
+
+from line_index import LineIndex
+from regex_scanner import OPERATORS, PATTERN
+from scanner import Token, TokenType, keywords
+
+CHUNK_SIZE = 1 << 16
+
+# A number needs two characters of lookahead ("1" followed by ".5"), every other
+# lexeme at most one.  Matches ending closer than this to the end of the buffer
+# might still grow once the next chunk arrives.
+LOOKAHEAD = 2
+
+
+class StreamScanner:
+    def __init__(
+        self, stream: TextIO, reporter: Callable[[int, str], None], chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        self.stream = stream
+        self.reporter = reporter
+        self.chunk_size = chunk_size
+        self.lines = LineIndex()
+
+    def scan_tokens(self) -> list[Token]:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        read = self.stream.read
+        operators = OPERATORS
+        buffer = ""
+        # Offset in the source of buffer[0].
+        base = 0
+        position = 0
+        at_eof = False
+        while True:
+            limit = len(buffer) - LOOKAHEAD
+            for match in PATTERN.finditer(buffer, position):
+                if not at_eof and match.end() > limit:
+                    break
+                position = match.end()
+                kind = match.lastgroup
+                if kind == "SPACE":
+                    continue
+                text = match.group()
+                if kind == "IDENTIFIER":
+                    yield Token(keywords.get(text, TokenType.IDENTIFIER), text, None, base + match.start())
+                elif kind == "OPERATOR":
+                    yield Token(operators[text], text, None, base + match.start())
+                elif kind == "NUMBER":
+                    yield Token(TokenType.NUMBER, text, float(text), base + match.start())
+                elif kind == "STRING":
+                    yield Token(TokenType.STRING, text, text[1:-1], base + match.start())
+                elif kind == "UNTERMINATED":
+                    self.reporter(base + match.start(), "Unterminated string.")
+                elif kind == "ERROR":
+                    self.reporter(base + match.start(), "Unexpected character.")
+            if at_eof:
+                break
+            # Grow the read size with the pending tail so a single huge lexeme is
+            # rematched a logarithmic rather than linear number of times.
+            chunk = read(max(self.chunk_size, len(buffer) - position))
+            if chunk:
+                self.lines.extend(chunk)
+                base += position
+                buffer = buffer[position:] + chunk
+                position = 0
+            else:
+                at_eof = True
+        yield Token(TokenType.EOF, "", None, base + len(buffer))
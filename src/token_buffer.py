@@ -0,0 +1,110 @@
+"""
+Struct-of-arrays token storage.
+
+A TokenBuffer keeps one compact array.array column per token field instead of a
+Token object per token.  Lexemes and literals are sliced out of the source only
+when a token is looked at, and Token objects are created on demand as views.
+"""
+
+from array import array
+from typing import Callable, Iterator
+
+from regex_scanner import OPERATORS, PATTERN
+from scanner import Token, TokenType, keywords
+
+TYPES = {type.value: type for type in TokenType}
+
+
+class TokenBuffer:
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+
+    def append(self, type: TokenType, start: int, end: int) -> None:
+        self.types.append(type)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        type = TYPES[self.types[index]]
+        return Token(type, self.lexeme(index), self.literal(index), self.starts[index])
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.types)):
+            yield self[index]
+
+    def tokens(self) -> list[Token]:
+        """Returns every token as a Token object, in one pass over the columns."""
+        source = self.source
+        number = TokenType.NUMBER
+        string = TokenType.STRING
+        types = TYPES
+        tokens = []
+        append = tokens.append
+        for type, start, end in zip(self.types, self.starts, self.ends, strict=True):
+            lexeme = source[start:end]
+            if type == number:
+                append(Token(number, lexeme, float(lexeme), start))
+            elif type == string:
+                append(Token(string, lexeme, lexeme[1:-1], start))
+            else:
+                append(Token(types[type], lexeme, None, start))
+        return tokens
+
+    def type(self, index: int) -> TokenType:
+        return TYPES[self.types[index]]
+
+    def lexeme(self, index: int) -> str:
+        return self.source[self.starts[index] : self.ends[index]]
+
+    def literal(self, index: int) -> None | str | float:
+        type = self.types[index]
+        if type == TokenType.NUMBER:
+            return float(self.lexeme(index))
+        if type == TokenType.STRING:
+            return self.source[self.starts[index] + 1 : self.ends[index] - 1]
+        return None
+
+    def nbytes(self) -> int:
+        """Bytes held by the token columns, not counting the shared source."""
+        return sum(column.itemsize * len(column) for column in (self.types, self.starts, self.ends))
+
+
+def scan_buffer(source: str, reporter: Callable[[int, str], None]) -> TokenBuffer:
+    """Scans source with the regex engine straight into a TokenBuffer."""
+    buffer = TokenBuffer(source)
+    types = buffer.types.append
+    starts = buffer.starts.append
+    ends = buffer.ends.append
+    operators = OPERATORS
+    for match in PATTERN.finditer(source):
+        kind = match.lastgroup
+        if kind == "SPACE":
+            continue
+        if kind == "IDENTIFIER":
+            type = keywords.get(match.group(), TokenType.IDENTIFIER)
+        elif kind == "OPERATOR":
+            type = operators[match.group()]
+        elif kind == "NUMBER":
+            type = TokenType.NUMBER
+        elif kind == "STRING":
+            type = TokenType.STRING
+        elif kind == "UNTERMINATED":
+            reporter(match.start(), "Unterminated string.")
+            continue
+        elif kind == "ERROR":
+            reporter(match.start(), "Unexpected character.")
+            continue
+        else:
+            continue
+        start, end = match.span()
+        types(type)
+        starts(start)
+        ends(end)
+    buffer.append(TokenType.EOF, len(source), len(source))
+    return buffer
@@ -0,0 +1,290 @@
+"""
+Backend that transpiles each Expr tree into Python source and runs it as Python.
+
+A tree becomes one Python function in three-address form.  Every node stores
+its value in a local temporary, so Lox evaluation order is kept exactly, and a
+temporary is reused once its value has been consumed.  Operations take an
+inline path when both operands are numbers and otherwise call the
+interpreter's checked operations, which raise the same runtime errors.
+Truthiness and equality are spelled out in Lox terms, so Python's own rules,
+under which 0 and "" are false and 1.0 == True, never apply.  The source is
+compiled once with compile(), and evaluation then runs as CPython bytecode.
+"""
+
+import math
+from types import MappingProxyType
+from typing import Callable, TextIO
+
+from closure_compiler import ClosureCompiler
+from expression import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+    Visitor,
+)
+from interpreter import BINARY_OPERATIONS, Clock, Environment, LoxCallable, LoxRuntimeError, negate
+from scanner import Token, TokenType
+
+Program = Callable[[list[object], Environment, object], object]
+
+# Python spelling of the operators that have an inline path for two numbers.
+NUMBER_OPERATORS = MappingProxyType(
+    {
+        TokenType.PLUS: "+",
+        TokenType.MINUS: "-",
+        TokenType.STAR: "*",
+        TokenType.SLASH: "/",
+        TokenType.GREATER: ">",
+        TokenType.GREATER_EQUAL: ">=",
+        TokenType.LESS: "<",
+        TokenType.LESS_EQUAL: "<=",
+    }
+)
+
+
+def call(paren: Token, function: object, arguments: list[object], interpreter: object) -> object:
+    if not isinstance(function, LoxCallable):
+        raise LoxRuntimeError(paren, "Can only call functions and classes.")
+    if len(arguments) != function.arity():
+        raise LoxRuntimeError(paren, f"Expected {function.arity()} arguments but got {len(arguments)}.")
+    return function.call(interpreter, arguments)
+
+
+# Globals of every generated module, besides its constants k0, k1, ...
+NAMESPACE = MappingProxyType(
+    {
+        **{operation.__name__: operation for operation in BINARY_OPERATIONS.values()},
+        "negate": negate,
+        "call": call,
+        "LoxRuntimeError": LoxRuntimeError,
+    }
+)
+
+
+class Transpiler(Visitor[str]):
+    """
+    Emits the statements of each node and returns the Python expression for
+    its value: a temporary, or the spelling of a literal.
+    """
+
+    def __init__(self, locations: dict[Expr, tuple[int, int]]) -> None:
+        self.locations = locations
+        self.lines: list[str] = []
+        self.indent = "    "
+        self.constants: list[object] = []
+        self.temporaries: set[str] = set()
+        self.free: list[str] = []
+
+    def transpile(self, expression: Expr) -> tuple[str, list[object]]:
+        """Returns the source of a function program(slots, environment, interpreter) and its constants."""
+        result = expression.accept(self)
+        lines = ["def program(slots, environment, interpreter):", *self.lines, f"    return {result}"]
+        return "\n".join(lines) + "\n", self.constants
+
+    def visit_assign_expr(self, expr: Assign) -> str:
+        value = expr.value.accept(self)
+        if value not in self.temporaries:
+            # The value of the assignment is a temporary, like that of every
+            # other operator, so it never reaches another one as a literal.
+            result = self.__temporary()
+            self.__emit(f"{result} = {value}")
+            value = result
+        location = self.locations.get(expr)
+        if location is None:
+            self.__emit(f"environment.assign({self.__constant(expr.name)}, {value})")
+        elif location[0] == 0:
+            self.__emit(f"slots[{location[1]}] = {value}")
+        else:
+            self.__emit(f"environment.assign_at({location[0]}, {location[1]}, {value})")
+        return value
+
+    def visit_binary_expr(self, expr: Binary) -> str:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        self.__release(left, right)
+        result = self.__temporary()
+        type = expr.operator.type
+        if type == TokenType.EQUAL_EQUAL or type == TokenType.BANG_EQUAL:
+            test = f"{left}.__class__ is {right}.__class__ and {left} == {right}"
+            self.__emit(f"{result} = {test}" if type == TokenType.EQUAL_EQUAL else f"{result} = not ({test})")
+            return result
+
+        checked = f"{BINARY_OPERATIONS[type].__name__}({self.__constant(expr.operator)}, {left}, {right})"
+        conditions = []
+        for operand, node in ((left, expr.left), (right, expr.right)):
+            if node.__class__ is not Literal:
+                conditions.append(f"{operand}.__class__ is float")
+            elif node.value.__class__ is not float:
+                # A literal that is not a number always takes the checked path.
+                self.__emit(f"{result} = {checked}")
+                return result
+        if type == TokenType.SLASH and (expr.right.__class__ is not Literal or expr.right.value == 0.0):
+            # A zero divisor takes the checked path, which reports it.
+            conditions.append(right)
+        inline = f"{left} {NUMBER_OPERATORS[type]} {right}"
+        if conditions:
+            self.__emit(f"{result} = {inline} if {' and '.join(conditions)} else {checked}")
+        else:
+            self.__emit(f"{result} = {inline}")
+        return result
+
+    def visit_call_expr(self, expr: Call) -> str:
+        callee = expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        self.__release(callee, *arguments)
+        result = self.__temporary()
+        self.__emit(
+            f"{result} = call({self.__constant(expr.paren)}, {callee}, [{', '.join(arguments)}], interpreter)"
+        )
+        return result
+
+    def visit_get_expr(self, expr: Get) -> str:
+        self.__release(expr.object.accept(self))
+        self.__emit(f"raise LoxRuntimeError({self.__constant(expr.name)}, 'Only instances have properties.')")
+        return "None"
+
+    def visit_grouping_expr(self, expr: Grouping) -> str:
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal) -> str:
+        value = expr.value
+        if value.__class__ is float and not math.isfinite(value):
+            return self.__constant(value)
+        text = repr(value)
+        return f"({text})" if text.startswith("-") else text
+
+    def visit_logical_expr(self, expr: Logical) -> str:
+        left = expr.left.accept(self)
+        if left in self.temporaries:
+            result = left
+        else:
+            result = self.__temporary()
+            self.__emit(f"{result} = {left}")
+        if expr.operator.type == TokenType.OR:
+            self.__emit(f"if {result} is None or {result} is False:")
+        else:
+            self.__emit(f"if {result} is not None and {result} is not False:")
+        outer = self.indent
+        self.indent += "    "
+        right = expr.right.accept(self)
+        self.__release(right)
+        self.__emit(f"{result} = {right}")
+        self.indent = outer
+        return result
+
+    def visit_set_expr(self, expr: Set) -> str:
+        self.__release(expr.object.accept(self))
+        self.__emit(f"raise LoxRuntimeError({self.__constant(expr.name)}, 'Only instances have fields.')")
+        return "None"
+
+    def visit_super_expr(self, expr: Super) -> str:
+        self.__emit(
+            f"raise LoxRuntimeError({self.__constant(expr.keyword)}, \"Can't use 'super' outside of a class.\")"
+        )
+        return "None"
+
+    def visit_this_expr(self, expr: This) -> str:
+        self.__emit(
+            f"raise LoxRuntimeError({self.__constant(expr.keyword)}, \"Can't use 'this' outside of a class.\")"
+        )
+        return "None"
+
+    def visit_unary_expr(self, expr: Unary) -> str:
+        right = expr.right.accept(self)
+        self.__release(right)
+        result = self.__temporary()
+        if expr.operator.type == TokenType.BANG:
+            if right in self.temporaries:
+                self.__emit(f"{result} = {right} is None or {right} is False")
+            else:
+                # Comparing a literal with "is" is a SyntaxWarning.
+                self.__emit(f"{result} = {right in ('None', 'False')}")
+        else:
+            self.__emit(
+                f"{result} = -{right} if {right}.__class__ is float else negate({self.__constant(expr.operator)}, {right})"
+            )
+        return result
+
+    def visit_variable_expr(self, expr: Variable) -> str:
+        # Read into a temporary, so an assignment later in the expression
+        # cannot change a value that was already evaluated.
+        result = self.__temporary()
+        location = self.locations.get(expr)
+        if location is None:
+            self.__emit(f"{result} = environment.get({self.__constant(expr.name)})")
+        elif location[0] == 0:
+            self.__emit(f"{result} = slots[{location[1]}]")
+        else:
+            self.__emit(f"{result} = environment.get_at({location[0]}, {location[1]})")
+        return result
+
+    def __emit(self, line: str) -> None:
+        self.lines.append(self.indent + line)
+
+    def __constant(self, value: object) -> str:
+        self.constants.append(value)
+        return f"k{len(self.constants) - 1}"
+
+    def __temporary(self) -> str:
+        if self.free:
+            return self.free.pop()
+        name = f"t{len(self.temporaries)}"
+        self.temporaries.add(name)
+        return name
+
+    def __release(self, *operands: str) -> None:
+        for operand in operands:
+            if operand in self.temporaries:
+                self.free.append(operand)
+
+
+class TranspilingInterpreter:
+    def __init__(self, reporter: Callable[[LoxRuntimeError], None]) -> None:
+        self.globals = Environment()
+        self.globals.define("clock", Clock())
+        self.reporter = reporter
+        self.locals: dict[Expr, tuple[int, int]] = {}
+        # When set, receives the Python source of every program before it runs.
+        self.listing: TextIO | None = None
+
+    def resolve(self, locations: dict[Expr, tuple[int, int]]) -> None:
+        """Records the (depth, slot) of variable references computed by the Resolver."""
+        # Replaced rather than merged, so a session does not keep every earlier tree alive.
+        self.locals = locations
+
+    def interpret(self, expression: Expr) -> object:
+        """Transpiles and runs expression, reporting a runtime error and returning None if one occurs."""
+        return self.execute(self.compile(expression))
+
+    def compile(self, expression: Expr) -> Program:
+        source, constants = Transpiler(self.locals).transpile(expression)
+        if self.listing is not None:
+            self.listing.write(source)
+        namespace = dict(NAMESPACE)
+        namespace.update((f"k{index}", value) for index, value in enumerate(constants))
+        try:
+            code = compile(source, "<lox>", "exec")
+        except (SyntaxError, RecursionError):
+            # CPython limits the nesting of blocks, which long chains of
+            # right-nested and/or reach; such trees run as closures instead.
+            compiled = ClosureCompiler(self).compile(expression)
+            return lambda slots, environment, interpreter: compiled(environment)
+        exec(code, namespace)
+        return namespace["program"]
+
+    def execute(self, program: Program) -> object:
+        try:
+            return program(self.globals.slots, self.globals, self)
+        except LoxRuntimeError as error:
+            self.reporter(error)
+            return None
@@ -0,0 +1,210 @@
+"""
+Stack-based virtual machine that runs the bytecode produced by bytecode.Compiler.
+
+Values are the same Python objects the tree-walking Interpreter uses, and the
+arithmetic, equality and truthiness rules are shared with it.
+"""
+
+from typing import Callable
+
+from bytecode import Chunk, Compiler, OpCode
+from expression import Expr
+from interpreter import (
+    Clock,
+    Environment,
+    LoxCallable,
+    LoxRuntimeError,
+    add,
+    divide,
+    greater,
+    greater_equal,
+    is_equal,
+    less,
+    less_equal,
+    multiply,
+    subtract,
+)
+
+# The dispatch loop compares against plain ints, which is cheaper than IntEnum members.
+CONSTANT = OpCode.CONSTANT.value
+NIL = OpCode.NIL.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+POP = OpCode.POP.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+GET_PROPERTY = OpCode.GET_PROPERTY.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+ADD = OpCode.ADD.value
+SUBTRACT = OpCode.SUBTRACT.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+NOT = OpCode.NOT.value
+NEGATE = OpCode.NEGATE.value
+JUMP_IF_FALSE_OR_POP = OpCode.JUMP_IF_FALSE_OR_POP.value
+JUMP_IF_TRUE_OR_POP = OpCode.JUMP_IF_TRUE_OR_POP.value
+CALL = OpCode.CALL.value
+RAISE = OpCode.RAISE.value
+RETURN = OpCode.RETURN.value
+GET_SLOT = OpCode.GET_SLOT.value
+SET_SLOT = OpCode.SET_SLOT.value
+
+
+class VM:
+    def __init__(self, reporter: Callable[[LoxRuntimeError], None]) -> None:
+        self.globals = Environment()
+        self.globals.define("clock", Clock())
+        self.reporter = reporter
+        self.locals: dict[Expr, tuple[int, int]] = {}
+
+    def resolve(self, locations: dict[Expr, tuple[int, int]]) -> None:
+        """Records the (depth, slot) of variable references computed by the Resolver."""
+        # Replaced rather than merged, so a session does not keep every earlier tree alive.
+        self.locals = locations
+
+    def interpret(self, expression: Expr) -> object:
+        """Compiles and runs expression, reporting a runtime error and returning None if one occurs."""
+        return self.execute(Compiler(self.locals).compile(expression))
+
+    def execute(self, chunk: Chunk) -> object:
+        try:
+            return self.run(chunk)
+        except LoxRuntimeError as error:
+            self.reporter(error)
+            return None
+
+    def run(self, chunk: Chunk) -> object:
+        # Indexing a list skips the boxing of every word read from the array.
+        code = chunk.code.tolist()
+        constants = chunk.constants
+        tokens = chunk.tokens
+        names = self.globals.names
+        slots = self.globals.slots
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        ip = 0
+        # Opcodes are told apart by a short tree of range tests on their values
+        # rather than one long chain, so no instruction is more than eight
+        # comparisons away; within each range the common ones come first.  Each
+        # binary operator applies Python's operator straight away when both
+        # operands are numbers and falls back to the interpreter's checked
+        # operation otherwise.
+        while True:
+            instruction = code[ip]
+            if instruction == CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+                continue
+            ip += 1
+            if instruction >= ADD:
+                if instruction <= DIVIDE:
+                    right = pop()
+                    left = stack[-1]
+                    if instruction == ADD:
+                        if type(left) is float and type(right) is float:
+                            stack[-1] = left + right
+                        else:
+                            stack[-1] = add(tokens[ip - 1], left, right)
+                    elif instruction == MULTIPLY:
+                        if type(left) is float and type(right) is float:
+                            stack[-1] = left * right
+                        else:
+                            stack[-1] = multiply(tokens[ip - 1], left, right)
+                    elif instruction == SUBTRACT:
+                        if type(left) is float and type(right) is float:
+                            stack[-1] = left - right
+                        else:
+                            stack[-1] = subtract(tokens[ip - 1], left, right)
+                    else:
+                        stack[-1] = divide(tokens[ip - 1], left, right)
+                elif instruction <= JUMP_IF_TRUE_OR_POP:
+                    value = stack[-1]
+                    if instruction == JUMP_IF_FALSE_OR_POP:
+                        if value is None or value is False:
+                            ip += code[ip] + 1
+                        else:
+                            pop()
+                            ip += 1
+                    elif instruction == JUMP_IF_TRUE_OR_POP:
+                        if value is None or value is False:
+                            pop()
+                            ip += 1
+                        else:
+                            ip += code[ip] + 1
+                    elif instruction == NEGATE:
+                        if type(value) is not float:
+                            raise LoxRuntimeError(tokens[ip - 1], "Operand must be a number.")
+                        stack[-1] = -value
+                    else:
+                        stack[-1] = value is None or value is False
+                elif instruction == GET_SLOT:
+                    push(slots[code[ip]])
+                    ip += 1
+                elif instruction == SET_SLOT:
+                    slots[code[ip]] = stack[-1]
+                    ip += 1
+                elif instruction == CALL:
+                    count = code[ip]
+                    ip += 1
+                    arguments = stack[len(stack) - count :]
+                    del stack[len(stack) - count :]
+                    callee = stack[-1]
+                    token = tokens[ip - 2]
+                    if not isinstance(callee, LoxCallable):
+                        raise LoxRuntimeError(token, "Can only call functions and classes.")
+                    if count != callee.arity():
+                        raise LoxRuntimeError(token, f"Expected {callee.arity()} arguments but got {count}.")
+                    stack[-1] = callee.call(self, arguments)
+                elif instruction == RAISE:
+                    raise LoxRuntimeError(tokens[ip - 1], constants[code[ip]])
+                else:
+                    return pop()
+            elif instruction >= EQUAL:
+                right = pop()
+                left = stack[-1]
+                if instruction == LESS:
+                    if type(left) is float and type(right) is float:
+                        stack[-1] = left < right
+                    else:
+                        stack[-1] = less(tokens[ip - 1], left, right)
+                elif instruction == GREATER:
+                    if type(left) is float and type(right) is float:
+                        stack[-1] = left > right
+                    else:
+                        stack[-1] = greater(tokens[ip - 1], left, right)
+                elif instruction == EQUAL:
+                    stack[-1] = is_equal(left, right)
+                elif instruction == NOT_EQUAL:
+                    stack[-1] = not is_equal(left, right)
+                elif instruction == LESS_EQUAL:
+                    stack[-1] = less_equal(tokens[ip - 1], left, right)
+                else:
+                    stack[-1] = greater_equal(tokens[ip - 1], left, right)
+            elif instruction == POP:
+                pop()
+            elif instruction == GET_GLOBAL:
+                name = constants[code[ip]]
+                if name not in names:
+                    raise LoxRuntimeError(tokens[ip - 1], f"Undefined variable '{name}'.")
+                push(slots[names[name]])
+                ip += 1
+            elif instruction == NIL:
+                push(None)
+            elif instruction == TRUE:
+                push(True)
+            elif instruction == FALSE:
+                push(False)
+            elif instruction == SET_GLOBAL:
+                name = constants[code[ip]]
+                if name not in names:
+                    raise LoxRuntimeError(tokens[ip - 1], f"Undefined variable '{name}'.")
+                slots[names[name]] = stack[-1]
+                ip += 1
+            else:
+                raise LoxRuntimeError(tokens[ip - 1], "Only instances have properties.")
@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from ast_printer import AstPrinter
+from expression import Grouping, Literal, Unary
+from parser import Parser
+from scanner import Scanner, Token, TokenType
+
+
+def show(source: str) -> str:
+    return AstPrinter().print(Parser(Scanner(source, print).scan_tokens(), print).parse())
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("a = b = 1", "(= a (= b 1.0))"),
+        ("f(1, g(x))()", "(call (call f 1.0 (call g x)))"),
+        ("a.b.c", "(. (. a b) c)"),
+        ("a.b = c and d or e", "(= (. a b) (or (and c d) e))"),
+        ("super.method", "(super method)"),
+        ("this.x", "(. this x)"),
+    ],
+)
+def test_prints_every_node_type(source: str, expected: str) -> None:
+    assert show(source) == expected
+
+
+@pytest.mark.parametrize(("source", "expected"), [("false", "False"), ("0", "0.0"), ('""', ""), ("nil", "nil")])
+def test_falsy_literals_are_not_nil(source: str, expected: str) -> None:
+    assert show(source) == expected
+
+
+def test_deep_tree_does_not_recurse() -> None:
+    minus = Token(TokenType.MINUS, "-", None, 1)
+    expr = Literal(1.0)
+    for depth in range(100_000):
+        expr = Grouping(expr) if depth % 2 else Unary(minus, expr)
+    text = AstPrinter().print(expr)
+    assert text.startswith("(group (- (group (- ") and text.endswith(" 1.0" + ")" * 100_000)
+
+
+def test_writes_to_stream_in_chunks() -> None:
+    class Recorder(io.StringIO):
+        writes = 0
+
+        def write(self, text: str) -> int:
+            self.writes += 1
+            return super().write(text)
+
+    source = " + ".join(["(1 * x)"] * 2000)
+    out = Recorder()
+    AstPrinter().write(Parser(Scanner(source, print).scan_tokens(), print).parse(), out)
+    assert out.getvalue() == show(source)
+    assert 1 < out.writes < 20
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from closure_compiler import ClosureInterpreter
+from interpreter import Interpreter
+from parser import Parser
+from scanner import Scanner
+
+
+def outcome(backend_type: type, source: str) -> tuple[type, object, list[tuple[str, int]]]:
+    errors = []
+    backend = backend_type(lambda error: errors.append((error.message, error.token.offset)))
+    backend.globals.define("x", 2.0)
+    value = backend.interpret(Parser(Scanner(source, print).scan_tokens(), print).parse())
+    return type(value), value, errors
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "1 + 2 * 3 - 4 / 8",
+        '"con" + "cat" == "concat"',
+        "!(1 < 2) != (3 >= 4)",
+        "nil or false or 0",
+        "1 and nil and undefined",
+        "x = x * x + 1",
+        "1 / (x - 2)",
+        "-nil",
+        "clock() > 0",
+        "clock(1)",
+        "x.field = undefined",
+        "this",
+    ],
+)
+def test_closures_match_interpreter(source: str) -> None:
+    assert outcome(ClosureInterpreter, source) == outcome(Interpreter, source)
+
+
+def test_closures_match_interpreter_on_random_expressions() -> None:
+    rng = random.Random(7)
+    operands = ["1", "2.5", "0", "x", "true", "nil", '"s"']
+    operators = ["+", "-", "*", "/", "<", ">", "<=", "==", "!=", "and", "or"]
+
+    def generate(depth: int) -> str:
+        if depth > 4 or rng.random() < 0.3:
+            return rng.choice(operands)
+        if rng.random() < 0.2:
+            return rng.choice(["-", "!"]) + generate(depth + 1)
+        return f"({generate(depth + 1)} {rng.choice(operators)} {generate(depth + 1)})"
+
+    for _ in range(500):
+        source = generate(0)
+        assert outcome(ClosureInterpreter, source) == outcome(Interpreter, source), source
@@ -0,0 +1,123 @@
+import io
+import os
+import pathlib
+
+import pytest
+
+import optimizer
+import plox
+import serializer
+from compile_cache import CompileCache
+from context import CompilationContext
+from expression import Expr
+from parser import Parser
+from scanner import Scanner, Token
+
+
+def parse(source: str) -> Expr:
+    return Parser(Scanner(source, print).scan_tokens(), print).parse()
+
+
+def shape(value: object) -> object:
+    """Everything a node holds, as nested tuples that compare by value."""
+    if isinstance(value, Expr):
+        return (type(value).__name__, *(shape(getattr(value, slot)) for slot in type(value).__slots__))
+    if isinstance(value, list):
+        return [shape(item) for item in value]
+    if isinstance(value, Token):
+        return (value.type, value.lexeme, shape(value.literal), value.offset)
+    return (type(value), value)
+
+
+def test_store_then_load(tmp_path: pathlib.Path) -> None:
+    cache = CompileCache(str(tmp_path), "1")
+    assert cache.load("1 + 2") is None
+    cache.store("1 + 2", parse("1 + 2"))
+    assert shape(cache.load("1 + 2")) == shape(parse("1 + 2"))
+    assert [name for name in os.listdir(tmp_path) if not name.endswith(".loxc")] == []
+
+
+def test_key_depends_on_version_and_source(tmp_path: pathlib.Path) -> None:
+    keys = {
+        CompileCache(str(tmp_path), "1").key("1 + 2"),
+        CompileCache(str(tmp_path), "2").key("1 + 2"),
+        CompileCache(str(tmp_path), "1").key("1 + 3"),
+    }
+    assert len(keys) == 3
+
+
+def test_key_depends_on_format_and_folding_rules(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = CompileCache(str(tmp_path), "1")
+    key = cache.key("1 + 2")
+    monkeypatch.setattr(optimizer, "VERSION", optimizer.VERSION + 1)
+    assert cache.key("1 + 2") != key
+    monkeypatch.undo()
+    monkeypatch.setattr(serializer, "VERSION", serializer.VERSION + 1)
+    assert cache.key("1 + 2") != key
+
+
+def test_corrupt_entry_is_a_miss(tmp_path: pathlib.Path) -> None:
+    cache = CompileCache(str(tmp_path), "1")
+    with open(cache.path("1"), "wb") as file:
+        file.write(b"not serialized data")
+    assert cache.load("1") is None
+    assert not os.path.exists(cache.path("1"))
+
+
+def test_evicts_least_recently_used(tmp_path: pathlib.Path) -> None:
+    cache = CompileCache(str(tmp_path), "1")
+    sources = ["1 + 1", "2 + 2", "3 + 3"]
+    for age, source in enumerate(sources):
+        cache.store(source, parse(source))
+        os.utime(cache.path(source), ns=(age * 10**9, age * 10**9))
+    size = os.path.getsize(cache.path(sources[0]))
+    cache.load(sources[0])
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert cache.load(sources[1]) is None
+    assert cache.load(sources[0]) is not None and cache.load(sources[2]) is not None
+
+
+def test_hit_skips_scanner_and_parser(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = CompileCache(str(tmp_path), plox.__version__)
+    output = io.StringIO()
+    plox.run_cached(io.StringIO("(1 + 2) * 3"), CompilationContext(cache=cache, out=output))
+    assert output.getvalue() == "9\n"
+
+    def forbidden(*args: object) -> None:
+        raise AssertionError("scanned or parsed on a cache hit")
+
+    monkeypatch.setitem(plox.SCANNERS, "classic", forbidden)
+    monkeypatch.setattr(plox, "StreamScanner", forbidden)
+    monkeypatch.setattr(plox, "Parser", forbidden)
+    output = io.StringIO()
+    plox.run_cached(io.StringIO("(1 + 2) * 3"), CompilationContext(cache=cache, out=output))
+    assert output.getvalue() == "9\n"
+
+
+def test_compile_errors_are_not_cached(tmp_path: pathlib.Path) -> None:
+    context = CompilationContext(cache=CompileCache(str(tmp_path), plox.__version__), out=io.StringIO())
+    plox.run_cached(io.StringIO("1 +"), context)
+    assert context.status() == 65
+    assert os.listdir(tmp_path) == []
+
+
+def test_scripts_are_hashed_and_scanned_a_chunk_at_a_time(tmp_path: pathlib.Path) -> None:
+    source = "// café\n" * 30_000 + "clock == 1"
+    reads = []
+
+    class Stream(io.StringIO):
+        def read(self, size: int | None = -1) -> str:
+            reads.append(size)
+            return super().read(size)
+
+    cache = CompileCache(str(tmp_path), plox.__version__)
+    output = io.StringIO()
+    plox.run_cached(Stream(source), CompilationContext(cache=cache, out=output))
+    assert len(source) > 2 * plox.CHUNK_SIZE
+    assert reads and all(0 < size <= plox.CHUNK_SIZE for size in reads)
+    assert cache.load(source) is not None
+    plox.run_cached(io.StringIO(source), CompilationContext(cache=cache, out=output))
+    assert output.getvalue() == "false\nfalse\n"
@@ -0,0 +1,95 @@
+import io
+import pathlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import pytest
+
+import plox
+from context import CompilationContext, Diagnostic
+from parser import Parser
+from scanner import Scanner
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches() -> Iterator[None]:
+    # Switching threads as often as possible makes runs interleave mid-parse.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def source(n: int) -> str:
+    body = " + ".join(f"{n} * {k}" for k in range(50))
+    match n % 4:
+        case 0:
+            return body
+        case 1:
+            return f"{body} + (1 +"
+        case 2:
+            return f"{body} + nil"
+        case _:
+            return f"{body} + {'#' * (n % 5)} missing{n}"
+
+
+def outcome(n: int, backend: str) -> tuple[str, list[Diagnostic], int]:
+    output = io.StringIO()
+    context = plox.run(source(n), CompilationContext(backend=backend, out=output))
+    return output.getvalue(), context.diagnostics, context.status()
+
+
+def test_diagnostics_render_with_line_and_column() -> None:
+    output = io.StringIO()
+    context = CompilationContext(out=output)
+    plox.run("1 + ", context)
+    assert context.diagnostics == [Diagnostic(1, 5, "Unexpected token.", " at end")]
+    context.reset()
+    assert context.diagnostics == []
+    plox.run("\n  -nil", context)
+    assert output.getvalue() == (
+        "[line 1, column 5] Error at end: Unexpected token.\nOperand must be a number.\n[line 2, column 3]\n"
+    )
+    assert context.diagnostics == [Diagnostic(2, 3, "Operand must be a number.", runtime=True)]
+
+
+def test_streamed_scripts_report_lines_and_columns(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "script.lox"
+    path.write_text('"two\nlines" +\n\n  1 +')
+    output = io.StringIO()
+    assert plox.run_path(str(path), CompilationContext(out=output)) == 65
+    assert output.getvalue() == "[line 4, column 6] Error at end: Unexpected token.\n"
+
+
+def test_prompt_context_keeps_globals_between_runs() -> None:
+    output = io.StringIO()
+    context = CompilationContext(out=output)
+    plox.run("clock = 2", context)
+    plox.run("clock * 3", context)
+    assert output.getvalue() == "2\n6\n"
+    assert CompilationContext().runner.globals is not context.runner.globals
+
+
+def test_concurrent_parsers_report_to_their_own_reporters() -> None:
+    def parse(n: int) -> list[tuple]:
+        errors = []
+
+        def reporter(*error: object) -> None:
+            errors.append(error)
+
+        Parser(Scanner(f"{'(' * 200}{n} +", reporter).scan_tokens(), reporter).parse()
+        return errors
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(parse, range(400)))
+    assert results == [[(len(f"{'(' * 200}{n} +"), " at end", "Unexpected token.")] for n in range(400)]
+
+
+@pytest.mark.parametrize("backend", ["ast", "vm", "closure"])
+def test_concurrent_runs_get_their_own_diagnostics(backend: str) -> None:
+    expected = [outcome(n, backend) for n in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(outcome, range(200), [backend] * 200))
+    assert results == expected
+    assert {status for _, _, status in results} == {0, 65, 70}
@@ -0,0 +1,192 @@
+import random
+
+import pytest
+
+from expression import Binary, Call, Grouping
+from incremental_parser import IncrementalParser
+from incremental_scanner import IncrementalScanner
+from parser import Parser
+from regex_scanner import RegexScanner
+from scanner import TokenType
+from serializer import dumps
+
+OPERANDS = frozenset((TokenType.IDENTIFIER, TokenType.NUMBER, TokenType.STRING))
+
+
+def ignore(*args: object) -> None:
+    pass
+
+
+def incremental(source: str, iterative: bool = False) -> tuple[IncrementalParser, list[tuple[int, str, str]]]:
+    errors = []
+    parser = IncrementalParser(
+        IncrementalScanner(source, ignore), lambda *error: errors.append(error), iterative
+    )
+    return parser, errors
+
+
+def full_parse(source: str) -> tuple[bytes | None, list[tuple[int, str, str]]]:
+    errors = []
+    tree = Parser(RegexScanner(source, ignore).scan_tokens(), lambda *error: errors.append(error)).parse()
+    return (None if tree is None or errors else dumps(tree)), errors
+
+
+def test_edit_inside_a_group_reuses_the_other_subtrees() -> None:
+    parser, errors = incremental("(a + b) * (c - d) / g(e, f)")
+    old = parser.tree
+    left = old.left.left
+    tree = parser.edit(15, 1, "-x")
+    assert dumps(tree) == full_parse("(a + b) * (c - -x) / g(e, f)")[0]
+    assert tree is not old
+    assert tree.left.left is left
+    assert tree.right is old.right
+    assert errors == []
+
+
+def test_edit_inside_an_argument_reuses_the_other_arguments() -> None:
+    parser, _ = incremental("f(1 + 2, g(3), 4)(5)")
+    old = parser.tree
+    tree = parser.edit(11, 1, "30 * 3")
+    assert dumps(tree) == full_parse("f(1 + 2, g(30 * 3), 4)(5)")[0]
+    assert tree.callee.arguments[0] is old.callee.arguments[0]
+    assert tree.callee.arguments[2] is old.callee.arguments[2]
+    assert tree.callee.arguments[1].callee is old.callee.arguments[1].callee
+    assert tree.arguments[0] is old.arguments[0]
+
+
+def test_space_and_comment_edits_keep_the_tree() -> None:
+    parser, _ = incremental("1 + // sum\n2")
+    old = parser.tree
+    assert parser.edit(8, 2, "total") is old
+    assert parser.edit(0, 0, "  ") is old
+    assert dumps(old) == full_parse("  1 + // total\n2")[0]
+
+
+def test_edit_that_changes_the_structure_parses_further_out() -> None:
+    parser, _ = incremental("f(a + b, c)")
+    tree = parser.edit(4, 1, ",")
+    assert isinstance(tree, Call) and len(tree.arguments) == 3
+    assert dumps(tree) == full_parse("f(a , b, c)")[0]
+
+
+def test_errors_are_reported_and_the_tree_recovers() -> None:
+    parser, errors = incremental("(1 + 2) * (3 + 4)")
+    old = parser.tree
+    assert parser.edit(15, 1, "") is None
+    assert errors == [(15, " at ')'", "Unexpected token.")]
+    assert parser.tree is None
+    tree = parser.edit(15, 0, "5")
+    assert dumps(tree) == full_parse("(1 + 2) * (3 + 5)")[0]
+    assert isinstance(tree, Binary) and tree.left is old.left
+    assert isinstance(tree.right, Grouping)
+
+
+def test_error_inside_a_part_is_reported_like_a_full_parse() -> None:
+    parser, errors = incremental("g(1, (2 + 3) - 4, 5)")
+    assert parser.edit(8, 1, "+ *") is None
+    assert errors == full_parse("g(1, (2 + * 3) - 4, 5)")[1] == [(10, " at '*'", "Unexpected token.")]
+
+
+@pytest.mark.parametrize(
+    ("source", "edit"),
+    [
+        ("f(a + b) * 2", (2, 0, ")")),
+        ("(a + b) * 2", (3, 0, "), (")),
+        ("h(x + y)", (2, 0, ")(")),
+    ],
+)
+def test_delimiter_that_closes_the_part_is_not_an_error(source: str, edit: tuple[int, int, str]) -> None:
+    parser, errors = incremental(source)
+    tree = parser.edit(*edit)
+    expected, expected_errors = full_parse(parser.scanner.source)
+    assert expected is not None
+    assert dumps(tree) == expected
+    assert errors == expected_errors == []
+
+
+def test_inserted_delimiters_match_full_reparses() -> None:
+    rng = random.Random(2023)
+    sources = ["f(a + b) * 2", "(a + b) * 2", "g(1, (2 + 3) - 4, h(5, 6))", "((a) * (b + c)) / d(e)(f, g)"]
+    delimiters = ["(", ")", ",", "), (", ")(", "(,", ",)", "))", "(("]
+    for _ in range(500):
+        parser, errors = incremental(rng.choice(sources))
+        for _ in range(rng.randrange(1, 4)):
+            offset = rng.randrange(len(parser.scanner.source) + 1)
+            errors.clear()
+            tree = parser.edit(offset, 0, rng.choice(delimiters))
+            expected, expected_errors = full_parse(parser.scanner.source)
+            assert (None if tree is None else dumps(tree)) == expected, parser.scanner.source
+            assert errors == expected_errors, parser.scanner.source
+
+
+def test_source_that_never_parsed_is_parsed_in_full() -> None:
+    parser, errors = incremental("(1 +")
+    assert parser.tree is None and len(errors) == 1
+    assert dumps(parser.edit(4, 0, " 2)")) == full_parse("(1 + 2)")[0]
+
+
+@pytest.mark.parametrize("iterative", [False, True])
+def test_random_edits_match_full_reparses(iterative: bool) -> None:
+    rng = random.Random(23)
+    pieces = [
+        "(",
+        ")",
+        ",",
+        " + ",
+        " * ",
+        " = ",
+        " or ",
+        "-",
+        "!",
+        "a",
+        "b.c",
+        "f(",
+        "1",
+        '"s"',
+        "nil",
+        "this",
+        " ",
+    ]
+    atoms = ["a", "1", "2.5", "(b)", "f(x, y)", "g()", '"s"', "c.d"]
+
+    def expression(depth: int) -> str:
+        if depth == 0 or rng.random() < 0.3:
+            return rng.choice(atoms)
+        kind = rng.randrange(4)
+        if kind == 0:
+            return f"({expression(depth - 1)})"
+        if kind == 1:
+            return f"{expression(depth - 1)} {rng.choice('+-*/<')} {expression(depth - 1)}"
+        if kind == 2:
+            return f"h({', '.join(expression(depth - 1) for _ in range(rng.randrange(4)))})"
+        return f"-{expression(depth - 1)}"
+
+    for _ in range(20):
+        source = f"h({expression(5)}, ({expression(5)}), {expression(5)}) * ({expression(5)})"
+        parser, errors = incremental(source, iterative)
+        undo = []
+        for _ in range(100):
+            source = parser.scanner.source
+            tokens = parser.scanner.tokens
+            operands = [
+                token
+                for previous, token in zip([None, *tokens[:-1]], tokens, strict=True)
+                if token.type in OPERANDS and (previous is None or previous.type != TokenType.DOT)
+            ]
+            if undo and rng.random() < 0.6:
+                # Taking edits back leaves a source that parsed before, like a fixed typo.
+                offset, removed, inserted = undo.pop()
+            elif not undo and operands and rng.random() < 0.6:
+                # Swapping an operand for another keeps most sources valid.
+                token = rng.choice(operands)
+                offset, removed, inserted = token.offset, len(token.lexeme), expression(2)
+            else:
+                offset = rng.randrange(len(source) + 1)
+                removed = rng.randrange(min(4, len(source) - offset) + 1)
+                inserted = rng.choice(pieces) if rng.random() < 0.8 else ""
+                undo.append((offset, len(inserted), source[offset : offset + removed]))
+            errors.clear()
+            tree = parser.edit(offset, removed, inserted)
+            expected, expected_errors = full_parse(parser.scanner.source)
+            assert (None if tree is None else dumps(tree)) == expected
+            assert errors == expected_errors
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from incremental_scanner import IncrementalScanner, TokenChange
+from regex_scanner import RegexScanner
+from scanner import TokenType
+
+
+def shape(tokens: list) -> list[tuple]:
+    return [(token.type, token.lexeme, token.literal, token.offset) for token in tokens]
+
+
+def edited(source: str, offset: int, removed: int, inserted: str) -> IncrementalScanner:
+    scanner = IncrementalScanner(source, lambda *error: None)
+    scanner.edit(offset, removed, inserted)
+    return scanner
+
+
+@pytest.mark.parametrize(
+    ("source", "offset", "removed", "inserted"),
+    [
+        ("ab + c", 2, 0, "c"),
+        ("1.x", 2, 1, "5"),
+        ("1 = 2", 3, 0, "="),
+        ("a != b", 3, 1, ""),
+        ("a // note\nb", 9, 1, ""),
+        ("a // note\nb", 5, 0, "\n"),
+        ('"ab" + c', 2, 0, '"'),
+        ('a + "b" + "c"', 4, 1, ""),
+        ("a + b", 0, 0, "x "),
+        ("a + b", 5, 0, " + c"),
+        ("a + b", 0, 5, ""),
+        ("", 0, 0, "1 + 2"),
+        ("abc def", 1, 5, ""),
+        ("a # b", 2, 1, "-"),
+    ],
+)
+def test_edit_matches_a_full_scan(source: str, offset: int, removed: int, inserted: str) -> None:
+    scanner = edited(source, offset, removed, inserted)
+    expected = source[:offset] + inserted + source[offset + removed :]
+    assert scanner.source == expected
+    assert shape(scanner.tokens) == shape(RegexScanner(expected, lambda *error: None).scan_tokens())
+
+
+def test_random_edits_match_full_scans() -> None:
+    rng = random.Random(22)
+    alphabet = 'ab1.5 =!<>+-*/"\n'
+    pieces = ["alpha", "12.5", '"text"', "// note\n", "==", "!", " ", "\n", "(", ")", "x1", "."]
+    source = "".join(rng.choice(pieces) for _ in range(200))
+    scanner = IncrementalScanner(source, lambda *error: None)
+    for _ in range(2_000):
+        offset = rng.randrange(len(scanner.source) + 1)
+        removed = rng.randrange(min(3, len(scanner.source) - offset) + 1)
+        inserted = "".join(rng.choice(alphabet) for _ in range(rng.randrange(3)))
+        scanner.edit(offset, removed, inserted)
+        assert shape(scanner.tokens) == shape(RegexScanner(scanner.source, lambda *error: None).scan_tokens())
+
+
+def test_tokens_after_the_edit_are_shifted_not_rebuilt() -> None:
+    source = " + ".join(f"x{n}" for n in range(1_000))
+    scanner = IncrementalScanner(source, lambda *error: None)
+    before = list(scanner.tokens)
+    change = scanner.edit(source.index("x500"), 0, "yy")
+    assert change == TokenChange(1_000, 1, 1)
+    assert scanner.tokens[1_000].lexeme == "yyx500"
+    assert all(new is old for new, old in zip(scanner.tokens[1_001:], before[1_001:], strict=True))
+    assert scanner.tokens[-1].offset == len(source) + 2
+
+
+def test_replacing_a_character_keeps_every_other_token() -> None:
+    scanner = IncrementalScanner("1 + 2 * 3", lambda *error: None)
+    before = list(scanner.tokens)
+    assert scanner.edit(4, 1, "7") == TokenChange(2, 1, 1)
+    assert scanner.tokens[2].literal == 7.0
+    assert [token is old for token, old in zip(scanner.tokens, before, strict=True)] == [
+        True,
+        True,
+        False,
+        True,
+        True,
+        True,
+    ]
+
+
+def test_unclosed_quote_rescans_to_the_end() -> None:
+    scanner = IncrementalScanner("a + b + c", lambda *error: None)
+    assert scanner.edit(4, 0, '"') == TokenChange(2, 4, 1)
+    assert [token.type for token in scanner.tokens] == [TokenType.IDENTIFIER, TokenType.PLUS, TokenType.EOF]
+
+
+def test_edits_between_tokens_change_none() -> None:
+    scanner = IncrementalScanner("a + b // note\n+ c", lambda *error: None)
+    before = list(scanner.tokens)
+    assert scanner.edit(1, 0, "  ") == TokenChange(1, 0, 0)
+    assert scanner.edit(12, 1, "text") == TokenChange(3, 0, 0)
+    assert all(token is old for token, old in zip(scanner.tokens, before, strict=True))
+    assert [token.offset for token in scanner.tokens] == [0, 4, 6, 19, 21, 22]
+
+
+def test_only_the_rescanned_window_reports_errors() -> None:
+    errors = []
+    scanner = IncrementalScanner("# a + b + c #", lambda offset, message: errors.append((offset, message)))
+    assert errors == [(0, "Unexpected character."), (12, "Unexpected character.")]
+    errors.clear()
+    scanner.edit(6, 1, "@ @")
+    assert errors == [(6, "Unexpected character."), (8, "Unexpected character.")]
+
+
+@pytest.mark.parametrize(("offset", "removed"), [(-1, 0), (0, -1), (4, 0), (2, 2)])
+def test_edits_outside_the_source_are_rejected(offset: int, removed: int) -> None:
+    scanner = IncrementalScanner("abc", lambda *error: None)
+    with pytest.raises(ValueError):
+        scanner.edit(offset, removed, "x")
+    assert scanner.source == "abc"
@@ -0,0 +1,102 @@
+import io
+import pathlib
+from collections import Counter
+
+import plox
+from compile_cache import CompileCache
+from context import CompilationContext
+from instrumentation import Instrumentation, Stats, TokenCounter, tree_shape
+from parser import Parser
+from scanner import Scanner, TokenType
+
+
+class Recorder(Instrumentation):
+    def __init__(self) -> None:
+        self.events = []
+
+    def source(self, size: int) -> None:
+        self.events.append(("source", size))
+
+    def phase(self, name: str, seconds: float) -> None:
+        assert seconds >= 0
+        self.events.append(("phase", name))
+
+    def tokens(self, counts: Counter) -> None:
+        self.events.append(("tokens", sum(counts.values())))
+
+    def tree(self, expr: object) -> None:
+        self.events.append(("tree", type(expr).__name__))
+
+    def folded(self, removed: int) -> None:
+        self.events.append(("folded", removed))
+
+
+def test_run_reports_every_phase_in_order() -> None:
+    recorder = Recorder()
+    plox.run("(1 + 2) * clock()", CompilationContext(out=io.StringIO(), instrumentation=recorder))
+    assert recorder.events == [
+        ("source", 17),
+        ("phase", "scan"),
+        ("phase", "scan"),
+        ("phase", "parse"),
+        ("tokens", 10),
+        ("tree", "Binary"),
+        ("phase", "optimize"),
+        ("folded", 3),
+        ("phase", "resolve"),
+        ("phase", "evaluate"),
+        ("phase", "output"),
+    ]
+
+
+def test_compile_errors_stop_the_events() -> None:
+    recorder = Recorder()
+    plox.run("1 +", CompilationContext(out=io.StringIO(), instrumentation=recorder))
+    assert recorder.events[-1] == ("tokens", 3)
+
+
+def test_cache_hit_reports_the_cached_tree(tmp_path: pathlib.Path) -> None:
+    cache = CompileCache(str(tmp_path), plox.__version__)
+    plox.run_cached(io.StringIO("1 + clock()"), CompilationContext(cache=cache, out=io.StringIO()))
+    recorder = Recorder()
+    plox.run_cached(
+        io.StringIO("1 + clock()"), CompilationContext(cache=cache, out=io.StringIO(), instrumentation=recorder)
+    )
+    assert [
+        event for event in recorder.events if event[0] != "phase" or event[1] not in ("evaluate", "output")
+    ] == [
+        ("source", 11),
+        ("phase", "cache"),
+        ("tree", "Binary"),
+        ("phase", "resolve"),
+    ]
+
+
+def test_stats_collects_counts() -> None:
+    stats = Stats()
+    plox.run('-(1 + 2) == -3 or "é" == clock', CompilationContext(out=io.StringIO(), instrumentation=stats))
+    assert stats.bytes == 31
+    assert stats.token_counts[TokenType.EQUAL_EQUAL] == 2
+    assert stats.token_counts[TokenType.EOF] == 1
+    assert sum(stats.token_counts.values()) == 14
+    assert stats.node_counts == Counter(
+        {"Literal": 4, "Binary": 3, "Unary": 2, "Grouping": 1, "Logical": 1, "Variable": 1}
+    )
+    assert stats.max_depth == 6
+    assert stats.removed == 11
+    assert list(stats.phases) == ["scan", "parse", "optimize", "resolve", "evaluate", "output"]
+    report = stats.report()
+    assert "EQUAL_EQUAL" in report and "Grouping" in report and "folded nodes" in report
+
+
+def test_token_counter_passes_tokens_through() -> None:
+    tokens = Scanner("1 + 1", print).scan_tokens()
+    counter = TokenCounter(tokens)
+    assert list(counter) == tokens
+    assert counter.counts == Counter({TokenType.NUMBER: 2, TokenType.PLUS: 1, TokenType.EOF: 1})
+
+
+def test_tree_shape_counts_call_arguments() -> None:
+    counts, depth = tree_shape(Parser(Scanner("f(a, g(b))", print).scan_tokens(), print).parse())
+    assert counts == Counter({"Call": 2, "Variable": 4})
+    assert depth == 3
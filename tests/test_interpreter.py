@@ -0,0 +1,86 @@
+import pytest
+
+from interpreter import Interpreter, LoxRuntimeError, stringify
+from parser import Parser
+from scanner import Scanner
+
+
+def evaluate(source: str, interpreter: Interpreter | None = None) -> tuple[object, list[tuple[int, str]]]:
+    errors = []
+    interpreter = interpreter or Interpreter(lambda error: errors.append((error.token.offset, error.message)))
+    expression = Parser(Scanner(source, print).scan_tokens(), print).parse()
+    return interpreter.interpret(expression), errors
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("1 + 2 * 3", 7.0),
+        ("(1 + 2) * 3", 9.0),
+        ("10 - 4 - 3", 3.0),
+        ("8 / 4 / 2", 1.0),
+        ('"con" + "cat"', "concat"),
+        ("-(3)", -3.0),
+        ("!nil", True),
+        ("!0", False),
+        ("1 < 2 == 2 >= 3", False),
+        ("1 == true", False),
+        ("nil == nil", True),
+        ('"a" != "a"', False),
+        ("nil or 0", 0.0),
+        ("false and undefined", False),
+        ('1 and "second"', "second"),
+    ],
+)
+def test_evaluate(source: str, expected: object) -> None:
+    value, errors = evaluate(source)
+    assert errors == []
+    assert type(value) is type(expected)
+    assert value == expected
+
+
+@pytest.mark.parametrize(
+    ("source", "offset", "message"),
+    [
+        ('1 + "a"', 2, "Operands must be two numbers or two strings."),
+        ("1 < nil", 2, "Operands must be numbers."),
+        ("-true", 0, "Operand must be a number."),
+        ("1 / 0", 2, "Division by zero."),
+        ("missing", 0, "Undefined variable 'missing'."),
+        ("missing = 1", 0, "Undefined variable 'missing'."),
+        ('"not callable"()', 15, "Can only call functions and classes."),
+        ("clock(1, 2)", 10, "Expected 0 arguments but got 2."),
+        ("clock.field", 6, "Only instances have properties."),
+        ("this", 0, "Can't use 'this' outside of a class."),
+    ],
+)
+def test_runtime_errors(source: str, offset: int, message: str) -> None:
+    value, errors = evaluate(source)
+    assert value is None
+    assert errors == [(offset, message)]
+
+
+def test_globals_and_assignment() -> None:
+    interpreter = Interpreter(print)
+    interpreter.globals.define("x", 1.0)
+    assert evaluate("x = x + 41", interpreter)[0] == 42.0
+    assert evaluate("x", interpreter)[0] == 42.0
+
+
+def test_native_clock() -> None:
+    value, errors = evaluate("clock() > 0")
+    assert (value, errors) == (True, [])
+
+
+def test_runtime_error_carries_operator_token() -> None:
+    with pytest.raises(LoxRuntimeError) as raised:
+        Interpreter(print).evaluate(Parser(Scanner("1 +\n nil", print).scan_tokens(), print).parse())
+    assert raised.value.token.lexeme == "+"
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, "nil"), (True, "true"), (False, "false"), (3.0, "3"), (2.5, "2.5"), ("text", "text")],
+)
+def test_stringify(value: object, expected: str) -> None:
+    assert stringify(value) == expected
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from line_index import LineIndex
+from stream_scanner import StreamScanner
+
+SOURCE = 'first\n\n  "two\nlines" + 1\n\tlast'
+
+
+def naive_position(source: str, offset: int) -> tuple[int, int]:
+    before = source[:offset]
+    return before.count("\n") + 1, offset - (before.rfind("\n") + 1) + 1
+
+
+@pytest.mark.parametrize("offset", range(len(SOURCE) + 1))
+def test_positions_match_counting_newlines(offset: int) -> None:
+    assert LineIndex(SOURCE).position(offset) == naive_position(SOURCE, offset)
+
+
+def test_newline_belongs_to_the_line_it_ends() -> None:
+    index = LineIndex("ab\ncd")
+    assert index.position(2) == (1, 3)
+    assert index.position(3) == (2, 1)
+    assert index.line(4) == 2
+
+
+def test_empty_source_is_one_line() -> None:
+    assert LineIndex().position(0) == (1, 1)
+    assert LineIndex("").line(0) == 1
+
+
+def test_lines_are_only_found_when_asked_for() -> None:
+    index = LineIndex(SOURCE)
+    assert list(index.starts) == [0]
+    index.position(0)
+    assert list(index.starts) == [0, 6, 7, 14, 25]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 100])
+def test_extending_by_chunks_matches_indexing_at_once(size: int) -> None:
+    index = LineIndex()
+    for start in range(0, len(SOURCE), size):
+        index.extend(SOURCE[start : start + size])
+    whole = LineIndex(SOURCE)
+    whole.position(0)
+    assert index.starts == whole.starts
+    assert index.length == len(SOURCE)
+
+
+def test_extending_keeps_the_initial_source() -> None:
+    index = LineIndex("a\nb")
+    index.extend("\nc")
+    assert index.position(4) == (3, 1)
+
+
+def test_stream_scanner_indexes_what_it_reads() -> None:
+    scanner = StreamScanner(io.StringIO(SOURCE), lambda *error: None, chunk_size=4)
+    tokens = list(scanner.iter_tokens())
+    assert [scanner.lines.position(token.offset) for token in tokens] == [
+        naive_position(SOURCE, token.offset) for token in tokens
+    ]
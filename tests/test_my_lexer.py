@@ -91,3 +91,26 @@ def a_function
     ]
     actual = get_tokens(sample_text)
     assert expected_tokens == actual
+
+
+def test_get_tokens_honors_keywords_argument() -> None:
+    assert get_tokens("let fn x", ("fn",)) == [
+        (TOKEN.IDENT, "let"),
+        (TOKEN.KEYWORD, "fn"),
+        (TOKEN.IDENT, "x"),
+    ]
+
+
+def test_get_tokens_long_input_does_not_recurse() -> None:
+    identifier = "x" * 5000
+    text = f'{identifier} "{"s" * 5000}" ' + "1 + " * 5000
+
+    tokens = get_tokens(text)
+
+    assert tokens[0] == (TOKEN.IDENT, identifier)
+    assert tokens[1] == (TOKEN.LITERAL, "s" * 5000)
+    assert len(tokens) == 2 + 2 * 5000
+
+
+def test_get_tokens_unterminated_string() -> None:
+    assert get_tokens('a "open') == [(TOKEN.IDENT, "a"), (TOKEN.LITERAL, "open")]
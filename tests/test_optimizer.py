@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from expression import Binary, Expr, Literal, Logical
+from interpreter import Interpreter
+from optimizer import ConstantFolder, count_nodes
+from parser import Parser
+from scanner import Scanner
+
+
+def parse(source: str) -> Expr:
+    return Parser(Scanner(source, print).scan_tokens(), print).parse()
+
+
+def evaluate(expr: Expr) -> tuple[type, object, list[tuple[str, int]]]:
+    errors = []
+    interpreter = Interpreter(lambda error: errors.append((error.message, error.token.offset)))
+    interpreter.globals.define("x", 2.0)
+    value = interpreter.interpret(expr)
+    return type(value), value, errors
+
+
+@pytest.mark.parametrize(
+    ("source", "value", "removed"),
+    [
+        ("(1 + 2) * 3", 9.0, 5),
+        ("!!true", True, 2),
+        ('"con" + "cat"', "concat", 2),
+        ("-(-(4))", 4.0, 4),
+        ("1 < 2 == true", True, 4),
+        ("true or x", True, 2),
+        ("nil and x", None, 2),
+        ("false or (2)", 2.0, 3),
+    ],
+)
+def test_folds_to_literal(source: str, value: object, removed: int) -> None:
+    folder = ConstantFolder()
+    result = folder.optimize(parse(source))
+    assert isinstance(result, Literal)
+    assert type(result.value) is type(value) and result.value == value
+    assert folder.removed == removed
+
+
+@pytest.mark.parametrize("source", ["1 / 0", '1 + "a"', "-nil", "(2) < nil"])
+def test_failing_operations_are_left_for_runtime(source: str) -> None:
+    original = parse(source)
+    result = ConstantFolder().optimize(original)
+    assert not isinstance(result, Literal)
+    assert evaluate(result) == evaluate(original)
+
+
+def test_partial_folding_keeps_unchanged_subtrees() -> None:
+    original = parse("(x * x) + (1 + 2)")
+    untouched = original.left.expression
+    result = ConstantFolder().optimize(original)
+    assert isinstance(result, Binary)
+    assert result.left is untouched
+    assert isinstance(result.right, Literal) and result.right.value == 3.0
+
+
+def test_logical_with_variable_left_is_kept() -> None:
+    result = ConstantFolder().optimize(parse("x or (1 + 1)"))
+    assert isinstance(result, Logical)
+    assert isinstance(result.right, Literal)
+
+
+def test_optimized_trees_evaluate_the_same() -> None:
+    rng = random.Random(2024)
+    operands = ["1", "0", "2.5", "x", "true", "false", "nil", '"s"']
+    operators = ["+", "-", "*", "/", "<", ">=", "==", "!=", "and", "or"]
+
+    def generate(depth: int) -> str:
+        if depth > 4 or rng.random() < 0.25:
+            return rng.choice(operands)
+        if rng.random() < 0.2:
+            return rng.choice(["-", "!"]) + generate(depth + 1)
+        return f"({generate(depth + 1)} {rng.choice(operators)} {generate(depth + 1)})"
+
+    for _ in range(500):
+        original = parse(generate(0))
+        folder = ConstantFolder()
+        optimized = folder.optimize(original)
+        assert evaluate(optimized) == evaluate(original)
+        assert folder.removed == count_nodes(original) - count_nodes(optimized)
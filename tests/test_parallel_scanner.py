@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from parallel_scanner import ParallelScanner
+from regex_scanner import RegexScanner
+from scanner import Scanner
+
+
+def shape(tokens: list) -> list[tuple]:
+    return [(token.type, token.lexeme, token.literal, token.offset) for token in tokens]
+
+
+def sequential(source: str) -> tuple[list[tuple], list[tuple[int, str]]]:
+    errors = []
+    tokens = Scanner(source, lambda *error: errors.append(error)).scan_tokens()
+    return shape(tokens), errors
+
+
+def parallel(source: str, jobs: int, chunk: int) -> tuple[list[tuple], list[tuple[int, str]]]:
+    errors = []
+    tokens = ParallelScanner(source, lambda *error: errors.append(error), jobs, chunk).scan_tokens()
+    return shape(tokens), errors
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "",
+        "a\nb\nc\n",
+        '"one\ntwo\nthree" + x\ny',
+        'a // "not a string\n"b\nc" + d\n',
+        '"a"\n"b\n" // "c\n"\n',
+        'x\n"never\nclosed\n',
+        'x\ny "\n',
+        "1.5\n@\n#\n$ 2",
+        '"\n\n\n"',
+    ],
+)
+@pytest.mark.parametrize("chunk", [1, 2, 5, 100])
+def test_small_chunks_match_a_sequential_scan(source: str, chunk: int) -> None:
+    assert parallel(source, 1, chunk) == sequential(source)
+
+
+def test_random_sources_match_a_sequential_scan() -> None:
+    rng = random.Random(25)
+    pieces = [
+        "alpha",
+        "12.5",
+        '"text"',
+        '"two\nlines"',
+        '"',
+        "// note\n",
+        "//",
+        "/",
+        "==",
+        "@",
+        " ",
+        "\n",
+        "\n\n",
+        "(",
+    ]
+    for _ in range(200):
+        source = "".join(rng.choice(pieces) for _ in range(rng.randrange(60)))
+        assert parallel(source, 1, rng.randrange(1, 20)) == sequential(source)
+
+
+def test_worker_processes_match_a_sequential_scan() -> None:
+    rng = random.Random(2025)
+    lines = []
+    for number in range(3_000):
+        if rng.random() < 0.05:
+            lines.append(f'"doc {number}\nspans\nlines" + // "quoted" note')
+        else:
+            lines.append(f"x{number} = {number}.5 * (y - z) @")
+    source = "\n".join(lines) + '\n"open\nat the end'
+    scanner = ParallelScanner(source, lambda *error: None, 3, 2_000)
+    assert len(scanner.bounds()) > 10
+    assert parallel(source, 3, 2_000) == sequential(source)
+    buffer = ParallelScanner(source, lambda *error: None, 3, 2_000).scan_buffer()
+    assert shape(buffer) == shape(RegexScanner(source, lambda *error: None).scan_tokens())
+
+
+def test_plan_skips_chunks_inside_a_string() -> None:
+    source = 'a\n"b\nc\nd"\ne\n'
+    scanner = ParallelScanner(source, print, 1, 1)
+    assert scanner.bounds() == [0, 2, 5, 7, 10, 12]
+    assert scanner.plan() == [(0, 2, None), (2, 2, (2, 9)), (9, 10, None), (10, 12, None)]
@@ -0,0 +1,148 @@
+import random
+
+import pytest
+
+from ast_printer import AstPrinter
+from expression import Assign, Call, Grouping, Unary, Variable
+from parser import Parser
+from scanner import Scanner
+from serializer import dumps
+
+
+def parse(source: str) -> tuple[str | None, list[tuple]]:
+    errors = []
+    tokens = Scanner(source, lambda offset, message: errors.append((offset, "", message))).scan_tokens()
+    expression = Parser(tokens, lambda offset, where, message: errors.append((offset, where, message))).parse()
+    return (AstPrinter().print(expression) if expression else None), errors
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("1", "1.0"),
+        ('"text"', "text"),
+        ("true", "True"),
+        ("nil", "nil"),
+        ("-1", "(- 1.0)"),
+        ("!!true", "(! (! True))"),
+        ("1 + 2 * 3", "(+ 1.0 (* 2.0 3.0))"),
+        ("(1 + 2) * 3", "(* (group (+ 1.0 2.0)) 3.0)"),
+        ("1 - 2 - 3", "(- (- 1.0 2.0) 3.0)"),
+        ("1 / 2 / 3", "(/ (/ 1.0 2.0) 3.0)"),
+        ("-1 * -2", "(* (- 1.0) (- 2.0))"),
+        ("1 < 2 == 3 >= 4", "(== (< 1.0 2.0) (>= 3.0 4.0))"),
+        ("1 == 2 != 3", "(!= (== 1.0 2.0) 3.0)"),
+        ("1 + 2 < 3 * 4 - 5", "(< (+ 1.0 2.0) (- (* 3.0 4.0) 5.0))"),
+    ],
+)
+def test_parse_precedence_and_associativity(source: str, expected: str) -> None:
+    assert parse(source) == (expected, [])
+
+
+def test_missing_right_paren() -> None:
+    assert parse("(1 + 2") == (None, [(6, " at end", "Expect ')' after expression.")])
+
+
+def test_unexpected_token() -> None:
+    assert parse("1 + *") == (None, [(4, " at '*'", "Unexpected token.")])
+
+
+def test_extended_expression_grammar() -> None:
+    cases = {
+        "a = b = 1": "Assign",
+        "a.b = 1": "Set",
+        "a or b and c": "Logical",
+        "f(1, 2)(3)": "Call",
+        "a.b.c": "Get",
+        "this": "This",
+        "super.method": "Super",
+        "-f()": "Unary",
+    }
+    for source, node in cases.items():
+        errors = []
+        tokens = Scanner(source, print).scan_tokens()
+        expression = Parser(tokens, lambda *error, errors=errors: errors.append(error)).parse()
+        assert type(expression).__name__ == node, source
+        assert errors == []
+
+
+def test_assignment_is_right_associative_and_lowest() -> None:
+    expression = Parser(Scanner("a = b = 1 or 2", print).scan_tokens(), print).parse()
+    assert expression.name.lexeme == "a"
+    assert expression.value.name.lexeme == "b"
+    assert type(expression.value.value).__name__ == "Logical"
+
+
+def test_invalid_assignment_target() -> None:
+    errors = []
+    Parser(Scanner("1 + a = 2", print).scan_tokens(), lambda *error: errors.append(error)).parse()
+    assert errors == [(6, " at '='", "Invalid assignment target.")]
+
+
+def parse_both(source: str) -> tuple[tuple, tuple]:
+    results = []
+    for iterative in (False, True):
+        errors = []
+        tokens = Scanner(source, print).scan_tokens()
+        expression = Parser(tokens, lambda *error, errors=errors: errors.append(error), iterative).parse()
+        results.append((expression and dumps(expression), errors))
+    return results[0], results[1]
+
+
+ATOMS = ("1", '"s"', "nil", "true", "a", "b", "this", "super.m", "f()")
+OPERATORS = ("+", "-", "*", "/", "<", ">=", "==", "!=", "and", "or", "=")
+
+
+def random_source(rng: random.Random, depth: int = 0) -> str:
+    choice = rng.randrange(9 if depth < 6 else 1)
+    if choice == 0:
+        return rng.choice(ATOMS)
+    if choice == 1:
+        return f"({random_source(rng, depth + 1)})"
+    if choice == 2:
+        return rng.choice("-!") + random_source(rng, depth + 1)
+    if choice == 3:
+        arguments = ", ".join(random_source(rng, depth + 1) for _ in range(rng.randrange(3)))
+        return f"{rng.choice(ATOMS)}({arguments})"
+    if choice == 4:
+        return f"{random_source(rng, depth + 1)}.{rng.choice('xy')}"
+    return f"{random_source(rng, depth + 1)} {rng.choice(OPERATORS)} {random_source(rng, depth + 1)}"
+
+
+def test_iterative_mode_builds_the_same_trees() -> None:
+    rng = random.Random(19)
+    for _ in range(500):
+        source = random_source(rng)
+        recursive, iterative = parse_both(source)
+        assert recursive == iterative, source
+
+
+@pytest.mark.parametrize(
+    "source", ["(1 + 2", "f(1, 2", "1 + * 2", "a.1", "super", "1 = 2 = 3", "(a = 1) = 2", ")", "f(a b)", "1 +"]
+)
+def test_iterative_mode_reports_the_same_errors(source: str) -> None:
+    recursive, iterative = parse_both(source)
+    assert recursive == iterative
+    assert recursive[1]
+
+
+def test_iterative_mode_reports_too_many_arguments() -> None:
+    source = "f(" + ", ".join(["1"] * 256) + ")"
+    recursive, iterative = parse_both(source)
+    assert recursive == iterative
+    assert recursive[1] == [(len(source) - 2, " at '1'", "Can't have more than 255 arguments.")]
+
+
+@pytest.mark.parametrize(
+    ("prefix", "suffix", "node"),
+    [("(", ")", Grouping), ("-", "", Unary), ("!", "", Unary), ("f(", ")", Call), ("a = ", "", Assign)],
+)
+def test_iterative_mode_has_no_depth_limit(prefix: str, suffix: str, node: type) -> None:
+    depth = 100_000
+    source = prefix * depth + "x" + suffix * depth
+    assert Parser(Scanner(source, print).scan_tokens(), print).parse() is None
+    expression = Parser(Scanner(source, print).scan_tokens(), print, iterative=True).parse()
+    for _ in range(depth):
+        assert type(expression) is node
+        expression = expression.arguments[0] if node is Call else getattr(expression, expression.__slots__[-1])
+    assert type(expression) is Variable
@@ -0,0 +1,233 @@
+import asyncio
+import io
+import json
+import pathlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+import pytest
+
+import bytecode
+import plox
+from context import CompilationContext
+
+
+@pytest.fixture
+def scripts(tmp_path: pathlib.Path) -> pathlib.Path:
+    (tmp_path / "nested").mkdir()
+    sources = {
+        "ok.lox": "1 + 2",
+        "nested/runtime.lox": "1 / 0",
+        "compile.lox": "(1 +",
+        "assigns.lox": "clock = 1",
+        "reads.lox": "clock() > 0",
+        "ignored.txt": "not lox",
+    }
+    for name, source in sources.items():
+        (tmp_path / name).write_text(source)
+    return tmp_path
+
+
+def results(output: str) -> dict[str, list[str]]:
+    sections = {}
+    for line in output.splitlines():
+        if line.startswith("==> "):
+            current = sections[line[4:].split(" [")[0]] = [line.split(" [")[1].split(",")[0]]
+        elif sections and "scripts," not in line:
+            current.append(line)
+    return sections
+
+
+@pytest.mark.parametrize("scanner", ["classic", "regex", "parallel"])
+def test_scanners_run_the_same(scanner: str) -> None:
+    output = io.StringIO()
+    context = plox.run('"multi\nline" + "!"\n// done\n', CompilationContext(scanner=scanner, out=output))
+    assert output.getvalue() == "multi\nline!\n"
+    context = plox.run('1 +\n"open', CompilationContext(scanner=scanner, out=output))
+    assert [str(diagnostic) for diagnostic in context.diagnostics][
+        0
+    ] == "[line 2, column 1] Error: Unterminated string."
+
+
+@pytest.mark.parametrize("backend", ["ast", "vm", "closure", "python"])
+@pytest.mark.parametrize("source", ["1 + " * 3_000 + "1", "-" * 5_000 + "1", "(" * 5_000 + "1" + ")" * 5_000])
+def test_deeply_nested_input_is_a_compile_error(backend: str, source: str) -> None:
+    output = io.StringIO()
+    context = plox.run(source, CompilationContext(backend=backend, out=output))
+    assert [str(diagnostic) for diagnostic in context.diagnostics] == [
+        "[line 1, column 1] Error: Expression nests too deeply."
+    ]
+    assert context.status() == 65
+    context.reset()
+    plox.run("1 + 2", context)
+    assert output.getvalue().endswith("3\n")
+
+
+@pytest.mark.parametrize(
+    ("source", "message"),
+    [
+        (" or ".join(f"clock == {number}" for number in range(300)), "Too many constants in one chunk."),
+        ("!clock and (" + " == ".join(["clock"] * 200) + ")", "Too much code to jump over."),
+    ],
+)
+def test_chunk_limits_are_compile_errors(monkeypatch: pytest.MonkeyPatch, source: str, message: str) -> None:
+    monkeypatch.setattr(bytecode, "MAX_OPERAND", 0xFF)
+    assert plox.run(source, CompilationContext(out=io.StringIO())).status() == 0
+    output = io.StringIO()
+    context = plox.run(source, CompilationContext(backend="vm", out=output))
+    assert [str(diagnostic) for diagnostic in context.diagnostics] == [f"[line 1, column 1] Error: {message}"]
+    assert context.status() == 65
+    context.reset()
+    plox.run("1 + 2", context)
+    assert output.getvalue() == "[line 1, column 1] Error: " + message + "\n3\n"
+
+
+def test_batch_survives_chunk_limits(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    monkeypatch.setattr(bytecode, "MAX_OPERAND", 0xFF)
+    path = tmp_path / "large.lox"
+    path.write_text(" or ".join(f"clock == {number}" for number in range(300)))
+    result = plox.run_batch_file(str(path), "vm", None)
+    assert (result.status, result.output) == (
+        65,
+        "[line 1, column 1] Error: Too many constants in one chunk.\n",
+    )
+
+
+@pytest.mark.parametrize("backend", ["ast", "vm", "closure", "python"])
+def test_sessions_do_not_keep_earlier_trees(backend: str) -> None:
+    context = CompilationContext(backend=backend, out=io.StringIO())
+    for number in range(100):
+        plox.run(f"clock = {number} + clock", context)
+    assert len(context.runner.locals) <= 2
+
+
+@pytest.mark.parametrize("backend", ["ast", "vm", "closure", "python"])
+def test_batch_keeps_per_file_diagnostics_and_status(
+    scripts: pathlib.Path, backend: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    status = plox.run_batch(str(scripts), backend, jobs=2, cached=False)
+    output = capsys.readouterr().out
+    assert status == 70
+    assert results(output) == {
+        str(scripts / "ok.lox"): ["exit 0", "3"],
+        str(scripts / "nested" / "runtime.lox"): ["exit 70", "Division by zero.", "[line 1, column 3]"],
+        str(scripts / "compile.lox"): ["exit 65", "[line 1, column 5] Error at end: Unexpected token."],
+        str(scripts / "assigns.lox"): ["exit 0", "1"],
+        # Globals assigned by one script never leak into the next one.
+        str(scripts / "reads.lox"): ["exit 0", "true"],
+    }
+    assert "5 scripts, 2 failed" in output.splitlines()[-1]
+
+
+def test_batch_accepts_globs(scripts: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert plox.run_batch(str(scripts / "*.lox"), jobs=1, cached=False) == 65
+    assert len(results(capsys.readouterr().out)) == 4
+
+
+def test_batch_without_matches(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert plox.run_batch(str(tmp_path / "*.lox"), cached=False) == 66
+    assert "No scripts match" in capsys.readouterr().err
+
+
+def test_batch_survives_unreadable_scripts(scripts: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (scripts / "latin1.lox").write_bytes(b'"caf\xe9"')
+    (scripts / "deep.lox").write_text("1 + " * 3_000 + "1")
+    assert plox.run_batch(str(scripts), jobs=2, cached=False) == 70
+    sections = results(capsys.readouterr().out)
+    assert sections[str(scripts / "latin1.lox")][0] == "exit 65"
+    assert sections[str(scripts / "latin1.lox")][1].startswith(f"Could not read '{scripts / 'latin1.lox'}': ")
+    assert sections[str(scripts / "deep.lox")] == [
+        "exit 65",
+        "[line 1, column 1] Error: Expression nests too deeply.",
+    ]
+    assert sections[str(scripts / "ok.lox")] == ["exit 0", "3"]
+
+
+async def converse(server: asyncio.Server, requests: list[str]) -> list[dict]:
+    name = server.sockets[0].getsockname()
+    if isinstance(name, str):
+        reader, writer = await asyncio.open_unix_connection(name)
+    else:
+        reader, writer = await asyncio.open_connection(*name[:2])
+    responses = []
+    for request in requests:
+        writer.write(request.encode() + b"\n")
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    return responses
+
+
+@pytest.mark.parametrize("backend", ["ast", "vm", "python"])
+def test_server_sessions_keep_their_own_state(tmp_path: pathlib.Path, backend: str) -> None:
+    # Too long to run on the event loop, so it goes to the pool.
+    long = " + ".join(["(1 + 2 + 3 + 4)"] * 100)
+
+    async def main() -> list[list[dict]]:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            server = await plox.start_server(str(tmp_path / "plox.sock"), backend, pool)
+            async with server:
+                return await asyncio.gather(
+                    converse(server, ["clock = 1", "clock + 1", "(1 +", "1 / 0", long]),
+                    converse(server, ["clock() > 0", "-nil"]),
+                )
+
+    first, second = asyncio.run(main())
+    assert first == [
+        {"status": 0, "output": "1\n"},
+        {"status": 0, "output": "2\n"},
+        {"status": 65, "output": "[line 1, column 5] Error at end: Unexpected token.\n"},
+        {"status": 70, "output": "Division by zero.\n[line 1, column 3]\n"},
+        {"status": 0, "output": "1000\n"},
+    ]
+    assert second == [
+        {"status": 0, "output": "true\n"},
+        {"status": 70, "output": "Operand must be a number.\n[line 1, column 1]\n"},
+    ]
+
+
+def test_server_over_tcp() -> None:
+    async def main() -> list[dict]:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            server = await plox.start_server("127.0.0.1:0", "ast", pool)
+            async with server:
+                return await converse(server, ['"a" + "b"'])
+
+    assert asyncio.run(main()) == [{"status": 0, "output": "ab\n"}]
+
+
+LONG = " + ".join(["1"] * 150)
+
+
+@pytest.mark.parametrize(("backend", "pooled"), [("ast", [LONG]), ("python", ["1 + 2", LONG])])
+def test_transpiled_requests_never_run_on_the_loop(
+    tmp_path: pathlib.Path, backend: str, pooled: list[str]
+) -> None:
+    submitted = []
+
+    class Pool(ThreadPoolExecutor):
+        def submit(self, function: Callable, /, *args: object) -> Future:
+            submitted.append(args[0])
+            return super().submit(function, *args)
+
+    async def main() -> list[dict]:
+        with Pool(max_workers=1) as pool:
+            server = await plox.start_server(str(tmp_path / "plox.sock"), backend, pool)
+            async with server:
+                return await converse(server, ["1 + 2", LONG])
+
+    assert asyncio.run(main()) == [{"status": 0, "output": "3\n"}, {"status": 0, "output": "150\n"}]
+    assert submitted == pooled
+
+
+@pytest.mark.parametrize(
+    ("address", "expected"),
+    [
+        ("8000", ("127.0.0.1", 8000)),
+        ("0.0.0.0:8000", ("0.0.0.0", 8000)),
+        ("/tmp/plox.sock", "/tmp/plox.sock"),
+        ("/tmp/a:1", "/tmp/a:1"),
+        ("plox.sock", "plox.sock"),
+    ],
+)
+def test_server_addresses(address: str, expected: tuple[str, int] | str) -> None:
+    assert plox.server_address(address) == expected
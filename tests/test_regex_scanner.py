@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from regex_scanner import RegexScanner
+from scanner import Scanner, TokenType
+
+
+def scan(scanner_type: type, source: str) -> tuple[list[tuple], list[tuple[int, str]]]:
+    errors = []
+    tokens = scanner_type(source, lambda offset, message: errors.append((offset, message))).scan_tokens()
+    return [(token.type, token.lexeme, token.literal, token.offset) for token in tokens], errors
+
+
+SOURCES = [
+    "",
+    "3 + 4",
+    "({,.;})",
+    "!!====<<=>>=",
+    "+-*/",
+    "[]",
+    "var answer = 42.5; // the answer\nprint answer;",
+    "x = 1.\n",
+    "1.2.3",
+    '"multi\nline\nstring" after',
+    '"unterminated\nstring',
+    "class Foo { fun bar() { return this.baz and nil or true; } }",
+    "a_b ab1 1ab\t\r\n#@ while",
+    "// only a comment",
+    "/ // slash then comment\n/",
+]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_matches_classic_scanner(source: str) -> None:
+    assert scan(RegexScanner, source) == scan(Scanner, source)
+
+
+@pytest.mark.parametrize("source", ["½", "x² + ٣", "café = 1", "五 + Ⅻ", '"ünïcödé" + ½'])
+def test_matches_classic_scanner_outside_ascii(source: str) -> None:
+    tokens, errors = scan(RegexScanner, source)
+    assert (tokens, errors) == scan(Scanner, source)
+    assert all(token[1].isascii() for token in tokens if token[0] != TokenType.STRING)
+
+
+def test_matches_classic_scanner_on_random_sources() -> None:
+    rng = random.Random(1234)
+    alphabet = 'ab_zq019 .\t\n\r"/=!<>(){},;+-*#@' + "orandvarnil"
+    for _ in range(500):
+        source = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert scan(RegexScanner, source) == scan(Scanner, source), source
+
+
+def test_keywords_and_identifiers() -> None:
+    tokens, errors = scan(RegexScanner, "or orchid nil")
+    assert [token[0] for token in tokens] == [
+        TokenType.OR,
+        TokenType.IDENTIFIER,
+        TokenType.NIL,
+        TokenType.EOF,
+    ]
+    assert errors == []
@@ -0,0 +1,71 @@
+import pytest
+
+from closure_compiler import ClosureInterpreter
+from expression import Expr
+from interpreter import Environment, Interpreter
+from parser import Parser
+from resolver import Resolver
+from scanner import Scanner
+from vm import VM
+
+
+def parse(source: str) -> Expr:
+    return Parser(Scanner(source, print).scan_tokens(), print).parse()
+
+
+def resolve(environment: Environment, expr: Expr) -> tuple[dict, list[tuple[int, str, str]]]:
+    errors = []
+    locations = Resolver(environment, lambda *error: errors.append(error)).resolve(expr)
+    return locations, errors
+
+
+def test_resolves_variables_and_assignments_to_slots() -> None:
+    environment = Environment()
+    environment.define("a", 1.0)
+    environment.define("b", 2.0)
+    expr = parse("a = b + a")
+    locations, errors = resolve(environment, expr)
+    assert errors == []
+    assert locations == {expr: (0, 0), expr.value.left: (0, 1), expr.value.right: (0, 0)}
+
+
+def test_counts_depth_through_enclosing_environments() -> None:
+    outer = Environment()
+    outer.define("a", 1.0)
+    inner = Environment(outer)
+    inner.define("b", 2.0)
+    expr = parse("a + b")
+    locations, errors = resolve(inner, expr)
+    assert errors == []
+    assert locations[expr.left] == (1, 0)
+    assert locations[expr.right] == (0, 0)
+    assert inner.get_at(1, 0) == 1.0
+
+
+@pytest.mark.parametrize(
+    ("source", "error"),
+    [
+        ("1 + missing", (4, " at 'missing'", "Undefined variable 'missing'.")),
+        ("missing = 1", (0, " at 'missing'", "Undefined variable 'missing'.")),
+        ("this", (0, " at 'this'", "Can't use 'this' outside of a class.")),
+        ("super.method", (0, " at 'super'", "Can't use 'super' outside of a class.")),
+    ],
+)
+def test_reports_unresolvable_references(source: str, error: tuple[int, str, str]) -> None:
+    assert resolve(Environment(), parse(source))[1] == [error]
+
+
+@pytest.mark.parametrize("backend_type", [Interpreter, VM, ClosureInterpreter])
+@pytest.mark.parametrize("source", ["x = x * x + y", "(x - y) * (x + y) / y", "y = x = 3", "x and y or clock"])
+def test_resolved_evaluation_matches_lookup_by_name(backend_type: type, source: str) -> None:
+    results = []
+    for resolved in (False, True):
+        backend = backend_type(print)
+        backend.globals.define("x", 2.0)
+        backend.globals.define("y", 5.0)
+        expr = parse(source)
+        if resolved:
+            backend.resolve(resolve(backend.globals, expr)[0])
+        value = backend.interpret(expr)
+        results.append((type(value), str(value), backend.globals.slots[1:]))
+    assert results[0] == results[1]
@@ -12,8 +12,8 @@ class TestScanner:
     def setup_reporter(self) -> Callable[[int, str], None]:
         self.reported_errors = []
 
-        def capture_error(line: int, message: str) -> None:
-            self.reported_errors.append((line, message))
+        def capture_error(offset: int, message: str) -> None:
+            self.reported_errors.append((offset, message))
 
         return capture_error
 
@@ -92,3 +92,20 @@ class TestScanner:
         for expected, actual in zip(expected_types, tokens, strict=True):
             assert expected == actual.type
             assert len(self.reported_errors) == 0
+
+    def test_identifiers_and_keywords(self, setup_reporter: Callable[[int, str], None]) -> None:
+        source = "var x1 = nil"
+        tokens = Scanner(source, setup_reporter).scan_tokens()
+        expected_types = [TokenType.VAR, TokenType.IDENTIFIER, TokenType.EQUAL, TokenType.NIL, TokenType.EOF]
+
+        for expected, actual in zip(expected_types, tokens, strict=True):
+            assert expected == actual.type
+        assert len(self.reported_errors) == 0
+
+    def test_number_followed_by_dot_at_end(self, setup_reporter: Callable[[int, str], None]) -> None:
+        tokens = Scanner("1.", setup_reporter).scan_tokens()
+        assert [(token.type, token.literal) for token in tokens] == [
+            (TokenType.NUMBER, 1.0),
+            (TokenType.DOT, None),
+            (TokenType.EOF, None),
+        ]
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from expression import Binary, Expr, Grouping, Literal, Unary
+from parser import Parser
+from regex_scanner import RegexScanner
+from scanner import Scanner, Token, TokenType
+from serializer import FormatError, dumps, dumps_tokens, loads, loads_tokens
+
+
+def parse(source: str) -> Expr:
+    return Parser(Scanner(source, print).scan_tokens(), print).parse()
+
+
+def shape(value: object) -> object:
+    """Everything a node holds, as nested tuples that compare by value."""
+    if isinstance(value, Expr):
+        return (type(value).__name__, *(shape(getattr(value, slot)) for slot in type(value).__slots__))
+    if isinstance(value, list):
+        return [shape(item) for item in value]
+    if isinstance(value, Token):
+        return (value.type, value.lexeme, shape(value.literal), value.offset)
+    return (type(value), repr(value))
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "1 + 2 * (3 - 4) / -5",
+        '"a\nb" == nil or !true and false',
+        "x = clock(1, y, (z))",
+        "f()()",
+        "a.b.c = d.e",
+        "super.method",
+        "this",
+        '"ünïcödé" + "\U0001f600"',
+    ],
+)
+def test_tree_round_trips(source: str) -> None:
+    expr = parse(source)
+    assert shape(loads(dumps(expr))) == shape(expr)
+
+
+def test_round_trips_random_trees() -> None:
+    rng = random.Random(13)
+    operands = ["1", "2.5", "0", "x", "true", "false", "nil", '"s"', '""', "this", "super.m", "f()"]
+    operators = ["+", "-", "*", "/", "<", ">=", "==", "!=", "and", "or"]
+
+    def generate(depth: int) -> str:
+        roll = rng.random()
+        if depth > 5 or roll < 0.25:
+            return rng.choice(operands) + "\n" * rng.randrange(3)
+        if roll < 0.35:
+            return rng.choice(["-", "!"]) + generate(depth + 1)
+        if roll < 0.45:
+            arguments = ", ".join(generate(depth + 1) for _ in range(rng.randrange(4)))
+            return f"{generate(depth + 1)}.g({arguments})"
+        if roll < 0.5:
+            return f"y = {generate(depth + 1)}"
+        return f"({generate(depth + 1)} {rng.choice(operators)} {generate(depth + 1)})"
+
+    for _ in range(300):
+        source = generate(0)
+        expr = parse(source)
+        assert shape(loads(dumps(expr))) == shape(expr), source
+        tokens = RegexScanner(source, print).scan_tokens()
+        assert [shape(token) for token in loads_tokens(dumps_tokens(tokens))] == [
+            shape(token) for token in tokens
+        ]
+
+
+def test_literals_keep_their_types() -> None:
+    values = [1.0, True, 0.0, -0.0, False, None, "1", "", float("inf")]
+    copy = loads(
+        dumps(Grouping(Binary(Literal(values[0]), Token(TokenType.PLUS, "+", None, 1), Literal(values[1]))))
+    )
+    assert shape(copy.expression.left) == shape(Literal(1.0))
+    for value in values:
+        assert shape(loads(dumps(Literal(value)))) == shape(Literal(value))
+
+
+def test_deep_trees_round_trip() -> None:
+    minus = Token(TokenType.MINUS, "-", None, 1)
+    expr = Literal(1.0)
+    for _ in range(100_000):
+        expr = Unary(minus, expr)
+    copy = loads(dumps(expr))
+    for _ in range(100_000):
+        assert isinstance(copy, Unary) and copy.operator.lexeme == "-"
+        copy = copy.right
+    assert shape(copy) == shape(Literal(1.0))
+
+
+def test_offsets_in_any_order_round_trip() -> None:
+    tokens = [Token(TokenType.NUMBER, "1", 1.0, offset) for offset in (1, 5000, 3, 3, 1_000_000)]
+    assert [token.offset for token in loads_tokens(dumps_tokens(tokens))] == [1, 5000, 3, 3, 1_000_000]
+
+
+def test_is_more_compact_than_the_source() -> None:
+    source = " + ".join(["(alpha * 2 - beta) / gamma"] * 200)
+    assert len(dumps(parse(source))) < len(source)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"not a program",
+        dumps(parse("1 + 2"))[:-1],
+        dumps(parse("1 + 2")) + b"\x00",
+        b"LOX\x00\x63" + dumps(parse("1"))[5:],
+        dumps_tokens([]),
+    ],
+)
+def test_rejects_corrupt_data(data: bytes) -> None:
+    with pytest.raises(FormatError):
+        loads(data)
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+from ast_printer import AstPrinter
+from parser import Parser
+from regex_scanner import RegexScanner
+from scanner import Scanner
+from stream_scanner import StreamScanner
+
+
+def scan_stream(source: str, chunk_size: int) -> tuple[list[tuple], list[tuple[int, str]]]:
+    errors = []
+    scanner = StreamScanner(
+        io.StringIO(source), lambda offset, message: errors.append((offset, message)), chunk_size
+    )
+    tokens = [(token.type, token.lexeme, token.literal, token.offset) for token in scanner.iter_tokens()]
+    return tokens, errors
+
+
+def scan_whole(source: str) -> tuple[list[tuple], list[tuple[int, str]]]:
+    errors = []
+    tokens = RegexScanner(source, lambda offset, message: errors.append((offset, message))).scan_tokens()
+    return [(token.type, token.lexeme, token.literal, token.offset) for token in tokens], errors
+
+
+SOURCES = [
+    "",
+    "1.5 + 22.75 >= 300 != identifier_like",
+    'print "a string\nthat spans\nlines"; // and a comment\n!= 1.',
+    "// comment only, no trailing newline",
+    '"never closed\n\n',
+    "123.456.789 .5 5. ==== <=<",
+]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 1024])
+def test_chunk_boundaries_do_not_change_tokens(source: str, chunk_size: int) -> None:
+    assert scan_stream(source, chunk_size) == scan_whole(source)
+
+
+def test_lexeme_longer_than_chunk() -> None:
+    source = '"' + "x" * 10_000 + '" ' + "y" * 5_000
+    assert scan_stream(source, 7) == scan_whole(source)
+
+
+def test_parser_consumes_token_generator() -> None:
+    source = "(1 + 2) * -3 == 4 / 5"
+    streamed = StreamScanner(io.StringIO(source), print, 3).iter_tokens()
+    listed = Scanner(source, print).scan_tokens()
+    printer = AstPrinter()
+    assert printer.print(Parser(streamed, print).parse()) == printer.print(Parser(listed, print).parse())
@@ -0,0 +1,43 @@
+from ast_printer import AstPrinter
+from parser import Parser
+from regex_scanner import RegexScanner
+from scanner import TokenType
+from token_buffer import scan_buffer
+
+
+def as_tuples(tokens: object) -> list[tuple]:
+    return [(token.type, token.lexeme, token.literal, token.offset) for token in tokens]
+
+
+def test_buffer_matches_token_list() -> None:
+    source = 'var x = 1.5;\n"two\nlines" // note\n@ y != 3 "open'
+    list_errors = []
+    buffer_errors = []
+    tokens = RegexScanner(source, lambda offset, message: list_errors.append((offset, message))).scan_tokens()
+    buffer = scan_buffer(source, lambda offset, message: buffer_errors.append((offset, message)))
+
+    assert as_tuples(buffer) == as_tuples(tokens)
+    assert buffer_errors == list_errors
+    assert len(buffer) == len(tokens)
+
+
+def test_columns_and_lazy_fields() -> None:
+    buffer = scan_buffer('12 "str" name', print)
+    assert [buffer.type(i) for i in range(len(buffer))] == [
+        TokenType.NUMBER,
+        TokenType.STRING,
+        TokenType.IDENTIFIER,
+        TokenType.EOF,
+    ]
+    assert buffer.literal(0) == 12.0
+    assert buffer.literal(1) == "str"
+    assert buffer.lexeme(2) == "name"
+    assert buffer.nbytes() == len(buffer) * (1 + 4 + 4)
+
+
+def test_parser_runs_on_buffer() -> None:
+    source = "-(1 + 2) * 3 >= 4"
+    expression = Parser(scan_buffer(source, print), print).parse()
+    assert AstPrinter().print(expression) == AstPrinter().print(
+        Parser(RegexScanner(source, print).scan_tokens(), print).parse()
+    )
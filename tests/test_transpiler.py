@@ -0,0 +1,115 @@
+import io
+import random
+import warnings
+
+import pytest
+
+from context import CompilationContext
+from interpreter import Interpreter
+from parser import Parser
+from plox import run
+from resolver import Resolver
+from scanner import Scanner
+from transpiler import Transpiler, TranspilingInterpreter
+
+
+def outcome(
+    backend_type: type, source: str, resolved: bool = False
+) -> tuple[type, object, list[tuple[str, int]]]:
+    errors = []
+    backend = backend_type(lambda error: errors.append((error.message, error.token.offset)))
+    backend.globals.define("x", 2.0)
+    expression = Parser(Scanner(source, print).scan_tokens(), print).parse()
+    if resolved:
+        backend.resolve(Resolver(backend.globals, print).resolve(expression))
+    value = backend.interpret(expression)
+    return type(value), value, errors
+
+
+def transpile(source: str) -> str:
+    return Transpiler({}).transpile(Parser(Scanner(source, print).scan_tokens(), print).parse())[0]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "1 + 2 * 3 - 4 / 8",
+        '"con" + "cat" == "concat"',
+        "!(1 < 2) != (3 >= 4) == (5 <= 6)",
+        "nil or false or 0",
+        '"" and 0 and nil',
+        "1 == true",
+        "nil == false",
+        "1 and nil and undefined",
+        "x = x * x + 1",
+        '!(x = "s")',
+        "!(x = 1) == (x = nil)",
+        '!"s"',
+        "!0",
+        "x + (x = 5) + x",
+        "1 / (x - 2)",
+        "x / 0",
+        "-nil",
+        "-x - -1",
+        '1 + "a"',
+        '"a" < "b"',
+        "clock() > 0",
+        "clock(1)",
+        '"f"()',
+        "x.field = undefined",
+        "x.field",
+        "this",
+        "super.method",
+    ],
+)
+def test_transpiled_code_matches_interpreter(source: str) -> None:
+    assert outcome(TranspilingInterpreter, source) == outcome(Interpreter, source)
+    assert outcome(TranspilingInterpreter, source.replace("undefined", "x"), True) == outcome(
+        Interpreter, source.replace("undefined", "x"), True
+    )
+
+
+def test_transpiled_code_matches_interpreter_on_random_expressions() -> None:
+    rng = random.Random(20)
+    operands = ["1", "2.5", "0", "x", "true", "nil", '"s"', "(x = 3)"]
+    operators = ["+", "-", "*", "/", "<", ">", "<=", ">=", "==", "!=", "and", "or"]
+
+    def generate(depth: int) -> str:
+        if depth > 4 or rng.random() < 0.3:
+            return rng.choice(operands)
+        if rng.random() < 0.2:
+            return rng.choice(["-", "!"]) + generate(depth + 1)
+        return f"({generate(depth + 1)} {rng.choice(operators)} {generate(depth + 1)})"
+
+    for _ in range(500):
+        source = generate(0)
+        assert outcome(TranspilingInterpreter, source, True) == outcome(Interpreter, source, True), source
+
+
+@pytest.mark.parametrize(
+    "source", ['!(clock = "s")', '!"s"', "!(x = 1.5)", '!("s" and 1)', "-(x = 1) == !-nil"]
+)
+def test_generated_code_compiles_without_warnings(source: str) -> None:
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        compile(transpile(source), "<lox>", "exec")
+
+
+def test_temporaries_are_reused() -> None:
+    source = transpile(" + ".join(["(x * x - x)"] * 50))
+    assert "t2 " in source and "t3 " not in source
+
+
+def test_deeply_nested_logic_falls_back_to_closures() -> None:
+    source = "x or (" * 150 + "1" + ")" * 150
+    assert outcome(TranspilingInterpreter, source) == outcome(Interpreter, source)
+
+
+def test_listing_receives_the_generated_source() -> None:
+    context = CompilationContext(backend="python", out=io.StringIO())
+    context.runner.listing = io.StringIO()
+    run("clock() > 0 and -clock() < 0", context)
+    assert context.out.getvalue() == "true\n"
+    listing = context.runner.listing.getvalue()
+    assert listing.startswith("def program(slots, environment, interpreter):\n")
+    assert "if t0 is not None and t0 is not False:" in listing
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from bytecode import Compiler, OpCode
+from interpreter import Interpreter
+from parser import Parser
+from scanner import Scanner
+from vm import VM
+
+
+def parse(source: str) -> object:
+    return Parser(Scanner(source, print).scan_tokens(), print).parse()
+
+
+def outcome(backend_type: type, source: str) -> tuple[type, object, list[tuple[str, int]]]:
+    errors = []
+    backend = backend_type(lambda error: errors.append((error.message, error.token.offset)))
+    backend.globals.define("x", 2.0)
+    value = backend.interpret(parse(source))
+    return type(value), value, errors
+
+
+SOURCES = [
+    "1 + 2 * 3 - 4 / 8",
+    '"con" + "cat" == "concat"',
+    "!(1 < 2) != (3 >= 4)",
+    "nil or false or 0",
+    "1 and nil and undefined",
+    "x = x * x + 1",
+    "-(x - 5) <= 3 == true",
+    "1 / (x - 2)",
+    '"a" + 1',
+    "-nil",
+    "clock(1)",
+    "x(1)",
+    "x.field",
+    "x.field = undefined",
+    "super.method",
+]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_vm_matches_interpreter(source: str) -> None:
+    assert outcome(VM, source) == outcome(Interpreter, source)
+
+
+def test_vm_matches_interpreter_on_random_expressions() -> None:
+    rng = random.Random(99)
+    operands = ["1", "2.5", "0", "x", "true", "nil", '"s"']
+    operators = ["+", "-", "*", "/", "<", ">=", "==", "!=", "and", "or"]
+
+    def generate(depth: int) -> str:
+        if depth > 4 or rng.random() < 0.3:
+            return rng.choice(operands)
+        if rng.random() < 0.2:
+            return rng.choice(["-", "!"]) + generate(depth + 1)
+        return f"({generate(depth + 1)} {rng.choice(operators)} {generate(depth + 1)})"
+
+    for _ in range(500):
+        source = generate(0)
+        assert outcome(VM, source) == outcome(Interpreter, source), source
+
+
+def test_constants_are_interned_by_type() -> None:
+    chunk = Compiler().compile(parse('1 + 1 + "1" + true'))
+    assert chunk.constants == [1.0, "1"]
+    assert chunk.code[-2:].tolist() == [OpCode.ADD, OpCode.RETURN]
+
+
+def test_logical_jumps_pop_the_left_operand_themselves() -> None:
+    chunk = Compiler().compile(parse("nil or 2"))
+    assert chunk.code.tolist() == [OpCode.NIL, OpCode.JUMP_IF_TRUE_OR_POP, 2, OpCode.CONSTANT, 0, OpCode.RETURN]
+    assert VM(print).execute(chunk) == 2.0